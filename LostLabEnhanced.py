@@ -1,373 +1,59 @@
+import base64
+import os
 import sqlite3  # Used for databases Reference: https://docs.python.org/3/library/sqlite3.html
-import networkx as nx  # Added for graph modeling Reference: https://networkx.org/documentation/stable/tutorial.html
-import tkinter as tk  # Added for Graphic Interface, Reference: https://docs.python.org/3/library/tkinter.html
-from tkinter import messagebox, ttk
-import matplotlib.pyplot as plt  # Show statistical data Reference: https://matplotlib.org/
-import re  # added for regex
-
-
-class Room:
-    # Represents rooms in game with exits and their items
-    def __init__(self, name, item=None, required_items=None):
-        self.name = name
-        self.item = item
-        self.exits = {}
-        self.required_items = required_items if required_items is not None else set()
-
-    def add_exit(self, direction, room):
-        # Add exit to another room in specified direction
-        self.exits[direction.lower()] = room
-
-    def get_exit(self, direction):
-        # Get room in specified direction if exists
-        return self.exits.get(direction.lower())
-
-
-class Player:
-    # Represent player with current room and their inventory
-    def __init__(self, current_room, player_id=None):
-        self.current_room = current_room
-        self.inventory = set()
-        self.id = player_id  # Links to Database
-
-    def move(self, direction):
-        # Move to room based on specific direction if allowed
-        next_room = self.current_room.get_exit(direction)
-        if next_room:
-            missing = next_room.required_items - self.inventory
-            if missing:
-                # Sort missing items
-                missing_sorted = sorted(missing)
-                error_message = f"Cannot enter {next_room.name}: missing {', '.join(missing_sorted)}."
-                # Popup warning for hazard
-                messagebox.showwarning(
-                    "Hazard Alert",
-                    f"You cannot enter {next_room.name}!\nMissing required items: {', '.join(missing)}.\n"
-                    "The room contains hazardous conditions!"
-                )
-                return error_message
-            self.current_room = next_room
-            return f"You moved to {self.current_room.name}."
-        return "You can't go that way!"
-
-    def take_item(self, item):
-        # Pickup item in current room
-        if self.current_room.item and self.current_room.item.lower() == item.lower():
-            if self.current_room.item not in self.inventory:
-                item_taken = self.current_room.item
-                self.inventory.add(item_taken)
-                self.current_room.item = None
-                return f"You picked up {item_taken}."
-            return "You already have this item."
-        return f"There is no {item} here."
-
-
-class Game:
-    # Manage game state, logic, database, and GUI
-    def __init__(self):
-        self.rooms = {}
-        self.graph = nx.Graph()  # Initialize NetworkX graph
-        self.room_positions = {}
-        self.setup_rooms()
-        self.db_init()
-        self.player = Player(self.rooms['Rec Room'], self.get_or_create_player("Hero"))
-        self.target_items = 8
-
-    # Setup Database
-    def db_init(self):
-        # Initialize SQLite database with required tables players, inventory, rooms, and logs.
+import engine
+from mapview import MapView
+from engine import Room, Player  # noqa: F401 - re-exported for existing imports
+
+# Tkinter front end. Game rules live in engine.py; this module only draws state and shows events.
+# tkinter and matplotlib are imported inside the methods that use them so importing this module,
+# and constructing a Game, stays fast for tests and workers that never open a window.
+WIN_LOSE_CHART = "win_lose.png"  # Written next to the database unless winlose is given a path
+CHART_FILE = r'^.+\.(?i:png|svg)$'
+CHART_POLL_MS = 50  # How often the GUI checks for a chart rendering on the worker thread
+
+
+def _winlose(game, verb, argument):
+    return game.plot_win_lose(argument), None
+
+
+class Game(engine.Game):
+    # Game with the Tkinter interface and Matplotlib statistics on top of the headless engine
+    commands = engine.Game.commands.extended()
+    commands.register('winlose', _winlose, "a .png or .svg file", CHART_FILE,
+                      "Charts are saved as .png or .svg files.", storage=True, events=False, optional=True)
+
+    def plot_win_lose(self, path=None):
+        # Save the win vs. lose chart as PNG or SVG (by extension); drawn without a GUI backend.
+        # Without a path it goes to WIN_LOSE_CHART in the database's directory.
+        if path is None:
+            db_path = getattr(self.storage, 'path', None)
+            path = os.path.join(os.path.dirname(os.path.abspath(db_path)) if db_path else "", WIN_LOSE_CHART)
         try:
-            with sqlite3.connect("lostlab.db") as conn:
-                conn.execute("PRAGMA foreign_keys = ON")  # Turn on Foreign key enforcement
-                cur = conn.cursor()
-                # Create table for players with ID, name, current room, and creation timestamp
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS player (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL UNIQUE,
-                        current_room TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                # Create table for inventory linked to players
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS inventory (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        player_id INTEGER NOT NULL,
-                        item TEXT NOT NULL,
-                        acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (player_id) REFERENCES player(id) ON DELETE CASCADE
-                    )
-                """)
-                # Create table for rooms and their items
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS rooms (
-                        name TEXT PRIMARY KEY,
-                        item TEXT
-                    )
-                """)
-                # Create log table to record player actions
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        player_id INTEGER,
-                        action TEXT NOT NULL,
-                        details TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (player_id) REFERENCES player(id)
-                    )
-                """)
-                # Initialize rooms table only if empty
-                cur.execute("SELECT COUNT(*) FROM rooms")
-                if cur.fetchone()[0] == 0:
-                    for room_name, room in self.rooms.items():
-                        cur.execute("INSERT INTO rooms (name, item) VALUES (?, ?)", (room_name, room.item))
-                conn.commit()
-        except sqlite3.Error as e:
-            print(f"Database initialization error: {e}")
-
-    def get_or_create_player(self, name):
-        # Retrieve existing player by name or create a new one.
-        try:
-            with sqlite3.connect("lostlab.db") as conn:
-                cur = conn.cursor()
-                cur.execute("SELECT id FROM player WHERE name = ?", (name,))
-                row = cur.fetchone()
-                if row:
-                    return row[0]
-                cur.execute("INSERT INTO player (name, current_room) VALUES (?, ?)", (name, "Rec Room"))
-                player_id = cur.lastrowid
-                conn.commit()
-                return player_id
-        except sqlite3.Error as e:
-            print(f"Error creating/retrieving player: {e}")
-            return None
-
-    def save_to_db(self):
-        # Save game state to database.
-        try:
-            with sqlite3.connect("lostlab.db") as conn:
-                cur = conn.cursor()
-                # Update players current room
-                cur.execute("UPDATE player SET current_room = ? WHERE id = ?",
-                            (self.player.current_room.name, self.player.id))
-                # Remove all previous inventory items for player
-                cur.execute("DELETE FROM inventory WHERE player_id = ?", (self.player.id,))
-                # Insert current inventory items
-                for item in self.player.inventory:
-                    cur.execute("INSERT INTO inventory (player_id, item) VALUES (?, ?)",
-                                (self.player.id, item))
-                # Update the items in all rooms
-                for room_name, room in self.rooms.items():
-                    cur.execute("UPDATE rooms SET item = ? WHERE name = ?",
-                                (room.item, room_name))
-                conn.commit()
-                # Record save in log table
-                self.log_action("save", f"Game saved at {self.player.current_room.name}")
-                return "Game saved to database."
-        except sqlite3.Error as e:
-            return f"Error saving game: {e}"
-
-    def load_from_db(self):
-        # Load game state from database.
-        try:
-            with sqlite3.connect("lostlab.db") as conn:
-                cur = conn.cursor()
-                # Load players current room
-                cur.execute("SELECT current_room FROM player WHERE id = ?", (self.player.id,))
-                row = cur.fetchone()
-                if not row:
-                    return "Error: No saved data for this player."
-                if row[0] not in self.rooms:
-                    return f"Error: Saved room '{row[0]}' not found."
-                self.player.current_room = self.rooms[row[0]]
-
-                # Load players inventory
-                self.player.inventory.clear()
-                cur.execute("SELECT item FROM inventory WHERE player_id = ?", (self.player.id,))
-                for (item,) in cur.fetchall():
-                    self.player.inventory.add(item)
-
-                # Load items for all rooms
-                cur.execute("SELECT name, item FROM rooms")
-                for name, item in cur.fetchall():
-                    if name in self.rooms:
-                        self.rooms[name].item = item
-
-                # Record this load in log table
-                self.log_action("load", f"Game loaded at {self.player.current_room.name}")
-                return "Game loaded from database."
-        except sqlite3.Error as e:
-            return f"Error loading game: {e}"
-
-    def log_action(self, action, details):
-        # Log player actions to database.
-        try:
-            with sqlite3.connect("lostlab.db") as conn:
-                cur = conn.cursor()
-                cur.execute("INSERT INTO logs (player_id, action, details) VALUES (?, ?, ?)",
-                            (self.player.id, action, details))
-                conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error logging action: {e}")
-
-    def plot_win_lose(self):
-        # Visualize frequency of win vs. lose outcomes.
-        try:
-            with sqlite3.connect("lostlab.db") as conn:
-                cur = conn.cursor()
-                cur.execute("SELECT action, COUNT(*) FROM logs WHERE action IN ('win', 'lose') GROUP BY action")
-                data = cur.fetchall()
-                if not data:
-                    return "No win/lose data to visualize."
-                outcomes = [row[0].capitalize() for row in data]
-                counts = [row[1] for row in data]
-                plt.figure(figsize=(6, 4), facecolor='#2E2E2E')
-                plt.bar(outcomes, counts, color=['#4CAF50', '#F44336'], width=0.4)
-                plt.xlabel('Outcome', color='white')
-                plt.ylabel('Frequency', color='white')
-                plt.title('Win vs. Lose Outcomes', color='white')
-                plt.gca().set_facecolor('#3C3C3C')
-                plt.gca().tick_params(colors='white')
-                plt.tight_layout()
-                plt.show()
-                return "Win/lose visualization displayed."
-        except sqlite3.Error as e:
+            if self.charts.save(path).data is None:
+                return "No win/lose data to visualize."
+            return f"Win/lose chart saved to {os.path.abspath(path)}."
+        except (sqlite3.Error, OSError, ValueError) as e:
             return f"Error visualizing win/lose data: {e}"
 
-    def highlight_path(self, target_room, canvas, duration=3000):
-        # Highlight the shortest path to the target room on the canvas.
+    def highlight_path(self, route, canvas, duration=3000, view=None):
+        # Highlight a PathResult from find_path on the canvas, in view coordinates if a MapView is given
         canvas.delete("path")
-        try:
-            path = nx.shortest_path(self.graph, self.player.current_room.name, target_room, weight='weight')
-            for room1, room2 in zip(path[:-1], path[1:]):
-                x1, y1 = self.room_positions[room1]
-                x2, y2 = self.room_positions[room2]
-                canvas.create_line(x1, y1, x2, y2, fill="#F44336", width=3, tags="path")
-
-            canvas.after(duration, lambda: canvas.delete("path"))
-
-        except nx.NetworkXNoPath:
-            pass
-
-    def setup_rooms(self):
-        # Initialize rooms and exits
-        rooms_data = {
-            'Rec Room': {'item': None, 'required_items': set()},
-            'Decontamination': {'item': 'Empty Laser Weapon', 'required_items': set()},
-            'Terrarium': {'item': 'The Alien!', 'required_items': set()},
-            'Lab': {'item': 'Recording', 'required_items': set()},
-            'Med Bay': {'item': 'Medical Supplies', 'required_items': {'MKIV Suit', 'MKV Helmet'}},
-            'Cargo Hold': {'item': 'MKIV Suit', 'required_items': set()},
-            'Sleeping Quarters': {'item': 'Artifact', 'required_items': set()},
-            'Bathroom': {'item': 'MKV Helmet', 'required_items': set()},
-            'Mess Hall': {'item': 'Ammo', 'required_items': set()},
-            'Water Treatment': {'item': 'Shield Charge', 'required_items': set()}
-        }
-
-        for name, data in rooms_data.items():
-            self.rooms[name] = Room(name, data['item'], data['required_items'])
-            self.graph.add_node(name)  # Add room as a node in graph
-
-        self.room_positions = {
-            'Rec Room': (400, 140),
-            'Sleeping Quarters': (400, 40),
-            'Decontamination': (400, 240),
-            'Terrarium': (400, 330),
-            'Mess Hall': (550, 140),
-            'Bathroom': (550, 40),
-            'Water Treatment': (550, 240),
-            'Med Bay': (250, 140),
-            'Lab': (250, 240),
-            'Cargo Hold': (250, 40)
-        }
-
-        exits = {
-            'Rec Room': {'north': 'Sleeping Quarters', 'south': 'Decontamination',
-                         'east': 'Mess Hall', 'west': 'Med Bay'},
-            'Decontamination': {'north': 'Rec Room', 'south': 'Terrarium',
-                                'east': 'Water Treatment', 'west': 'Lab'},
-            'Terrarium': {'north': 'Decontamination'},
-            'Lab': {'north': 'Med Bay', 'east': 'Decontamination'},
-            'Med Bay': {'north': 'Cargo Hold', 'south': 'Lab', 'east': 'Rec Room'},
-            'Cargo Hold': {'south': 'Med Bay', 'east': 'Sleeping Quarters'},
-            'Sleeping Quarters': {'south': 'Rec Room', 'east': 'Bathroom', 'west': 'Cargo Hold'},
-            'Bathroom': {'south': 'Mess Hall', 'west': 'Sleeping Quarters'},
-            'Mess Hall': {'north': 'Bathroom', 'south': 'Water Treatment', 'west': 'Rec Room'},
-            'Water Treatment': {'north': 'Mess Hall', 'west': 'Decontamination'}
-        }
-        for room_name, room_exits in exits.items():
-            for direction, target_room in room_exits.items():
-                self.rooms[room_name].add_exit(direction, self.rooms[target_room])
-                weight = 1
-                if not self.graph.has_edge(room_name, target_room):
-                    self.graph.add_edge(room_name, target_room, weight=1)
-
-    def show_instructions(self):
-        # Display Instructions
-        return (
-            'Collect all 8 items to win the game, or be prepared to face the Alien\n'
-            'Use the movement buttons to navigate: North, South, East, West\n'
-            'Enter the item name and click "Get Item" to add to inventory\n'
-            'Select a room from the dropdown and click "Find Path" for the shortest route\n'
-            'Enter a filename and click "Save" or "Load" to manage game state\n'
-            'Click "Exit" to quit'
-        )
-
-    def shortest_path(self, target_room):
-        """ Suggest the shortest path to a targeted room using Dijkstra algorithm
-            choice for Dijkstra is based on using weight but also to potentially add more complexity to the game later,
-            if added complexity was not in play a Breadth-First search may be a potentially better fit. """
-        try:
-            if target_room not in self.rooms:
-                return f"Room '{target_room}' does not exist."
-
-            # Update edge weights: only Med Bay is hazardous
-            for room1, room2, data in self.graph.edges(data=True):
-                # Check if either side is Med Bay
-                if 'Med Bay' in (room1, room2):
-                    # If player is missing required items for Med Bay, assign high weight
-                    missing_items = self.rooms['Med Bay'].required_items - self.player.inventory
-                    data['weight'] = 100 if missing_items else 1
-                else:
-                    data['weight'] = 1  # normal room
-
-            # Compute the shortest path using updated weights
-            path = nx.shortest_path(
-                self.graph,
-                source=self.player.current_room.name,
-                target=target_room,
-                weight='weight'
-            )
-            return f"Shortest path to {target_room}: {' -> '.join(path)}"
-
-        except nx.NetworkXNoPath:
-            return f"No path to {target_room}."
-        except nx.NodeNotFound:
-            return f"Room '{target_room}' does not exist."
-
-    def check_victory(self):
-        # Check if the player has won (8 items and in Terrarium)
-        if (
-                len(self.player.inventory) == self.target_items
-                and self.player.current_room.name == "Terrarium"
-        ):
-            self.log_action("win", "Player defeated the Alien with all items!")
-            return True
-        return False
-
-    def check_defeat(self):
-        # Check if the player has lost (less than 8 items in Terrarium)
-        if (
-                len(self.player.inventory) != self.target_items
-                and self.player.current_room.name == "Terrarium"
-        ):
-            self.log_action("lose", "Player was defeated by the Alien!")
-            return True
-        return False
+        if not route or route.rooms is None:
+            return
+        path = route.rooms
+        to_screen = view.to_screen if view is not None else lambda x, y: (x, y)
+        for room1, room2 in zip(path[:-1], path[1:]):
+            x1, y1 = to_screen(*self.room_positions[room1])
+            x2, y2 = to_screen(*self.room_positions[room2])
+            canvas.create_line(x1, y1, x2, y2, fill="#F44336", width=3, tags="path")
+
+        canvas.after(duration, lambda: canvas.delete("path"))
 
     def play_gui(self):
         # Run game with Tkinter Interface
+        import tkinter as tk  # Added for Graphic Interface, Reference: https://docs.python.org/3/library/tkinter.html
+        from tkinter import messagebox, ttk
         root = tk.Tk()
         root.title("Lost Lab")
         root.geometry("1000x800")
@@ -421,31 +107,38 @@ class Game:
         canvas_frame.rowconfigure(0, weight=1)
         canvas_frame.columnconfigure(0, weight=1)
         canvas = tk.Canvas(canvas_frame, width=800, height=600, bg="#3C3C3C", highlightthickness=0)
-        canvas.grid(row=0, column=0)
+        canvas.grid(row=0, column=0, sticky="nsew")
         canvas_frame.grid_propagate(False)
         canvas_frame.update_idletasks()
 
-        # Draw rooms and their exits, Canvas Reference
-        room_oval_ids = {}
-        item_text_ids = {}
-        for room, pos in self.room_positions.items():
-            x, y = pos
-            oval = canvas.create_oval(x - 40, y - 40, x + 40, y + 40,
-                                      fill="#2196F3" if room == self.player.current_room.name else "#616161",
-                                      outline="white", width=2)
-            canvas.create_text(x, y, text=room, font=("Segoe UI", 10, "bold"), fill="white")
-            room_oval_ids[room] = oval  # Save room id for updates
-            # Draw item if present - commented out, used for testing
-            # Prevent spoiling alien location
-            # item = self.rooms[room].item
-            # item_text = canvas.create_text(x, y + 15, text=item if item else "", font=("Arial", 7), fill="red")
-            # item_text_ids[room] = item_text
-
-        # Color edges
-        for room1, room2, _ in self.graph.edges(data=True):
-            x1, y1 = self.room_positions[room1]
-            x2, y2 = self.room_positions[room2]
-            canvas.create_line(x1, y1, x2, y2, fill="white", width=2)
+        # Draw rooms and their exits, Canvas Reference. Only the visible part of the map is drawn,
+        # see mapview.py; drag to scroll, mouse wheel to zoom
+        map_view = MapView(self, canvas, 800, 600)
+        map_view.render()
+        if not map_view.is_visible(map_view.current):
+            map_view.center_on(map_view.current)
+        drag = {}
+
+        def start_drag(event):
+            drag['x'], drag['y'] = event.x, event.y
+
+        def drag_map(event):
+            map_view.scroll(drag['x'] - event.x, drag['y'] - event.y)
+            canvas.delete("path")
+            start_drag(event)
+
+        def zoom_map(event):
+            zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+            map_view.zoom(1.25 if zoom_in else 0.8, event.x, event.y)
+            canvas.delete("path")
+
+        canvas.bind("<ButtonPress-1>", start_drag)
+        canvas.bind("<B1-Motion>", drag_map)
+        canvas.bind("<MouseWheel>", zoom_map)  # Windows and macOS
+        canvas.bind("<Button-4>", zoom_map)  # X11 wheel up
+        canvas.bind("<Button-5>", zoom_map)  # X11 wheel down
+        canvas.bind("<Configure>", lambda event: map_view.resize(event.width, event.height))
+        # Item labels are not drawn, to not spoil the alien location
 
         # Add Compass - top right corner
         # Reference:
@@ -497,7 +190,7 @@ class Game:
         ttk.Button(game_controls_frame, text="Save", command=lambda: handle_action("save")).pack(side=tk.LEFT, padx=5)
         ttk.Button(game_controls_frame, text="Load", command=lambda: handle_action("load")).pack(side=tk.LEFT, padx=5)
         ttk.Button(game_controls_frame, text="Visualize Win/Lose",
-                   command=lambda: handle_action("winlose")).pack(side=tk.LEFT, padx=5)
+                   command=lambda: show_win_lose()).pack(side=tk.LEFT, padx=5)
         ttk.Button(game_controls_frame, text="Exit", command=root.destroy).pack(side=tk.LEFT, padx=5)
 
         # Status Bar
@@ -511,56 +204,64 @@ class Game:
                 text=f"Inventory: {', '.join(self.player.inventory) if self.player.inventory else 'Empty'}")
             item_label.config(
                 text=f"You See: {self.player.current_room.item if self.player.current_room.item else 'None'}")
-            for room, oval_id in room_oval_ids.items():
-                canvas.itemconfig(oval_id, fill="#2196F3" if room == self.player.current_room.name else "#616161")
-            # Commented out to not spoil alien location
-            # for room, text_id in item_text_ids.items():
-            #    item = self.rooms[room].item
-            #    canvas.itemconfig(text_id, text=item if item else "")
-            # Victory Condition
-            if self.check_victory():
-                messagebox.showinfo("Victory", "You did it! You have conquered the Alien!")
-                root.destroy()
-            elif self.check_defeat():
-                messagebox.showerror("Defeat", "You were not prepared! The Alien has defeated you!")
-                root.destroy()
+            # Only the previous and the new room change colour
+            if self.player.current_room.name != map_view.current:
+                map_view.move_player(self.player.current_room.name)
+
+        def show_events(events):
+            # Turn engine events into popups; victory and defeat end the game
+            for event in events:
+                if event.kind == "hazard":
+                    messagebox.showwarning(event.title, event.message)
+                elif event.kind == "victory":
+                    messagebox.showinfo(event.title, event.message)
+                    root.destroy()
+                elif event.kind == "defeat":
+                    messagebox.showerror(event.title, event.message)
+                    root.destroy()
 
         def handle_action(action):
             # Handle all user actions and update interface
             try:
-                # Move Player
-                if action in ['north', 'south', 'east', 'west']:
-                    result = self.player.move(action)
-                # Item Pickup
-                elif action.startswith('get '):
-                    item = action[4:].strip()
-                    if not item:
-                        raise ValueError("Please specify an item to get.")
-                    if not re.match(r'^[a-zA-Z\s]+$', item):
-                        raise ValueError("Item name must contain only letters and spaces.")
-                    result = self.player.take_item(item)
-                # Shortest Path
-                elif action.startswith('path '):
-                    target = action[5:].strip().title()
-                    if not target:
-                        raise ValueError("Please specify a room.")
-                    result = self.shortest_path(target)
-                    self.highlight_path(target, canvas)
-                # Save Game
-                elif action == 'save':
-                    result = self.save_to_db()
-                # Load Game
-                elif action == 'load':
-                    result = self.load_from_db()
-                elif action == 'winlose':
-                    result = self.plot_win_lose()
-                else:
-                    raise ValueError("Invalid action.")
-                status_bar.config(text=result)
+                command = self.handle_command(action)
+                if command.route is not None:
+                    self.highlight_path(command.route, canvas, view=map_view)
+                status_bar.config(text=command.message)
                 update_gui()
+                show_events(command.events)
             except ValueError as e:
                 status_bar.config(text=str(e))
 
+        def show_win_lose():
+            # Render on the chart worker and poll for it, so the Tk thread never waits on matplotlib
+            status_bar.config(text="Rendering win/lose chart...")
+            poll_chart(self.charts.submit('png', None))
+
+        def poll_chart(future):
+            if not future.done():
+                root.after(CHART_POLL_MS, poll_chart, future)
+                return
+            try:
+                chart = future.result()
+            except (sqlite3.Error, OSError, ValueError) as e:
+                status_bar.config(text=f"Error visualizing win/lose data: {e}")
+                return
+            if chart.data is None:
+                status_bar.config(text="No win/lose data to visualize.")
+                return
+            window = tk.Toplevel(root)
+            window.title("Win vs. Lose Outcomes")
+            try:
+                image = tk.PhotoImage(master=window, data=base64.b64encode(chart.data))
+            except tk.TclError as e:
+                window.destroy()
+                status_bar.config(text=f"Error visualizing win/lose data: {e}")
+                return
+            label = tk.Label(window, image=image, background="#2E2E2E")
+            label.image = image  # Keep a reference, Tk does not
+            label.pack()
+            status_bar.config(text="Win/lose visualization displayed.")
+
         update_gui()
         root.mainloop()
 
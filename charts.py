@@ -0,0 +1,91 @@
+import io
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Win/lose charts rendered to image bytes without a GUI. Charts are drawn on a bare
+# matplotlib Figure, never through pyplot, so no interactive backend is loaded and
+# renders on different threads share no global figure state. matplotlib is imported
+# on the first render.
+CHART_FORMATS = ('png', 'svg')
+OUTCOME_COLORS = {'win': '#4CAF50', 'lose': '#F44336'}
+
+# A rendered chart: the (outcome, count) pairs it shows, its format, and the image bytes
+# (None when there was nothing to draw)
+Chart = namedtuple('Chart', ['counts', 'format', 'data'])
+
+
+def render_outcome_chart(counts, fmt='png', dpi=100):
+    # Draw the win vs. lose bar chart for [(outcome, count)] and return the image bytes
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unknown chart format '{fmt}'.")
+    from matplotlib.figure import Figure  # Show statistical data Reference: https://matplotlib.org/
+    figure = Figure(figsize=(6, 4), facecolor='#2E2E2E')
+    axes = figure.add_subplot()
+    axes.bar([outcome.capitalize() for outcome, _ in counts], [count for _, count in counts],
+             color=[OUTCOME_COLORS.get(outcome, '#616161') for outcome, _ in counts], width=0.4)
+    axes.set_xlabel('Outcome', color='white')
+    axes.set_ylabel('Frequency', color='white')
+    axes.set_title('Win vs. Lose Outcomes', color='white')
+    axes.set_facecolor('#3C3C3C')
+    axes.tick_params(colors='white')
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt, dpi=dpi, facecolor=figure.get_facecolor())
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """ Renders outcome charts from Storage.outcome_counts on a worker thread.
+
+        Each chart is cached with the counts it was drawn from. Asking again reads the
+        counts (a few rows of outcome_stats) and only redraws when they changed, so
+        dashboards can poll cheaply. chart() renders on the calling thread; submit() runs
+        chart() on the renderer's single worker thread and returns a Future, which is what
+        the GUI uses to keep drawing off the Tk thread. """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.renders = 0  # Charts drawn
+        self.hits = 0  # Charts served from the cache
+        self._cache = {}  # (format, player_id) -> Chart
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def chart(self, fmt='png', player_id=None):
+        # Return a Chart of the current counts, of every player or of one
+        counts = tuple(self.storage.outcome_counts(player_id))
+        key = (fmt, player_id)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached.counts == counts:
+                self.hits += 1
+                return cached
+        chart = Chart(counts, fmt, render_outcome_chart(counts, fmt) if counts else None)
+        with self._lock:
+            self._cache[key] = chart
+            self.renders += 1
+        return chart
+
+    def submit(self, fmt='png', player_id=None):
+        # Render on the worker thread; returns a Future of a Chart
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="lostlab-charts")
+        return self._executor.submit(self.chart, fmt, player_id)
+
+    def save(self, path, player_id=None):
+        # Write the chart to path, in the format its extension names; returns the Chart
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Charts are saved as {' or '.join(CHART_FORMATS)}, not '{path}'.")
+        chart = self.chart(fmt, player_id)
+        if chart.data is not None:
+            with open(path, "wb") as f:
+                f.write(chart.data)
+        return chart
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,197 @@
+import re
+import threading
+import time
+from collections import namedtuple
+
+# A registered verb. handler(game, verb, argument) returns (message, route). argument is
+# None for verbs that take none, otherwise the stripped text after the verb, checked against
+# the precompiled pattern; missing is None when the argument is optional (then it may be None).
+# storage marks verbs that read or write the database and blocking verbs that may keep the CPU
+# busy for long (the hint planner), so servers can run both off the event loop.
+# events=False skips collecting game events afterwards.
+CommandSpec = namedtuple('CommandSpec', ['verb', 'handler', 'argument', 'pattern', 'missing', 'invalid',
+                                         'storage', 'events', 'blocking'])
+# What dispatch returns: status text, events raised, and the PathResult for path commands
+CommandResult = namedtuple('CommandResult', ['message', 'events', 'route'])
+# Latency counters of one verb, in seconds
+CommandStats = namedtuple('CommandStats', ['count', 'total', 'mean', 'max'])
+
+DIRECTIONS = ('north', 'south', 'east', 'west')
+BATCH_SEPARATOR = ";"
+ITEM_NAME = re.compile(r'^[a-zA-Z\s]+$')
+GAME_OVER = "The game is over."
+
+
+class BatchError(ValueError):
+    # A command in a batch was invalid; results holds the CommandResults of the ones before it
+    def __init__(self, message, index, results):
+        super().__init__(message)
+        self.index = index
+        self.results = results
+
+
+class CommandRegistry:
+    """ Verb table shared by every front end: the GUI, the server, the simulation and tests.
+
+        A command is "<verb>" or "<verb> <argument>"; dispatch splits off the verb and finds
+        its spec with one dict lookup, then validates the argument with a pattern compiled at
+        registration. Invalid input raises ValueError with a message meant for the player, and
+        so does any command once the game has ended (game.outcome is set).
+        Every dispatch is timed per verb (see stats). One registry serves every game of a
+        server, from the event loop and executor threads alike, so the counters are updated
+        under a lock. """
+
+    def __init__(self, specs=()):
+        self.specs = {spec.verb: spec for spec in specs}
+        self.counts = {}
+        self.seconds = {}
+        self.slowest = {}
+        self._lock = threading.Lock()
+
+    def register(self, verb, handler, argument=None, pattern=None, invalid=None, storage=False, events=True,
+                 optional=False, blocking=False):
+        # argument names what the verb takes ("an item"), or None for bare verbs; optional lets it be left out
+        missing = f"Please specify {argument}." if argument and not optional else None
+        compiled = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.specs[verb] = CommandSpec(verb, handler, argument, compiled, missing, invalid, storage, events,
+                                       blocking)
+
+    def extended(self):
+        # Copy of this registry with its own counters, for front ends that add verbs
+        return CommandRegistry(self.specs.values())
+
+    def parse(self, text):
+        # Return (spec, argument) for a command, or raise ValueError
+        verb, _, argument = text.partition(" ")
+        spec = self.specs.get(verb)
+        if spec is None:
+            raise ValueError("Invalid action.")
+        argument = argument.strip()
+        if spec.argument is None:
+            if argument:
+                raise ValueError("Invalid action.")
+            return spec, None
+        if not argument:
+            if spec.missing is None:
+                return spec, None
+            raise ValueError(spec.missing)
+        if spec.pattern is not None and not spec.pattern.match(argument):
+            raise ValueError(spec.invalid)
+        return spec, argument
+
+    def uses_storage(self, text):
+        # True if any command in text (one command or a batch) touches the database
+        return any(self.specs.get(command.strip().partition(" ")[0], _NO_STORAGE).storage
+                   for command in text.split(BATCH_SEPARATOR))
+
+    def blocks(self, text):
+        # True if any command in text touches the database or is a blocking verb
+        specs = [self.specs.get(command.strip().partition(" ")[0], _NO_STORAGE)
+                 for command in text.split(BATCH_SEPARATOR)]
+        return any(spec.storage or spec.blocking for spec in specs)
+
+    def _run(self, game, text):
+        # Parse, run and time one command; returns (spec, message, route)
+        if game.outcome is not None:
+            raise ValueError(GAME_OVER)
+        start = time.perf_counter()
+        spec, argument = self.parse(text)
+        message, route = spec.handler(game, spec.verb, argument)
+        elapsed = time.perf_counter() - start
+        verb = spec.verb
+        with self._lock:
+            self.counts[verb] = self.counts.get(verb, 0) + 1
+            self.seconds[verb] = self.seconds.get(verb, 0.0) + elapsed
+            if elapsed > self.slowest.get(verb, 0.0):
+                self.slowest[verb] = elapsed
+        return spec, message, route
+
+    def execute(self, game, text):
+        # Run one command without collecting events; returns (message, route)
+        return self._run(game, text)[1:]
+
+    def dispatch(self, game, text):
+        # Run one command and return a CommandResult(message, events, route)
+        spec, message, route = self._run(game, text)
+        events = game.collect_events() if spec.events else []
+        return CommandResult(message, events, route)
+
+    def dispatch_batch(self, game, script):
+        """ Run "north;north;get Ammo" (or a list of commands) in order and return their
+            CommandResults. Stops at the first invalid command by raising BatchError, after
+            the commands before it have run. """
+        commands = script.split(BATCH_SEPARATOR) if isinstance(script, str) else script
+        results = []
+        for index, command in enumerate(commands):
+            command = command.strip()
+            if not command:
+                continue
+            try:
+                results.append(self.dispatch(game, command))
+            except ValueError as e:
+                message = f"Command {index + 1} ({command}): {e}" if len(commands) > 1 else str(e)
+                raise BatchError(message, index, results) from e
+        return results
+
+    def stats(self):
+        # {verb: CommandStats} for every verb dispatched so far
+        with self._lock:
+            return {verb: CommandStats(count, self.seconds[verb], self.seconds[verb] / count, self.slowest[verb])
+                    for verb, count in self.counts.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts.clear()
+            self.seconds.clear()
+            self.slowest.clear()
+
+
+_NO_STORAGE = CommandSpec(None, None, None, None, None, None, False, True, False)
+
+
+def _move(game, verb, argument):
+    return game.player.move(verb), None
+
+
+def _get(game, verb, item):
+    return game.player.take_item(game.lookup.item_name(item) or item), None
+
+
+def _path(game, verb, text):
+    # One search feeds both the status text and any highlight
+    target = game.resolve_room(text)
+    route = game.find_path(target)
+    message = game.path_message(route, target)
+    if route is None:
+        message += game.suggestion(game.lookup.complete_room(text))
+    return message, route
+
+
+def _where(game, verb, item):
+    return game.where_is(item), None
+
+
+def _save(game, verb, argument):
+    return game.save_to_db(), None
+
+
+def _load(game, verb, argument):
+    return game.load_from_db(), None
+
+
+def _hint(game, verb, argument):
+    return game.hint(), None
+
+
+def game_commands():
+    # The engine's commands: north/south/east/west, get, path, where, save, load, hint
+    registry = CommandRegistry()
+    for direction in DIRECTIONS:
+        registry.register(direction, _move)
+    registry.register('get', _get, "an item to get", ITEM_NAME, "Item name must contain only letters and spaces.")
+    registry.register('path', _path, "a room")
+    registry.register('where', _where, "an item")
+    registry.register('save', _save, storage=True)
+    registry.register('load', _load, storage=True)
+    registry.register('hint', _hint, blocking=True)
+    return registry
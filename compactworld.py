@@ -0,0 +1,235 @@
+import sys
+import weakref
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+from engine import DIRECTIONS
+from inventory import ItemRegistry
+
+NO_ROOM = -1
+NO_ITEM = -1
+# Exit slot of each compass direction; every room has one slot per direction
+SLOTS = {direction: slot for slot, direction in enumerate(DIRECTIONS)}
+WIDTH = len(DIRECTIONS)
+
+
+class CompactWorld(Mapping):
+    """ Array-backed store for large worlds, used as Game.rooms when Game(compact=True).
+
+        Room names are interned to integer ids (positions in names). Exits live in one flat
+        array with a fixed slot per compass direction, so exits[id * 4 + slot] is the target
+        room id or NO_ROOM. Item names are interned too: room_items[id] is the id of the room's
+        item and requires maps gated rooms to a bitset of required item ids. Positions are
+        two coordinate arrays. No per-room Python objects exist until a room is looked up,
+        and then only a RoomView holding the world and the id.
+
+        Behaves like the {name: Room} dict it replaces. Views are cached weakly, so the same
+        room looks up as the same object while anything still holds it. """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.exits = array('i')
+        self.room_items = array('i')
+        self.requires = {}  # Room id -> bitset of required item ids, gated rooms only
+        self.registry = ItemRegistry()  # Item names and their bit positions
+        self.dirty = {}  # Room id -> fields changed since the last save
+        self.on_change = None  # Callback(room, field) shared by every room
+        self.positions = PositionTable(self)
+        self._views = weakref.WeakValueDictionary()
+
+    def intern(self, name):
+        # Id of a room name, adding an empty room the first time it is seen
+        room_id = self.ids.get(name)
+        if room_id is None:
+            room_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.exits.extend((NO_ROOM,) * WIDTH)
+            self.room_items.append(NO_ITEM)
+            self.positions.extend()
+        return room_id
+
+    def view(self, room_id):
+        room = self._views.get(room_id)
+        if room is None:
+            room = self._views[room_id] = RoomView(self, room_id)
+        return room
+
+    def exit_names(self, name):
+        # (direction, target name) pairs of a room without creating any views
+        base = self.ids[name] * WIDTH
+        names = self.names
+        return [(direction, names[target]) for direction, target in zip(DIRECTIONS, self.exits[base:base + WIDTH])
+                if target != NO_ROOM]
+
+    def load(self, records):
+        """ Add room records (see worlds.py) one at a time. Raises ValueError for duplicate
+            rooms, non-compass exits, or exits to rooms that never get a record. """
+        defined = bytearray()
+        for record in records:
+            room_id = self.intern(record["name"])
+            if room_id >= len(defined):
+                defined.extend(bytes(len(self.names) - len(defined)))
+            elif defined[room_id]:
+                raise ValueError(f"Room '{record['name']}' is defined twice.")
+            defined[room_id] = 1
+            item = record.get("item")
+            self.room_items[room_id] = NO_ITEM if item is None else self.registry.item_id(item)
+            mask = self.registry.item_mask(record.get("requires", ()))
+            if mask:
+                self.requires[room_id] = mask
+            if "pos" in record:
+                self.positions.set(room_id, *record["pos"])
+            for direction, target_name in record.get("exits", {}).items():
+                slot = SLOTS.get(direction.lower())
+                if slot is None:
+                    raise ValueError(f"Compact worlds only support compass exits, not '{direction}'.")
+                self.exits[room_id * WIDTH + slot] = self.intern(target_name)
+        defined.extend(bytes(len(self.names) - len(defined)))
+        missing = [self.names[room_id] for room_id, flag in enumerate(defined) if not flag][:5]
+        if missing:
+            raise ValueError(f"Exits lead to undefined rooms: {', '.join(sorted(missing))}.")
+
+    def memory_usage(self):
+        # Bytes held by the arrays and the room name tables
+        tables = (self.exits, self.room_items, self.positions.xs, self.positions.ys, self.positions.placed,
+                  self.names, self.ids)
+        return sum(map(sys.getsizeof, tables)) + sum(map(sys.getsizeof, self.names))
+
+    def __getitem__(self, name):
+        return self.view(self.ids[name])
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class PositionTable(MutableMapping):
+    # Canvas positions by room name, for Game.room_positions, stored as two coordinate arrays
+    def __init__(self, world):
+        self.world = world
+        self.xs = array('i')
+        self.ys = array('i')
+        self.placed = bytearray()
+
+    def extend(self):
+        self.xs.append(0)
+        self.ys.append(0)
+        self.placed.append(0)
+
+    def set(self, room_id, x, y):
+        self.xs[room_id] = x
+        self.ys[room_id] = y
+        self.placed[room_id] = 1
+
+    def __getitem__(self, name):
+        room_id = self.world.ids[name]
+        if not self.placed[room_id]:
+            raise KeyError(name)
+        return self.xs[room_id], self.ys[room_id]
+
+    def __setitem__(self, name, position):
+        self.set(self.world.ids[name], *position)
+
+    def __delitem__(self, name):
+        self[name]  # KeyError if the room has no position
+        self.placed[self.world.ids[name]] = 0
+
+    def __iter__(self):
+        names = self.world.names
+        return (names[room_id] for room_id, flag in enumerate(self.placed) if flag)
+
+    def __len__(self):
+        return self.placed.count(1)
+
+
+class RoomView:
+    # A room of a CompactWorld with the same interface as engine.Room
+    __slots__ = ('world', 'id', '__weakref__')
+
+    def __init__(self, world, room_id):
+        self.world = world
+        self.id = room_id
+
+    @property
+    def name(self):
+        return self.world.names[self.id]
+
+    @property
+    def item(self):
+        item_id = self.world.room_items[self.id]
+        return None if item_id == NO_ITEM else self.world.registry.names[item_id]
+
+    @item.setter
+    def item(self, value):
+        if value != self.item:
+            self.world.room_items[self.id] = NO_ITEM if value is None else self.world.registry.item_id(value)
+            self.mark_dirty('item')
+
+    @property
+    def required_mask(self):
+        # Required items as a bitset of the world's item ids
+        return self.world.requires.get(self.id, 0)
+
+    @property
+    def required_items(self):
+        return self.world.registry.item_set(self.required_mask)
+
+    @required_items.setter
+    def required_items(self, items):
+        mask = self.world.registry.item_mask(items)
+        if mask:
+            self.world.requires[self.id] = mask
+        else:
+            self.world.requires.pop(self.id, None)
+        if self.world.on_change:
+            self.world.on_change(self, 'required_items')
+
+    @property
+    def exits(self):
+        # {direction: room} built from the exit slots; use get_exit in hot paths
+        world, base = self.world, self.id * WIDTH
+        targets = world.exits[base:base + WIDTH]
+        return {direction: world.view(target) for direction, target in zip(DIRECTIONS, targets)
+                if target != NO_ROOM}
+
+    @property
+    def dirty(self):
+        # Fields changed since the last save; a throwaway empty set for clean rooms
+        return self.world.dirty.get(self.id) or set()
+
+    @property
+    def on_change(self):
+        return self.world.on_change
+
+    @on_change.setter
+    def on_change(self, callback):
+        self.world.on_change = callback
+
+    def mark_dirty(self, field):
+        self.world.dirty.setdefault(self.id, set()).add(field)
+        if self.world.on_change:
+            self.world.on_change(self, field)
+
+    def add_exit(self, direction, room):
+        slot = SLOTS.get(direction.lower())
+        if slot is None:
+            raise ValueError(f"Compact worlds only support compass exits, not '{direction}'.")
+        self.world.exits[self.id * WIDTH + slot] = room.id
+
+    def get_exit(self, direction):
+        slot = SLOTS.get(direction)
+        if slot is None:
+            slot = SLOTS.get(direction.lower())
+            if slot is None:
+                return None
+        target = self.world.exits[self.id * WIDTH + slot]
+        return None if target == NO_ROOM else self.world.view(target)
+
+    def __repr__(self):
+        return f"<RoomView {self.name!r}>"
@@ -0,0 +1,646 @@
+import os
+import sqlite3  # Used for databases Reference: https://docs.python.org/3/library/sqlite3.html
+from collections import namedtuple
+
+from commands import DIRECTIONS, CommandResult, game_commands  # noqa: F401 - DIRECTIONS, CommandResult re-exported
+from inventory import BitsetInventory, ItemRegistry
+from journal import Journal
+from lookup import NameIndex, normalize
+from planner import RoutePlanner
+from routing import PathCache, RoutingTable
+from storage import DEFAULT_DB_PATH, DEFAULT_WORLD, NullStorage, open_storage
+
+# Headless game engine: rooms, player, rules, and command dispatch with no GUI dependencies.
+# Anything a front end should show the user (hazards, victory, defeat) is returned as an Event.
+# networkx is only loaded when the graph is first needed (pathfinding or drawing the map).
+Event = namedtuple('Event', ['kind', 'title', 'message'])
+# handle_command returns a commands.CommandResult(message, events, route)
+
+HINT_LENGTH = 5  # Commands shown by the hint command
+ROUTERS = {'cache': PathCache, 'table': RoutingTable}
+INVENTORIES = ('set', 'bitset')  # Player inventory backends, see inventory.py
+JOURNAL_MODES = ('new', 'resume')
+
+
+class Room:
+    # Represents rooms in game with exits and their items
+    __slots__ = ('on_change', 'dirty', 'name', '_item', 'exits', '_required_items')
+
+    def __init__(self, name, item=None, required_items=None):
+        self.on_change = None  # Optional callback(room, field) so the game can collect dirty rooms
+        self.dirty = set()  # Fields changed since the last save
+        self.name = name
+        self._item = item
+        self.exits = {}
+        self.required_items = required_items if required_items is not None else set()
+
+    @property
+    def item(self):
+        return self._item
+
+    @item.setter
+    def item(self, value):
+        if value != self._item:
+            self._item = value
+            self.mark_dirty('item')
+
+    @property
+    def required_items(self):
+        # Stored frozen so changes must go through the setter and reach the path cache
+        return self._required_items
+
+    @required_items.setter
+    def required_items(self, items):
+        self._required_items = frozenset(items)
+        if self.on_change:
+            self.on_change(self, 'required_items')
+
+    def mark_dirty(self, field):
+        # Record field as changed and notify the owning game
+        self.dirty.add(field)
+        if self.on_change:
+            self.on_change(self, field)
+
+    def add_exit(self, direction, room):
+        # Add exit to another room in specified direction
+        self.exits[direction.lower()] = room
+
+    def get_exit(self, direction):
+        # Get room in specified direction if exists; commands are already lowercase
+        room = self.exits.get(direction)
+        return room if room is not None else self.exits.get(direction.lower())
+
+
+class Player:
+    # Represent player with current room and their inventory
+    __slots__ = ('on_change', 'dirty', '_current_room', '_inventory', 'id', 'events', '_saved_inventory')
+
+    def __init__(self, current_room, player_id=None, inventory=None):
+        self.on_change = None  # Optional callback(player, kind, data) for moves and pickups, see Game.record
+        self.dirty = set()  # Fields changed since the last save
+        self.current_room = current_room
+        # A set, or an empty BitsetInventory to keep items as bits of an item registry
+        self._inventory = inventory if inventory is not None else set()
+        self.id = player_id  # Links to Database
+        self.events = []  # Events raised since the front end last collected them
+        self._saved_inventory = None  # Inventory as of last save/load, None until then
+
+    @property
+    def current_room(self):
+        return self._current_room
+
+    @current_room.setter
+    def current_room(self, room):
+        self._current_room = room
+        self.dirty.add('current_room')
+
+    @property
+    def inventory(self):
+        return self._inventory
+
+    @inventory.setter
+    def inventory(self, items):
+        # Assigning a plain set keeps the bitset backend if the player uses it
+        if isinstance(self._inventory, BitsetInventory) and not isinstance(items, BitsetInventory):
+            items = BitsetInventory(self._inventory.registry, items)
+        self._inventory = items
+
+    def inventory_changes(self):
+        # Return (added, removed) items since the last save/load, or None if never synced
+        if self._saved_inventory is None:
+            return None
+        return self.inventory - self._saved_inventory, self._saved_inventory - self.inventory
+
+    def mark_saved(self):
+        # Current state now matches the database
+        self.dirty.clear()
+        self._saved_inventory = self.inventory.copy()
+
+    def move(self, direction):
+        # Move to room based on specific direction if allowed
+        next_room = self.current_room.get_exit(direction)
+        if next_room:
+            if isinstance(self._inventory, BitsetInventory):
+                missing = self._inventory.missing(next_room)
+            else:
+                missing = next_room.required_items - self._inventory
+            if missing:
+                # Sort missing items
+                missing_sorted = sorted(missing)
+                error_message = f"Cannot enter {next_room.name}: missing {', '.join(missing_sorted)}."
+                # Hazard warning for the front end to show
+                self.events.append(Event(
+                    "hazard", "Hazard Alert",
+                    f"You cannot enter {next_room.name}!\nMissing required items: {', '.join(missing_sorted)}.\n"
+                    "The room contains hazardous conditions!"
+                ))
+                return error_message
+            self.current_room = next_room
+            if self.on_change:
+                self.on_change(self, 'move', next_room.name)
+            return f"You moved to {self.current_room.name}."
+        return "You can't go that way!"
+
+    def take_item(self, item):
+        # Pickup item in current room
+        room_item = self.current_room.item
+        if room_item and (room_item == item or room_item.casefold() == item.casefold()):
+            if room_item not in self.inventory:
+                item_taken = self.current_room.item
+                self.inventory.add(item_taken)
+                self.current_room.item = None
+                if self.on_change:
+                    self.on_change(self, 'take', item_taken)
+                return f"You picked up {item_taken}."
+            return "You already have this item."
+        return f"There is no {item} here."
+
+
+class Game:
+    # Manage game state, logic, and database
+    commands = game_commands()  # Verb table and latency counters shared by every game
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, pool_size=1, router='cache', precompute_routes=False,
+                 world=None, compact=False, inventory='set', player_name="Hero", storage=None, journal=None,
+                 world_name=None, shards=1):
+        self.rooms = {}
+        self.dirty_rooms = {}  # Rooms changed since the last save, keyed by name
+        self._graph = None  # NetworkX graph, built from room exits on first use
+        self.room_positions = {}
+        # Path service, see routing.py: 'cache' memoizes searches, 'table' keeps next-hop tables
+        if router not in ROUTERS:
+            raise ValueError(f"Unknown router '{router}'.")
+        self._router_class = ROUTERS[router]
+        if inventory not in INVENTORIES:
+            raise ValueError(f"Unknown inventory '{inventory}'.")
+        self._router = None
+        self._planner = None  # RoutePlanner, created on first plan_route
+        self._lookup = None  # lookup.NameIndex, built on first use
+        self._charts = None  # charts.ChartRenderer, created on first use
+        self.start_room = "Rec Room"
+        self.target_items = 8
+        self.final_room = "Terrarium"  # Where the Alien waits; entering it ends the game
+        # Key of this world's saved state in the database; a world file's header may name it
+        self.world_name = DEFAULT_WORLD
+        self.world_id = None
+        self.outcome = None  # 'win' or 'lose' once the game has ended; commands are refused from then on
+        # world is a world file path or header and room records (see worlds.py),
+        # None plays the built-in Lost Lab. compact keeps rooms in a compactworld.CompactWorld.
+        self.compact = compact
+        if world is None:
+            self.setup_rooms()
+            if compact:
+                from worlds import world_records
+                world = list(world_records(self))
+                self.rooms, self.room_positions = {}, {}
+        if world is not None:
+            self.load_world(world)
+        if world_name is not None:
+            self.world_name = world_name
+        if precompute_routes and router == 'table':
+            self.router.precompute()
+        # One long-lived connection pool per game; db_path=None runs without a database.
+        # A server passes one shared Storage to all its games, which then leave it open on close.
+        # Any object with Storage's methods can be passed in; shards > 1 spreads players over
+        # that many database files (storage.ShardedStorage).
+        self._owns_storage = storage is None
+        if storage is None:
+            storage = open_storage(db_path, pool_size, shards) if db_path else NullStorage()
+        self.storage = storage
+        self.db_init()
+        # Bit positions of items for the bitset inventory; compact worlds already number their items
+        self.items = self.rooms.registry if compact else ItemRegistry(
+            room.item for room in self.rooms.values() if room.item is not None)
+        self.player = Player(self.rooms[self.start_room], self.get_or_create_player(player_name),
+                             BitsetInventory(self.items) if inventory == 'bitset' else None)
+        # Session journal of state changes with periodic snapshots, see journal.py. 'new' starts
+        # a session from the state above, 'resume' rebuilds the player's last one from its journal.
+        # The player reports its own moves and pickups, so agents calling Player.move are journaled too.
+        if journal is not None and journal not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode '{journal}'.")
+        self.journal = Journal(self) if journal else None
+        if journal == 'resume':
+            self.journal.resume()
+        elif journal == 'new':
+            self.journal.start()
+        if self.journal is not None:
+            self.player.on_change = self.track_player_change
+
+    @property
+    def graph(self):
+        # Graph of rooms (nodes) and exits (edges), loads networkx the first time it is needed
+        if self._graph is None:
+            from worldgraph import VersionedGraph
+            graph = VersionedGraph()
+            graph.add_nodes_from(self.rooms)
+            graph.add_edges_from(((name, target.name) for name, room in self.rooms.items()
+                                  for target in room.exits.values()), weight=1)
+            self._graph = graph
+        return self._graph
+
+    @property
+    def router(self):
+        # Path service over the graph, created on first route query
+        if self._router is None:
+            self._router = self._router_class(self.graph, self.rooms)
+        return self._router
+
+    @property
+    def lookup(self):
+        # Case-insensitive room and item index, built once for the loaded world
+        if self._lookup is None:
+            self._lookup = NameIndex(self.rooms, self.player.inventory)
+        return self._lookup
+
+    @property
+    def charts(self):
+        # Win/lose chart renderer over this game's storage
+        if self._charts is None:
+            from charts import ChartRenderer
+            self._charts = ChartRenderer(self.storage)
+        return self._charts
+
+    # Setup Database
+    def db_init(self):
+        # Initialize SQLite database with required tables and this world's instance row.
+        try:
+            self.storage.init_schema()
+            self.world_id = self.storage.get_or_create_world(self.world_name, self.rooms)
+        except sqlite3.Error as e:
+            print(f"Database initialization error: {e}")
+
+    def get_or_create_player(self, name):
+        # Retrieve existing player by name or create a new one.
+        try:
+            return self.storage.get_or_create_player(name, self.start_room, self.world_id)
+        except sqlite3.Error as e:
+            print(f"Error creating/retrieving player: {e}")
+            return None
+
+    def save_to_db(self):
+        # Save game state to database.
+        # Only rows that changed since the last save/load are written. A session that never
+        # saved or loaded does not know what the database holds, so it rewrites all of it.
+        try:
+            player = self.player
+            changes = player.inventory_changes()
+            if changes is None:
+                room_name, inventory, added, removed = player.current_room.name, player.inventory, (), ()
+                room_items = [(name, room.item) for name, room in self.rooms.items()]
+            else:
+                room_name = player.current_room.name if 'current_room' in player.dirty else None
+                inventory, (added, removed) = None, changes
+                room_items = [(name, room.item) for name, room in self.dirty_rooms.items()]
+            if room_name is not None or inventory is not None or added or removed or room_items:
+                self.storage.save_state(player.id, room_name, inventory, added, removed, room_items, self.world_id,
+                                        replace_rooms=changes is None)
+            player.mark_saved()
+            self.clear_dirty_rooms()
+            self.record('save')
+            # Record save in log table
+            self.log_action("save", f"Game saved at {self.player.current_room.name}")
+            return "Game saved to database."
+        except sqlite3.Error as e:
+            return f"Error saving game: {e}"
+
+    def load_from_db(self):
+        # Load game state from database.
+        try:
+            # Rooms changed since the last save go back to their saved or starting item
+            state = self.storage.load_state(self.player.id, self.world_id, list(self.dirty_rooms))
+            if not state:
+                return "Error: No saved data for this player."
+            room_name, inventory, room_items = state
+            if room_name not in self.rooms:
+                return f"Error: Saved room '{room_name}' not found."
+            # Load players current room and inventory
+            self.player.current_room = self.rooms[room_name]
+            self.player.inventory.clear()
+            self.player.inventory.update(inventory)
+            self.player.mark_saved()
+
+            # Load this player's saved room items, these now match the database
+            for name, item in room_items.items():
+                room = self.rooms.get(name)
+                if room:
+                    room.item = item
+                    room.dirty.discard('item')
+                    if not room.dirty:
+                        self.dirty_rooms.pop(name, None)
+            if self.journal is not None:
+                self.journal.loaded(room_items)
+
+            # Record this load in log table
+            self.log_action("load", f"Game loaded at {self.player.current_room.name}")
+            return "Game loaded from database."
+        except sqlite3.Error as e:
+            return f"Error loading game: {e}"
+
+    def save_to_file(self, path):
+        # Save player and room item state to a binary save file (see savefile.py)
+        from savefile import write_save
+        try:
+            write_save(path, self)
+        except OSError as e:
+            return f"Error saving game: {e}"
+        self.record('save')
+        self.log_action("save", f"Game saved to {path} at {self.player.current_room.name}")
+        return f"Game saved to {path}."
+
+    def load_from_file(self, path):
+        # Load state from a binary save file; changed rooms are written to the database on the next save
+        from savefile import read_save
+        try:
+            room_items = read_save(path, self)
+        except (OSError, ValueError) as e:
+            return f"Error loading game: {e}"
+        if self.journal is not None:
+            self.journal.loaded(room_items)
+        self.log_action("load", f"Game loaded from {path} at {self.player.current_room.name}")
+        return f"Game loaded from {path}."
+
+    def record(self, kind, data=None):
+        # Add a state change to the session journal, if the game keeps one
+        if self.journal is not None:
+            self.journal.record(kind, data)
+
+    def track_player_change(self, player, kind, data):
+        # Player.on_change callback while journaling: moves and pickups from any caller
+        self.record(kind, data)
+
+    def log_action(self, action, details):
+        # Log player actions to database. Rows are queued and written in batches off the GUI thread.
+        try:
+            self.storage.log(self.player.id, action, details)
+        except sqlite3.Error as e:
+            print(f"Error logging action: {e}")
+
+    def flush_logs(self):
+        # Wait until queued log rows are in the database
+        self.storage.flush_logs()
+
+    def track_room_change(self, room, field):
+        # Room.on_change callback; collect changed rooms so saves never scan the whole map
+        if field == 'required_items':
+            if self._router is not None:
+                self._router.requirements_changed()
+            self._planner = None
+            return
+        if field == 'item' and self._lookup is not None:
+            self._lookup.update_item(room)
+        self.dirty_rooms[room.name] = room
+
+    def clear_dirty_rooms(self):
+        for room in self.dirty_rooms.values():
+            room.dirty.clear()
+        self.dirty_rooms.clear()
+
+    def close(self):
+        # Release database connections held by this game
+        if self.journal is not None:
+            self.journal.flush()
+        if self._charts is not None:
+            self._charts.close()
+        if self._owns_storage:
+            self.storage.close()
+
+    def setup_rooms(self):
+        # Initialize rooms and exits
+        rooms_data = {
+            'Rec Room': {'item': None, 'required_items': set()},
+            'Decontamination': {'item': 'Empty Laser Weapon', 'required_items': set()},
+            'Terrarium': {'item': 'The Alien!', 'required_items': set()},
+            'Lab': {'item': 'Recording', 'required_items': set()},
+            'Med Bay': {'item': 'Medical Supplies', 'required_items': {'MKIV Suit', 'MKV Helmet'}},
+            'Cargo Hold': {'item': 'MKIV Suit', 'required_items': set()},
+            'Sleeping Quarters': {'item': 'Artifact', 'required_items': set()},
+            'Bathroom': {'item': 'MKV Helmet', 'required_items': set()},
+            'Mess Hall': {'item': 'Ammo', 'required_items': set()},
+            'Water Treatment': {'item': 'Shield Charge', 'required_items': set()}
+        }
+
+        for name, data in rooms_data.items():
+            self.rooms[name] = Room(name, data['item'], data['required_items'])
+            self.rooms[name].on_change = self.track_room_change
+
+        self.room_positions = {
+            'Rec Room': (400, 140),
+            'Sleeping Quarters': (400, 40),
+            'Decontamination': (400, 240),
+            'Terrarium': (400, 330),
+            'Mess Hall': (550, 140),
+            'Bathroom': (550, 40),
+            'Water Treatment': (550, 240),
+            'Med Bay': (250, 140),
+            'Lab': (250, 240),
+            'Cargo Hold': (250, 40)
+        }
+
+        exits = {
+            'Rec Room': {'north': 'Sleeping Quarters', 'south': 'Decontamination',
+                         'east': 'Mess Hall', 'west': 'Med Bay'},
+            'Decontamination': {'north': 'Rec Room', 'south': 'Terrarium',
+                                'east': 'Water Treatment', 'west': 'Lab'},
+            'Terrarium': {'north': 'Decontamination'},
+            'Lab': {'north': 'Med Bay', 'east': 'Decontamination'},
+            'Med Bay': {'north': 'Cargo Hold', 'south': 'Lab', 'east': 'Rec Room'},
+            'Cargo Hold': {'south': 'Med Bay', 'east': 'Sleeping Quarters'},
+            'Sleeping Quarters': {'south': 'Rec Room', 'east': 'Bathroom', 'west': 'Cargo Hold'},
+            'Bathroom': {'south': 'Mess Hall', 'west': 'Sleeping Quarters'},
+            'Mess Hall': {'north': 'Bathroom', 'south': 'Water Treatment', 'west': 'Rec Room'},
+            'Water Treatment': {'north': 'Mess Hall', 'west': 'Decontamination'}
+        }
+        for room_name, room_exits in exits.items():
+            for direction, target_room in room_exits.items():
+                self.rooms[room_name].add_exit(direction, self.rooms[target_room])
+
+    def load_world(self, source):
+        """ Build rooms, exits and positions from a world file path or from an iterable of
+            header and room records, such as worlds.generate_world. Records are consumed one
+            at a time; a room named by an exit before its own record is created empty and
+            filled in when the record arrives. Raises ValueError for malformed worlds. """
+        name = "Custom world"
+        if isinstance(source, str):
+            from worlds import read_world
+            name = os.path.basename(source)
+            source = read_world(source)
+        from worlds import WORLD_FORMAT, WORLD_VERSION
+        records = iter(source)
+        header = next(records, None)
+        if not header or header.get("format") != WORLD_FORMAT or header.get("version") != WORLD_VERSION:
+            raise ValueError("Not a Lost Lab world (bad or missing header).")
+        if self.compact:
+            from compactworld import CompactWorld
+            self.rooms = CompactWorld()
+            self.room_positions = self.rooms.positions
+            self.rooms.load(records)
+        else:
+            self._load_rooms(records)
+        rooms = self.rooms
+        for name in (header.get("start"), header.get("final_room")):
+            if name not in rooms:
+                raise ValueError(f"World has no room '{name}'.")
+        self.start_room = header["start"]
+        self.final_room = header["final_room"]
+        self.target_items = header.get("target_items", self.target_items)
+        self.world_name = header.get("name", name)
+        if self.compact:
+            rooms.on_change = self.track_room_change
+        else:
+            for room in rooms.values():
+                room.on_change = self.track_room_change
+
+    def _load_rooms(self, records):
+        # Room objects from records, see load_world
+        rooms = self.rooms
+        defined = set()
+        for record in records:
+            name = record["name"]
+            room = rooms.get(name)
+            if room is None:
+                room = rooms[name] = Room(name)
+            elif name in defined:
+                raise ValueError(f"Room '{name}' is defined twice.")
+            defined.add(name)
+            # Set before on_change is attached, so loading marks nothing dirty
+            room._item = record.get("item")
+            room.required_items = record.get("requires", ())
+            if "pos" in record:
+                self.room_positions[name] = tuple(record["pos"])
+            for direction, target_name in record.get("exits", {}).items():
+                target = rooms.get(target_name)
+                if target is None:
+                    target = rooms[target_name] = Room(target_name)
+                room.add_exit(direction, target)
+        if len(defined) != len(rooms):
+            missing = sorted(set(rooms) - defined)[:5]
+            raise ValueError(f"Exits lead to undefined rooms: {', '.join(missing)}.")
+
+    def show_instructions(self):
+        # Display Instructions
+        return (
+            'Collect all 8 items to win the game, or be prepared to face the Alien\n'
+            'Use the movement buttons to navigate: North, South, East, West\n'
+            'Enter the item name and click "Get Item" to add to inventory\n'
+            'Select a room from the dropdown and click "Find Path" for the shortest route\n'
+            'Enter a filename and click "Save" or "Load" to manage game state\n'
+            'Click "Exit" to quit'
+        )
+
+    def find_path(self, target_room):
+        """ Find the shortest path to a targeted room using Dijkstra algorithm
+            choice for Dijkstra is based on using weight but also to potentially add more complexity to the game later,
+            if added complexity was not in play a Breadth-First search may be a potentially better fit.
+            Returns a PathResult (rooms, cost, hazards), or None if the room does not exist. """
+        if target_room not in self.rooms:
+            return None
+        # Rooms the player lacks required items for (only Med Bay here) are weighted as hazards,
+        # routes are cached per hazard state in self.router
+        router = self.router  # Builds the graph, and with it imports networkx, on first use
+        import networkx as nx
+        try:
+            return router.route(self.player.current_room.name, target_room, self.player.inventory)
+        except nx.NodeNotFound:
+            return None
+
+    def path_message(self, route, target_room):
+        # Status text for a find_path result
+        if route is None:
+            return f"Room '{target_room}' does not exist."
+        if route.rooms is None:
+            return f"No path to {target_room}."
+        return f"Shortest path to {target_room}: {' -> '.join(route.rooms)}"
+
+    def shortest_path(self, target_room):
+        # Suggest the shortest path to a targeted room as status text
+        return self.path_message(self.find_path(target_room), target_room)
+
+    def plan_route(self):
+        # Shortest walk from here that collects the items still needed and ends in the final room,
+        # as a planner.Plan, or None if the game can no longer be won
+        if self._planner is None:
+            self._planner = RoutePlanner(self.rooms, self.final_room)
+        return self._planner.plan(self.player.current_room.name, self.player.inventory, self.target_items)
+
+    def hint(self):
+        # Next few commands of the planned route as status text
+        plan = self.plan_route()
+        if plan is None:
+            return "No route left that wins the game."
+        if not plan.commands:
+            return "Hint: you are already there."
+        return f"Hint: {', '.join(plan.commands[:HINT_LENGTH])}"
+
+    def check_victory(self):
+        # Check if the player has won (8 items and in Terrarium)
+        if (
+                len(self.player.inventory) == self.target_items
+                and self.player.current_room.name == self.final_room
+        ):
+            self.end_game('win', "Player defeated the Alien with all items!")
+            return True
+        return False
+
+    def check_defeat(self):
+        # Check if the player has lost (less than 8 items in Terrarium)
+        if (
+                len(self.player.inventory) != self.target_items
+                and self.player.current_room.name == self.final_room
+        ):
+            self.end_game('lose', "Player was defeated by the Alien!")
+            return True
+        return False
+
+    def end_game(self, outcome, details):
+        # Log and journal the outcome the first time the game ends; later checks leave it be
+        if self.outcome is None:
+            self.outcome = outcome
+            self.log_action(outcome, details)
+            self.record(outcome)
+
+    def handle_command(self, action):
+        """ Run one player command and return a CommandResult(message, events, route).
+            Commands: north/south/east/west, get <item>, path <room>, where <item>, save, load, hint.
+            Room and item names are matched ignoring case; path also takes a unique prefix.
+            Raises ValueError for invalid input so front ends can show it as status text. """
+        return self.commands.dispatch(self, action)
+
+    def handle_commands(self, script):
+        # Run a batch such as "north;north;get Ammo" and return its CommandResults, see commands.py
+        return self.commands.dispatch_batch(self, script)
+
+    def resolve_room(self, text):
+        # Room name for user input: exact match ignoring case, else a unique prefix, else text itself
+        name = self.lookup.room_name(text)
+        if name is None:
+            matches = self.lookup.complete_room(text, limit=2)
+            if len(matches) == 1 and normalize(matches[0]).startswith(normalize(text)):
+                name = matches[0]
+        return name or text
+
+    def suggestion(self, names):
+        return f" Did you mean {', '.join(names)}?" if names else ""
+
+    def where_is(self, text):
+        # Status text saying which rooms hold an item
+        item = self.lookup.item_name(text)
+        if item is None:
+            return f"There is no item called '{text}'." + self.suggestion(self.lookup.complete_item(text))
+        if item in self.player.inventory:
+            return f"You are carrying {item}."
+        rooms = self.lookup.rooms_with_item(item)
+        if not rooms:
+            return f"{item} is nowhere to be found."
+        return f"{item} is in {', '.join(rooms)}."
+
+    def collect_events(self):
+        # Drain player events and add the outcome, if the game just ended
+        events, self.player.events = self.player.events, []
+        if self.outcome is not None:
+            return events
+        if self.check_victory():
+            events.append(Event("victory", "Victory", "You did it! You have conquered the Alien!"))
+        elif self.check_defeat():
+            events.append(Event("defeat", "Defeat", "You were not prepared! The Alien has defeated you!"))
+        return events
+
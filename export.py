@@ -0,0 +1,287 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from urllib.request import pathname2url
+
+from storage import DEFAULT_DB_PATH, shard_paths, shard_player_id
+
+# Offline export of player history. Tables are read through one cursor each in fetchmany
+# chunks, so memory stays at one chunk however many rows there are. logs is exported
+# incrementally: every run appends the rows after the logs.id recorded in the checkpoint.
+# The other tables are small and change in place, so each run rewrites them in full. Position,
+# inventory and room items are kept per player and world (see storage.py), so they are exported
+# with their world_id; the worlds table gives each world's name.
+#
+# A sharded database (storage.ShardedStorage) is exported from all its shard files into one set
+# of files. Player, inventory and log ids become the ids the game uses (local id * shards +
+# shard), and world ids those of shard 0, which like every shard records every world. The
+# checkpoint then holds one logs.id per shard.
+#
+# Formats, one set of files per table in the output directory:
+#   csv      - <table>.csv with a header row
+#   jsonl    - <table>.jsonl, one JSON object per row
+#   columnar - <table>.columns/<column>.jsonl, one JSON value per line per column
+CHUNK_SIZE = 10000
+FORMATS = ('csv', 'jsonl', 'columnar')
+CHECKPOINT_FILE = "checkpoint.json"
+# Exported tables and their columns
+TABLES = {
+    'logs': ('id', 'player_id', 'action', 'details', 'created_at'),
+    'player': ('id', 'name', 'created_at'),
+    'worlds': ('id', 'name', 'created_at'),
+    'player_worlds': ('player_id', 'world_id', 'current_room'),
+    'inventory': ('id', 'player_id', 'world_id', 'item', 'acquired_at'),
+    'player_rooms': ('player_id', 'world_id', 'name', 'item'),
+}
+# Tables rewritten by every run and the order their rows are written in
+SNAPSHOT_ORDER = {
+    'player': 'id',
+    'worlds': 'id',
+    'player_worlds': 'player_id, world_id',
+    'inventory': 'id',
+    'player_rooms': 'player_id, world_id, name',
+}
+# Columns holding player-style ids, which shards number locally
+SHARDED_IDS = {
+    'logs': ('id', 'player_id'),
+    'player': ('id',),
+    'player_worlds': ('player_id',),
+    'inventory': ('id', 'player_id'),
+    'player_rooms': ('player_id',),
+}
+SELECT_LOGS_AFTER = "SELECT id, player_id, action, details, created_at FROM logs WHERE id > ? ORDER BY id"
+SELECT_WORLDS = "SELECT id, name FROM worlds"
+HAS_PLAYER_WORLDS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_worlds'"
+
+# Rows written per table by one export run, and the logs.id the checkpoint now holds (a list
+# with one per shard for sharded databases)
+ExportReport = namedtuple('ExportReport', ['rows', 'last_log_id'])
+
+
+class TableWriter:
+    """ Appends chunks of rows for one table to its file(s).
+
+        offsets maps each file to its size after the last completed chunk. Opening with
+        the offsets of a checkpoint truncates anything written after it, so rows from an
+        interrupted run are never exported twice. """
+
+    def __init__(self, directory, table, columns, offsets=None):
+        self.columns = columns
+        self.files = {}  # Path -> open file
+        for path in self.paths(directory, table, columns):
+            offset = (offsets or {}).get(os.path.basename(path), 0)
+            handle = open(path, "r+b" if offset else "wb")
+            handle.truncate(offset)
+            handle.seek(offset)
+            self.files[path] = handle
+        self.new = not offsets
+
+    def paths(self, directory, table, columns):
+        raise NotImplementedError
+
+    def write(self, rows):
+        raise NotImplementedError
+
+    def offsets(self):
+        # Flush and return {file name: size}
+        sizes = {}
+        for path, handle in self.files.items():
+            handle.flush()
+            sizes[os.path.basename(path)] = handle.tell()
+        return sizes
+
+    def close(self):
+        for handle in self.files.values():
+            handle.close()
+
+
+class CsvWriter(TableWriter):
+    def paths(self, directory, table, columns):
+        return [os.path.join(directory, f"{table}.csv")]
+
+    def write(self, rows):
+        # csv needs a text stream; wrap the binary file without taking ownership of it
+        handle = next(iter(self.files.values()))
+        text = _TextAppender(handle)
+        writer = csv.writer(text)
+        if self.new:
+            writer.writerow(self.columns)
+            self.new = False
+        writer.writerows(rows)
+
+
+class JsonlWriter(TableWriter):
+    def paths(self, directory, table, columns):
+        return [os.path.join(directory, f"{table}.jsonl")]
+
+    def write(self, rows):
+        handle = next(iter(self.files.values()))
+        columns = self.columns
+        handle.write("".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8"))
+
+
+class ColumnarWriter(TableWriter):
+    def paths(self, directory, table, columns):
+        folder = os.path.join(directory, f"{table}.columns")
+        os.makedirs(folder, exist_ok=True)
+        return [os.path.join(folder, f"{column}.jsonl") for column in columns]
+
+    def write(self, rows):
+        for index, handle in enumerate(self.files.values()):
+            handle.write("".join(json.dumps(row[index]) + "\n" for row in rows).encode("utf-8"))
+
+
+class _TextAppender:
+    # Minimal text file for csv.writer on top of a binary file
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, text):
+        self.handle.write(text.encode("utf-8"))
+
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonlWriter, 'columnar': ColumnarWriter}
+
+
+def read_checkpoint(directory):
+    # Return the checkpoint dict of an export directory, or None before the first export
+    try:
+        with open(os.path.join(directory, CHECKPOINT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(directory, checkpoint):
+    # Replace the checkpoint atomically so a crash leaves the previous one intact
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def stream(cursor, chunk_size=CHUNK_SIZE):
+    # Yield lists of up to chunk_size rows from an executed cursor
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def game_ids(table, rows, index, count, world_ids):
+    # Rows of shard index of count with the ids the game uses; world_ids maps the shard's
+    # world ids to those of shard 0
+    columns = TABLES[table]
+    sharded = [columns.index(column) for column in SHARDED_IDS.get(table, ())]
+    world = columns.index('world_id') if 'world_id' in columns else None
+    mapped = []
+    for row in rows:
+        row = list(row)
+        for position in sharded:
+            if row[position] is not None:
+                row[position] = shard_player_id(row[position], index, count)
+        if world is not None:
+            row[world] = world_ids[row[world]]
+        mapped.append(tuple(row))
+    return mapped
+
+
+def open_shards(db_path, shards):
+    # Read-only connections to db_path, or to each of its shard files
+    paths = shard_paths(db_path, shards) if shards > 1 else [db_path]
+    if shards == 1 and not os.path.exists(db_path) and os.path.exists(shard_paths(db_path, 1)[0]):
+        raise ValueError(f"{db_path} is sharded; export it with its shard count.")
+    connections = []
+    try:
+        for path in paths:
+            if not os.path.exists(path):
+                raise ValueError(f"Missing database file {path}.")
+            # Read only, so an export can never write to a live game database
+            conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+            connections.append(conn)
+            if conn.execute(HAS_PLAYER_WORLDS).fetchone() is None:
+                raise ValueError(f"{path} predates per-world player state; open it with the game once to upgrade it.")
+    except Exception:
+        for conn in connections:
+            conn.close()
+        raise
+    return connections
+
+
+def export(db_path, directory, fmt='csv', chunk_size=CHUNK_SIZE, shards=1):
+    """ Export logs and the player tables (see TABLES) from db_path, or from its shards files,
+        into directory and return an ExportReport. logs resumes after the checkpointed logs.id,
+        which advances after every chunk; an export directory keeps the format and shard count
+        of its first export. """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from {', '.join(FORMATS)}.")
+    os.makedirs(directory, exist_ok=True)
+    checkpoint = read_checkpoint(directory) or {"format": fmt, "logs_id": 0 if shards == 1 else [0] * shards,
+                                                "offsets": {}}
+    if checkpoint["format"] != fmt:
+        raise ValueError(f"{directory} holds a {checkpoint['format']} export; export {fmt} elsewhere.")
+    logs_ids = checkpoint["logs_id"] if isinstance(checkpoint["logs_id"], list) else [checkpoint["logs_id"]]
+    if len(logs_ids) != shards:
+        raise ValueError(f"{directory} holds an export of {len(logs_ids)} shard(s), not {shards}.")
+    writer_class = WRITERS[fmt]
+    rows = {}
+    connections = open_shards(db_path, shards)
+    try:
+        # Every shard records every world, so its world ids map to shard 0's by name
+        names = {name: world_id for world_id, name in connections[0].execute(SELECT_WORLDS)}
+        world_ids = [{world_id: names[name] for world_id, name in conn.execute(SELECT_WORLDS) if name in names}
+                     for conn in connections]
+        writer = writer_class(directory, 'logs', TABLES['logs'], checkpoint["offsets"])
+        try:
+            rows['logs'] = 0
+            for index, conn in enumerate(connections):
+                for chunk in stream(conn.execute(SELECT_LOGS_AFTER, (logs_ids[index],)), chunk_size):
+                    logs_ids[index] = chunk[-1][0]
+                    if shards > 1:
+                        chunk = game_ids('logs', chunk, index, shards, world_ids[index])
+                    writer.write(chunk)
+                    rows['logs'] += len(chunk)
+                    checkpoint["logs_id"] = logs_ids if shards > 1 else logs_ids[0]
+                    checkpoint["offsets"] = writer.offsets()
+                    write_checkpoint(directory, checkpoint)
+        finally:
+            writer.close()
+        for table, order in SNAPSHOT_ORDER.items():
+            columns = TABLES[table]
+            writer = writer_class(directory, table, columns)
+            try:
+                rows[table] = 0
+                for index, conn in enumerate(connections[:1] if table == 'worlds' else connections):
+                    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order}")
+                    for chunk in stream(cursor, chunk_size):
+                        if shards > 1:
+                            chunk = game_ids(table, chunk, index, shards, world_ids[index])
+                        writer.write(chunk)
+                        rows[table] += len(chunk)
+            finally:
+                writer.close()
+    finally:
+        for conn in connections:
+            conn.close()
+    write_checkpoint(directory, checkpoint)  # Also records the format of an export without logs
+    return ExportReport(rows, checkpoint["logs_id"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export Lost Lab player history for offline analysis.")
+    parser.add_argument("directory", help="output directory; exporting again appends new log rows")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default='csv')
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows fetched per chunk")
+    parser.add_argument("--shards", type=int, default=1, help="shard count of a sharded database")
+    args = parser.parse_args()
+    report = export(args.db, args.directory, args.format, args.chunk_size, args.shards)
+    for table, count in report.rows.items():
+        print(f"{table}: {count} rows")
+    print(f"Checkpoint at logs.id {report.last_log_id}.")
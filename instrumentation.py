@@ -0,0 +1,287 @@
+import cProfile
+import importlib
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+# Optional timing of the game's hot paths. Nothing is timed until enable() swaps timed
+# wrappers in for the methods in TARGETS, and disable() puts the original functions back,
+# so a process that never enables instrumentation runs exactly the code it always did.
+# Servers and simulations share the module-level metrics instance.
+TARGETS = (
+    ('engine', 'Player', 'move'),
+    ('engine', 'Player', 'take_item'),
+    ('engine', 'Game', 'shortest_path'),
+    ('engine', 'Game', 'find_path'),  # The route lookup behind shortest_path and the path command
+    ('engine', 'Game', 'save_to_db'),
+    ('engine', 'Game', 'load_from_db'),
+    ('engine', 'Game', 'log_action'),
+)
+PERCENTILES = (50, 90, 99)
+SUB_BUCKETS = 4  # Histogram buckets per power of two nanoseconds, so a bucket spans at most 25%
+PROFILE_MODES = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples
+
+
+def bucket_of(ns):
+    # Histogram bucket of a latency: exact below SUB_BUCKETS, then SUB_BUCKETS per doubling
+    if ns < SUB_BUCKETS:
+        return ns
+    shift = ns.bit_length() - 3
+    return shift * SUB_BUCKETS + (ns >> shift)
+
+
+def bucket_bounds(index):
+    # (lowest, highest + 1) latency in nanoseconds that falls in bucket index
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift, mantissa = index // SUB_BUCKETS - 1, index % SUB_BUCKETS + SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Histogram:
+    """ Call count, total, maximum and a log-bucketed latency histogram of one function.
+        Percentiles interpolate inside the bucket they fall in. """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0  # Nanoseconds
+        self.max = 0
+        self.buckets = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, ns):
+        with self._lock:
+            self.count += 1
+            self.total += ns
+            if ns > self.max:
+                self.max = ns
+            self.buckets[bucket_of(ns)] += 1
+
+    def percentile(self, percent):
+        # Approximate latency in nanoseconds below which percent of calls fell
+        if not self.count:
+            return 0
+        rank = percent / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            in_bucket = self.buckets[index]
+            if seen + in_bucket >= rank:
+                low, high = bucket_bounds(index)
+                return min(self.max, low + (high - low) * (rank - seen) / in_bucket)
+            seen += in_bucket
+        return self.max
+
+    def summary(self):
+        # Microsecond figures for reports and JSON replies
+        summary = {"count": self.count, "mean_us": self.total / self.count / 1000 if self.count else 0.0}
+        for percent in PERCENTILES:
+            summary[f"p{percent}_us"] = self.percentile(percent) / 1000
+        summary["max_us"] = self.max / 1000
+        return summary
+
+    def snapshot(self):
+        # Plain data that can cross processes and be merged back (see merge)
+        return {"count": self.count, "total": self.total, "max": self.max, "buckets": sorted(self.buckets.items())}
+
+    def merge(self, snapshot):
+        with self._lock:
+            self.count += snapshot["count"]
+            self.total += snapshot["total"]
+            self.max = max(self.max, snapshot["max"])
+            self.buckets.update(dict(snapshot["buckets"]))
+
+
+class Instrumentation:
+    """ Histograms by function name ("Player.move") and the switch that installs them. """
+
+    def __init__(self):
+        self.histograms = {}
+        self._originals = {}  # (class, attribute) -> function replaced by a timed wrapper
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def histogram(self, name):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            return histogram
+
+    def enable(self, targets=TARGETS):
+        # Wrap each (module, class, method) target; already wrapped targets are left alone
+        for module_name, class_name, attribute in targets:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            if (cls, attribute) in self._originals:
+                continue
+            function = cls.__dict__[attribute]
+            self._originals[(cls, attribute)] = function
+            setattr(cls, attribute, self._timed(f"{class_name}.{attribute}", function))
+
+    def disable(self):
+        # Put back the original functions; recorded histograms are kept
+        for (cls, attribute), function in self._originals.items():
+            setattr(cls, attribute, function)
+        self._originals.clear()
+
+    def _timed(self, name, function):
+        record = self.histogram(name).record
+        clock = time.perf_counter_ns
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(clock() - start)
+        return timed
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            with histogram._lock:
+                histogram.count = histogram.total = histogram.max = 0
+                histogram.buckets.clear()
+
+    def summary(self):
+        # {name: summary} of every function called at least once
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items()) if histogram.count}
+
+    def snapshot(self):
+        return {name: histogram.snapshot() for name, histogram in self.histograms.items() if histogram.count}
+
+    def merge(self, snapshot):
+        # Add counts from another process's snapshot
+        for name, data in snapshot.items():
+            self.histogram(name).merge(data)
+
+    def report(self):
+        # Text table of the summary, one row per function
+        summary = self.summary()
+        if not summary:
+            return "No instrumented calls recorded."
+        columns = ["count", "mean_us"] + [f"p{percent}_us" for percent in PERCENTILES] + ["max_us"]
+        lines = [f"{'function':<20}" + "".join(f"{column:>12}" for column in columns)]
+        for name, row in summary.items():
+            lines.append(f"{name:<20}{row['count']:>12}" + "".join(f"{row[column]:>12.1f}" for column in columns[1:]))
+        return "\n".join(lines)
+
+
+metrics = Instrumentation()
+
+
+class SamplingProfiler:
+    """ Counts which functions a thread is in, sampled every interval seconds from a
+        background thread. Much cheaper than cProfile on long commands, at the cost of
+        precision. Use as a context manager around the code to sample. """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = 0
+        self.own = Counter()  # (file, line, function) of the innermost frame
+        self.cumulative = Counter()  # Functions anywhere on the stack
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lostlab-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            self.own[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key not in seen:
+                    seen.add(key)
+                    self.cumulative[key] += 1
+                frame = frame.f_back
+
+    def report(self, limit=20):
+        lines = [f"{self.samples} samples every {self.interval * 1000:.1f} ms"]
+        for (filename, line, function), count in self.cumulative.most_common(limit):
+            lines.append(f"{count:>8} {count / (self.samples or 1):>7.1%}  {function} ({filename}:{line})")
+        return "\n".join(lines)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def profile_command(game, command, mode='cprofile', sort='cumulative', limit=20):
+    # Run one command under a profiler; returns (CommandResult, report text)
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'.")
+    if mode == 'sample':
+        with SamplingProfiler() as sampler:
+            result = game.handle_command(command)
+        return result, sampler.report(limit)
+    profiler = cProfile.Profile()
+    result = profiler.runcall(game.handle_command, command)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+    return result, stream.getvalue()
+
+
+class VerbProfile:
+    """ Profiles every dispatch of one verb in a command registry until removed, e.g. to
+        watch "path" on a live server. report() gives the profile of all runs so far. """
+
+    def __init__(self, registry, verb, mode='cprofile'):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'.")
+        self.registry = registry
+        self.spec = registry.specs[verb]
+        self.mode = mode
+        self.runs = 0
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else None
+        self.sampler = SamplingProfiler() if mode == 'sample' else None
+        handler = self.spec.handler
+
+        def profiled(game, verb, argument):
+            self.runs += 1
+            if self.profiler is not None:
+                return self.profiler.runcall(handler, game, verb, argument)
+            self.sampler.thread_id = threading.get_ident()
+            self.sampler.start()
+            try:
+                return handler(game, verb, argument)
+            finally:
+                self.sampler.stop()
+        registry.specs[verb] = self.spec._replace(handler=profiled)
+
+    def remove(self):
+        # Restore the verb's own handler
+        self.registry.specs[self.spec.verb] = self.spec
+
+    def report(self, sort='cumulative', limit=20):
+        if self.sampler is not None:
+            return self.sampler.report(limit)
+        stream = io.StringIO()
+        if self.runs:
+            pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return f"{self.spec.verb}: {self.runs} runs\n{stream.getvalue()}"
@@ -0,0 +1,147 @@
+from collections.abc import MutableSet
+
+NO_ITEMS = frozenset()
+
+
+class ItemRegistry:
+    # Maps item names to bit positions, in the order items are first seen
+    def __init__(self, items=()):
+        self.names = []
+        self.ids = {}
+        self._masks = {}  # Cached bitsets of frozen item sets, e.g. room requirements
+        for item in items:
+            self.item_id(item)
+
+    def item_id(self, item):
+        item_id = self.ids.get(item)
+        if item_id is None:
+            item_id = self.ids[item] = len(self.names)
+            self.names.append(item)
+        return item_id
+
+    def item_mask(self, items):
+        # Bitset of item names, registering any new ones
+        if isinstance(items, frozenset):
+            mask = self._masks.get(items)
+            if mask is None:
+                mask = self._masks[items] = self.item_mask(set(items))
+            return mask
+        mask = 0
+        for item in items:
+            mask |= 1 << self.item_id(item)
+        return mask
+
+    def item_set(self, mask):
+        # Item names in a bitset
+        if not mask:
+            return NO_ITEMS
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return frozenset(names)
+
+
+class BitsetInventory(MutableSet):
+    """ Set of item names stored as one integer, selected with Game(inventory='bitset').
+
+        Behaves like the set it replaces, so front ends, storage and the planner need no
+        changes. Gate checks are a single AND: missing() in Player.move, and required <= inventory
+        in routing and planning, which Python hands to __ge__ below. len is a popcount, and
+        operations between inventories of the same registry work on the bitsets directly.
+        Membership and len are Python methods here against C for set, so single lookups are
+        slower (see performance.measure_inventory_performance); the gain is in gate checks
+        and in set operations between inventories. """
+    __slots__ = ('registry', 'mask')
+
+    def __init__(self, registry, items=()):
+        self.registry = registry
+        self.mask = registry.item_mask(items) if items else 0
+
+    def _from_iterable(self, items):
+        # Used by the Set mixin operators for anything not handled on bitsets below
+        return BitsetInventory(self.registry, items)
+
+    def _same(self, other):
+        return isinstance(other, BitsetInventory) and other.registry is self.registry
+
+    def _with_mask(self, mask):
+        inventory = BitsetInventory(self.registry)
+        inventory.mask = mask
+        return inventory
+
+    def missing(self, room):
+        # Required items of room not in this inventory, as a frozenset (empty if it can be entered).
+        # Compact rooms already hold their requirements as a bitset of the same registry.
+        required = getattr(room, 'required_mask', None)
+        if required is None:
+            required = self.registry.item_mask(room.required_items)
+        return self.registry.item_set(required & ~self.mask)
+
+    def __contains__(self, item):
+        item_id = self.registry.ids.get(item)
+        return item_id is not None and self.mask >> item_id & 1 == 1
+
+    def __iter__(self):
+        return iter(self.registry.item_set(self.mask))
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def add(self, item):
+        self.mask |= 1 << self.registry.item_id(item)
+
+    def discard(self, item):
+        item_id = self.registry.ids.get(item)
+        if item_id is not None:
+            self.mask &= ~(1 << item_id)
+
+    def clear(self):
+        self.mask = 0
+
+    def update(self, items):
+        self.mask |= items.mask if self._same(items) else self.registry.item_mask(items)
+
+    def copy(self):
+        return self._with_mask(self.mask)
+
+    def __sub__(self, other):
+        if self._same(other):
+            return self._with_mask(self.mask & ~other.mask)
+        return super().__sub__(other)
+
+    def __and__(self, other):
+        if self._same(other):
+            return self._with_mask(self.mask & other.mask)
+        return super().__and__(other)
+
+    def __or__(self, other):
+        if self._same(other):
+            return self._with_mask(self.mask | other.mask)
+        return super().__or__(other)
+
+    def __ge__(self, other):
+        # Whether every item of other is held; room requirements are frozen, so their mask is cached
+        if isinstance(other, frozenset):
+            required = self.registry.item_mask(other)
+        elif self._same(other):
+            required = other.mask
+        else:
+            return super().__ge__(other)
+        return required & self.mask == required
+
+    def __le__(self, other):
+        if self._same(other):
+            return self.mask & other.mask == self.mask
+        return super().__le__(other)
+
+    def __eq__(self, other):
+        if self._same(other):
+            return self.mask == other.mask
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"BitsetInventory({sorted(self)!r})"
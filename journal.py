@@ -0,0 +1,130 @@
+import json
+from collections import namedtuple
+
+# Session journal: every state-changing command is appended as a small structured event,
+# and every so often the whole player state is stored as a snapshot. Rebuilding a session
+# loads the latest snapshot and replays only the events after it.
+#
+# Event kinds and their data:
+#   start - no data; a session began here, from the state in the snapshot that follows
+#   move - name of the room entered
+#   take - name of the item picked up (the room it came from is the current room)
+#   save, load, win, lose - no data. load is always followed by a snapshot, since the state
+#   it restored comes from the database rather than from earlier events.
+# Sequence numbers count per player, across sessions.
+EVENT_KINDS = ('start', 'move', 'take', 'save', 'load', 'win', 'lose')
+SNAPSHOT_INTERVAL = 100  # Events between periodic snapshots
+SNAPSHOT_AFTER = ('start', 'save', 'load')  # Kinds that are followed by a snapshot straight away
+
+JournalEvent = namedtuple('JournalEvent', ['seq', 'kind', 'data'])
+# What restore did: the sequence number of the snapshot it started from and the events replayed after it
+Replay = namedtuple('Replay', ['snapshot_seq', 'events'])
+
+
+class Journal:
+    """ Records a game's state changes to its storage and rebuilds state from them.
+
+        A snapshot holds the current room, the inventory and the rooms emptied by the
+        player. A snapshot is taken when a session starts, after every save and load, and
+        after every SNAPSHOT_INTERVAL events, so a replay never goes back further than that.
+        Events are handed to storage as they happen (batch_size=1). A Storage with its batched
+        log writer queues them with the log rows, so recording never waits on the disk and a
+        crash can lose the events of the last flush interval; with async_logs=False each
+        event is written before record returns. A larger batch_size keeps events back until
+        that many are pending. """
+
+    def __init__(self, game, snapshot_interval=SNAPSHOT_INTERVAL, batch_size=1):
+        self.game = game
+        self.storage = game.storage
+        self.player_id = game.player.id
+        self.snapshot_interval = snapshot_interval
+        self.batch_size = batch_size
+        self.seq = self.storage.last_journal_seq(self.player_id)
+        self.snapshot_seq = None
+        self.emptied = set()  # Names of rooms whose item the player took
+        self.pending = []  # Events not yet written
+
+    def start(self):
+        # Begin a new session, so replays never reach back into an older one
+        self.record('start')
+
+    def resume(self):
+        # Continue the player's last session, or start one if the player has no journal
+        if self.restore() is None:
+            self.start()
+
+    def record(self, kind, data=None):
+        # Append one event; writes and snapshots as the intervals say
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown journal event '{kind}'.")
+        self.seq += 1
+        self.pending.append(JournalEvent(self.seq, kind, data))
+        if kind == 'take':
+            self.emptied.add(self.game.player.current_room.name)
+        # No snapshot yet (start, resume or restore not called) means the events have no base state
+        if (kind in SNAPSHOT_AFTER or self.snapshot_seq is None
+                or self.seq - self.snapshot_seq >= self.snapshot_interval):
+            self.snapshot()
+        elif len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def loaded(self, room_items):
+        # The game loaded saved room items ({room: item}); rooms without an item count as emptied
+        rooms = self.game.rooms
+        self.emptied = {name for name in self.emptied if name not in room_items}
+        self.emptied.update(name for name, item in room_items.items() if item is None and name in rooms)
+        self.record('load')
+
+    def state(self):
+        player = self.game.player
+        return {"room": player.current_room.name, "inventory": sorted(player.inventory),
+                "emptied": sorted(self.emptied)}
+
+    def snapshot(self):
+        # Write pending events and a snapshot of the state after them
+        self.flush()
+        self.storage.save_snapshot(self.player_id, self.seq, json.dumps(self.state(), separators=(",", ":")))
+        self.snapshot_seq = self.seq
+
+    def flush(self):
+        if self.pending:
+            self.storage.append_journal(self.player_id, self.pending)
+            self.pending = []
+
+    def restore(self, upto=None):
+        """ Rebuild the player's state from the latest snapshot (at or before seq upto) and
+            the events after it, into a game just constructed on the same world. Game does
+            this for journal='resume'. Returns a Replay, or None if there is no snapshot. """
+        self.flush()
+        found = self.storage.latest_snapshot(self.player_id, upto)
+        if found is None:
+            return None
+        snapshot_seq, state = found
+        state = json.loads(state)
+        game = self.game
+        rooms = game.rooms
+        player = game.player
+        player.current_room = rooms[state["room"]]
+        player.inventory.clear()
+        player.inventory.update(state["inventory"])
+        self.emptied = set(state["emptied"])
+        for name in self.emptied:
+            rooms[name].item = None
+        self.snapshot_seq = snapshot_seq
+        replayed = 0
+        for seq, kind, data in self.storage.journal_after(self.player_id, snapshot_seq, upto):
+            if kind == 'move':
+                player.current_room = rooms[data]
+            elif kind == 'take':
+                player.inventory.add(data)
+                player.current_room.item = None
+                self.emptied.add(player.current_room.name)
+            replayed += 1
+        if upto is None:
+            self.seq = max(self.seq, snapshot_seq + replayed)
+        return Replay(snapshot_seq, replayed)
+
+    def history(self, after=0, upto=None):
+        # Recorded events of this player as JournalEvents, for audits
+        self.flush()
+        return [JournalEvent(*row) for row in self.storage.journal_after(self.player_id, after, upto)]
@@ -0,0 +1,86 @@
+import difflib
+from bisect import bisect_left
+
+
+def normalize(text):
+    # Lookup key for user input: casefolded with runs of whitespace collapsed
+    return " ".join(text.casefold().split())
+
+
+def _complete(keys, canonical, key, limit):
+    # Names whose key starts with key (a range of the sorted keys), else close fuzzy matches
+    start = bisect_left(keys, key)
+    matches = []
+    for found in keys[start:start + limit]:
+        if not found.startswith(key):
+            break
+        matches.append(canonical[found])
+    if not matches and key:
+        matches = [canonical[found] for found in difflib.get_close_matches(key, keys, n=limit)]
+    return matches
+
+
+class NameIndex:
+    """ Case-insensitive lookup of rooms and items, built once per world (Game.lookup).
+
+        Room and item names are keyed by normalize(), so "go to room Y" and "where is item X"
+        are dict lookups rather than scans over Game.rooms. Completion uses the sorted keys:
+        prefix matches are a binary search, and only input that matches no prefix falls back
+        to fuzzy matching with difflib, which does scan.
+
+        Items move when they are picked up, so the game calls update_item for rooms whose
+        item changed. """
+
+    def __init__(self, rooms, held_items=()):
+        # held_items: items already taken out of rooms, e.g. a loaded inventory
+        self.rooms = {}  # Room key -> room name
+        self.items = {}  # Item key -> item name
+        self.item_rooms = {}  # Item key -> names of the rooms holding it
+        self._room_item = {}  # Room name -> key of the item it is indexed under
+        for name, room in rooms.items():
+            self.rooms[normalize(name)] = name
+            if room.item is not None:
+                self._add_item(name, room.item)
+        for item in held_items:
+            self.items.setdefault(normalize(item), item)
+        self._room_keys = sorted(self.rooms)
+        self._item_keys = None  # Sorted when first completed, items are added as they appear
+
+    def _add_item(self, room_name, item):
+        key = normalize(item)
+        if key not in self.items:
+            self.items[key] = item
+            self._item_keys = None
+        self.item_rooms.setdefault(key, set()).add(room_name)
+        self._room_item[room_name] = key
+
+    def update_item(self, room):
+        # Re-index a room after its item changed
+        key = self._room_item.pop(room.name, None)
+        if key is not None:
+            holders = self.item_rooms[key]
+            holders.discard(room.name)
+            if not holders:
+                del self.item_rooms[key]
+        if room.item is not None:
+            self._add_item(room.name, room.item)
+
+    def room_name(self, text):
+        # Name of the room text refers to, ignoring case and spacing, or None
+        return self.rooms.get(normalize(text))
+
+    def item_name(self, text):
+        # Name of the item text refers to, or None if no room has ever held it
+        return self.items.get(normalize(text))
+
+    def rooms_with_item(self, text):
+        # Sorted names of the rooms currently holding the item
+        return sorted(self.item_rooms.get(normalize(text), ()))
+
+    def complete_room(self, text, limit=5):
+        return _complete(self._room_keys, self.rooms, normalize(text), limit)
+
+    def complete_item(self, text, limit=5):
+        if self._item_keys is None:
+            self._item_keys = sorted(self.items)
+        return _complete(self._item_keys, self.items, normalize(text), limit)
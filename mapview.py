@@ -0,0 +1,262 @@
+# Map drawing for the Tkinter front end. Nothing here imports tkinter: MapView only calls
+# Canvas methods, so it works with any object that has them (tests use a fake canvas).
+ROOM_RADIUS = 40  # World units, as in the original fixed-size map
+ROOM_COLOR = "#616161"
+PLAYER_COLOR = "#2196F3"
+# Level of detail by zoom scale: (minimum scale, name). Full draws labelled rooms and exits,
+# simple drops labels, dots drops exits and draws each room as a small square. When more than
+# MAX_VISIBLE_ROOMS would be drawn as dots, the view draws one square per occupied cell of the
+# spatial index instead ("cells").
+DETAIL_LEVELS = ((0.5, "full"), (0.15, "simple"), (0.0, "dots"))
+MAX_VISIBLE_ROOMS = 5000
+MIN_SCALE = 0.01
+MAX_SCALE = 4.0
+CULL_MARGIN = ROOM_RADIUS  # World units around the viewport still drawn, so rooms never pop at the edge
+
+
+class SpatialIndex:
+    """ Uniform grid over room positions: each room name is filed under the cell that
+        contains it, so a rectangle query only looks at the cells it overlaps. Built in one
+        pass over room_positions (a dict or a compact PositionTable). """
+
+    def __init__(self, positions, cell_size=400):
+        self.cell_size = cell_size
+        self.positions = positions
+        self.cells = {}
+        for name, (x, y) in positions.items():
+            self.cells.setdefault((int(x // cell_size), int(y // cell_size)), []).append(name)
+
+    def cells_in(self, left, top, right, bottom):
+        # Keys of the occupied cells overlapping the rectangle
+        size = self.cell_size
+        return [(cx, cy) for cx in range(int(left // size), int(right // size) + 1)
+                for cy in range(int(top // size), int(bottom // size) + 1) if (cx, cy) in self.cells]
+
+    def span(self, left, top, right, bottom):
+        # (first column, first row, last column, last row) of the cells the rectangle overlaps
+        size = self.cell_size
+        return int(left // size), int(top // size), int(right // size), int(bottom // size)
+
+    def rooms_in(self, left, top, right, bottom):
+        # Names of every room filed in a cell the rectangle overlaps, inside the rectangle or not
+        col1, row1, col2, row2 = self.span(left, top, right, bottom)
+        cells = self.cells
+        return [name for cx in range(col1, col2 + 1) for cy in range(row1, row2 + 1)
+                for name in cells.get((cx, cy), ())]
+
+    def query(self, left, top, right, bottom):
+        # Names of the rooms whose position lies inside the rectangle
+        size = self.cell_size
+        positions = self.positions
+        found = []
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                for name in self.cells.get((cx, cy), ()):
+                    x, y = positions[name]
+                    if left <= x <= right and top <= y <= bottom:
+                        found.append(name)
+        return found
+
+    def bounds(self):
+        # (left, top, right, bottom) of all positions, or None without any
+        if not self.cells:
+            return None
+        xs = [x for x, _ in self.positions.values()]
+        ys = [y for _, y in self.positions.values()]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class MapView:
+    """ Viewport over the map on a canvas, drawing only what is visible.
+
+        The view maps world positions to the canvas with screen = (world - origin) * scale.
+        render() draws the rooms of every index cell the viewport overlaps and the exits
+        leaving them; rooms and exits already on the canvas are moved rather than recreated,
+        and ones whose cells left the viewport are deleted. A change of detail level redraws.
+        Scrolling within the same cells translates everything with one canvas.move, since
+        nothing can come into view that is not drawn already. After a move only the old and
+        new room ovals are recoloured (move_player). """
+
+    def __init__(self, game, canvas, width, height, cell_size=400):
+        self.game = game
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.index = SpatialIndex(game.room_positions, cell_size)
+        self.scale = 1.0
+        self.origin = (0.0, 0.0)
+        self.detail = None
+        self.span = None  # Index cells (see SpatialIndex.span) drawn by the last render
+        self.rooms = {}  # Room name -> (shape id, label id or None) of drawn rooms
+        self.cells = {}  # Index cell -> square id, at the "cells" detail level
+        self.exits = {}  # (name, name) sorted pair -> line id of drawn exits
+        self.current = game.player.current_room.name
+        self.label_size = None  # Font size of drawn labels, follows the zoom
+        self.items_created = 0  # Canvas items created, for measuring redraw cost
+
+    def to_screen(self, x, y):
+        ox, oy = self.origin
+        return (x - ox) * self.scale, (y - oy) * self.scale
+
+    def to_world(self, x, y):
+        ox, oy = self.origin
+        return x / self.scale + ox, y / self.scale + oy
+
+    def viewport(self):
+        # Visible world rectangle, widened by CULL_MARGIN
+        left, top = self.to_world(0, 0)
+        right, bottom = self.to_world(self.width, self.height)
+        return left - CULL_MARGIN, top - CULL_MARGIN, right + CULL_MARGIN, bottom + CULL_MARGIN
+
+    def detail_level(self):
+        return next(name for minimum, name in DETAIL_LEVELS if self.scale >= minimum)
+
+    # Navigation, each followed by a render (scroll only when it reaches other cells)
+    def scroll(self, dx, dy):
+        # Move the view by dx, dy canvas pixels; only re-render when it reaches other cells
+        ox, oy = self.origin
+        self.origin = (ox + dx / self.scale, oy + dy / self.scale)
+        if self.detail is None or self.index.span(*self.viewport()) != self.span:
+            self.render()
+            return
+        self.canvas.move("map", -dx, -dy)
+
+    def zoom(self, factor, x=None, y=None):
+        # Zoom by factor around canvas point x, y (default the centre), which stays in place
+        x = self.width / 2 if x is None else x
+        y = self.height / 2 if y is None else y
+        wx, wy = self.to_world(x, y)
+        self.scale = min(MAX_SCALE, max(MIN_SCALE, self.scale * factor))
+        self.origin = (wx - x / self.scale, wy - y / self.scale)
+        self.render()
+
+    def center_on(self, name):
+        x, y = self.game.room_positions[name]
+        self.origin = (x - self.width / 2 / self.scale, y - self.height / 2 / self.scale)
+        self.render()
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        self.render()
+
+    def is_visible(self, name):
+        x, y = self.to_screen(*self.game.room_positions[name])
+        return 0 <= x <= self.width and 0 <= y <= self.height
+
+    def render(self):
+        # Bring the canvas in line with the viewport
+        detail = self.detail_level()
+        viewport = self.viewport()
+        visible = self.index.rooms_in(*viewport)
+        if detail == "dots" and len(visible) > MAX_VISIBLE_ROOMS:
+            detail = "cells"
+        if detail != self.detail:
+            self.clear()
+            self.detail = detail
+        self.span = self.index.span(*viewport)
+        if detail == "cells":
+            self._render_cells(self.index.cells_in(*viewport))
+            return
+        visible_set = set(visible)
+        for name in [name for name in self.rooms if name not in visible_set]:
+            for item in self.rooms.pop(name):
+                if item is not None:
+                    self.canvas.delete(item)
+        wanted = set()
+        if detail != "dots":
+            for name in visible:
+                for target in self._exit_names(name):
+                    wanted.add((name, target) if name < target else (target, name))
+        for pair in [pair for pair in self.exits if pair not in wanted]:
+            self.canvas.delete(self.exits.pop(pair))
+        for pair in wanted:
+            self._draw_exit(pair)
+        label_size = max(6, int(10 * min(self.scale, 1.5)))
+        resize_labels, self.label_size = label_size != self.label_size, label_size
+        for name in visible:
+            self._draw_room(name, resize_labels)
+        if self.exits:
+            self.canvas.tag_lower("exit")
+
+    def clear(self):
+        self.span = None
+        self.canvas.delete("map")
+        self.rooms.clear()
+        self.exits.clear()
+        self.cells.clear()
+
+    def _render_cells(self, keys):
+        # One square per occupied index cell, sized to the cell
+        wanted = set(keys)
+        for key in [key for key in self.cells if key not in wanted]:
+            self.canvas.delete(self.cells.pop(key))
+        size = self.index.cell_size
+        for key in keys:
+            x1, y1 = self.to_screen(key[0] * size, key[1] * size)
+            x2, y2 = self.to_screen((key[0] + 1) * size, (key[1] + 1) * size)
+            square = self.cells.get(key)
+            if square is not None:
+                self.canvas.coords(square, x1, y1, x2, y2)
+            else:
+                self.cells[key] = self.canvas.create_rectangle(x1, y1, x2, y2, fill=ROOM_COLOR, outline="",
+                                                               tags=("map", "cell"))
+                self.items_created += 1
+
+    def move_player(self, name):
+        # Recolour only the previous and the new current room
+        previous, self.current = self.current, name
+        if previous in self.rooms:
+            self.canvas.itemconfig(self.rooms[previous][0], fill=ROOM_COLOR)
+        if name in self.rooms:
+            self.canvas.itemconfig(self.rooms[name][0], fill=PLAYER_COLOR)
+        if name in self.game.room_positions and not self.is_visible(name):
+            self.center_on(name)
+
+    def _exit_names(self, name):
+        rooms = self.game.rooms
+        exit_names = getattr(rooms, 'exit_names', None)
+        if exit_names is not None:
+            return [target for _, target in exit_names(name)]
+        return [room.name for room in rooms[name].exits.values()]
+
+    def _draw_exit(self, pair):
+        positions = self.game.room_positions
+        if pair[0] not in positions or pair[1] not in positions:
+            return
+        coordinates = self.to_screen(*positions[pair[0]]) + self.to_screen(*positions[pair[1]])
+        line = self.exits.get(pair)
+        if line is not None:
+            self.canvas.coords(line, *coordinates)
+            return
+        width = 2 if self.detail == "full" else 1
+        self.exits[pair] = self.canvas.create_line(*coordinates, fill="white", width=width, tags=("map", "exit"))
+        self.items_created += 1
+
+    def _draw_room(self, name, resize_label=False):
+        x, y = self.to_screen(*self.game.room_positions[name])
+        radius = max(1.0, ROOM_RADIUS * self.scale) if self.detail != "dots" else 1.5
+        fill = PLAYER_COLOR if name == self.current else ROOM_COLOR
+        drawn = self.rooms.get(name)
+        if drawn is not None:
+            shape, label = drawn
+            self.canvas.coords(shape, x - radius, y - radius, x + radius, y + radius)
+            if label is not None:
+                self.canvas.coords(label, x, y)
+                if resize_label:
+                    self.canvas.itemconfig(label, font=("Segoe UI", self.label_size, "bold"))
+            return
+        if self.detail == "dots":
+            shape = self.canvas.create_rectangle(x - radius, y - radius, x + radius, y + radius,
+                                                 fill=fill, outline="", tags=("map", "room"))
+            self.rooms[name] = (shape, None)
+            self.items_created += 1
+            return
+        shape = self.canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill=fill,
+                                        outline="white", width=2 if self.detail == "full" else 1,
+                                        tags=("map", "room"))
+        label = None
+        if self.detail == "full":
+            label = self.canvas.create_text(x, y, text=name, font=("Segoe UI", self.label_size, "bold"),
+                                            fill="white", tags=("map", "label"))
+        self.rooms[name] = (shape, label)
+        self.items_created += 2 if label is not None else 1
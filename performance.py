@@ -1,20 +1,51 @@
+import os
+import random
+import tempfile
+import threading
+import time
 import timeit
-from LostLabEnhanced import Player, Room, Game
+import tracemalloc
+from LostLabEnhanced import Room, Game
+from routing import PathCache, RoutingTable
+from storage import ShardedStorage
+from worldgraph import VersionedGraph
+from worlds import generate_world, write_world
 
 
 def measure_inventory_performance():
     setup = '''
 from LostLabEnhanced import Player, Room
+from inventory import BitsetInventory, ItemRegistry
 player_list = Player(Room("Test"), 1)
 player_set = Player(Room("Test"), 1)
+player_bitset = Player(Room("Test"), 1, BitsetInventory(ItemRegistry()))
 player_list.inventory = ["Item" + str(i) for i in range(1000)]
 player_set.inventory = {"Item" + str(i) for i in range(1000)}
+player_bitset.inventory = {"Item" + str(i) for i in range(1000)}
 '''
     list_time = timeit.timeit('"Item999" in player_list.inventory', setup=setup, number=10000)
     set_time = timeit.timeit('"Item999" in player_set.inventory', setup=setup, number=10000)
+    bitset_time = timeit.timeit('"Item999" in player_bitset.inventory', setup=setup, number=10000)
+    # Win check: item count of a full inventory
+    set_count_time = timeit.timeit('len(player_set.inventory) == 1000', setup=setup, number=10000)
+    bitset_count_time = timeit.timeit('len(player_bitset.inventory) == 1000', setup=setup, number=10000)
+    # Gate check as routing and planning do it: a room's frozen requirements against the inventory
+    gate = 'required <= player_{}.inventory'
+    gate_setup = setup + 'required = frozenset({"Item5", "Item900"})\n'
+    set_gate_time = timeit.timeit(gate.format('set'), setup=gate_setup, number=10000)
+    bitset_gate_time = timeit.timeit(gate.format('bitset'), setup=gate_setup, number=10000)
     print(f"List lookup time: {list_time:.6f} seconds")
     print(f"Set lookup time: {set_time:.6f} seconds")
-    return list_time, set_time
+    print(f"Bitset lookup time: {bitset_time:.6f} seconds")
+    print(f"Item count (set / bitset, 10000 runs): {set_count_time:.6f} / {bitset_count_time:.6f} seconds")
+    print(f"Gate check (set / bitset, 10000 runs): {set_gate_time:.6f} / {bitset_gate_time:.6f} seconds")
+    # Blocked rooms for a route query on a world with 8 gated rooms; a bitset inventory is looked up by mask
+    for backend in ("set", "bitset"):
+        game = Game(db_path=None, world=generate_world(30, 30, items=12, gated=8, seed=1), inventory=backend)
+        game.player.inventory.update(game.items.names[:6])
+        blocked_time = timeit.timeit(lambda: game.router.blocked_rooms(game.player.inventory), number=10000)
+        print(f"Blocked rooms, {backend} inventory (30x30, 8 gated, 10000 runs): {blocked_time:.6f} seconds")
+    return list_time, set_time, bitset_time
 
 
 def measure_shortest_path_performance():
@@ -35,22 +66,168 @@ game.player.inventory = {"MKIV Suit", "MKV Helmet"}
     return no_items_time, with_items_time
 
 
-def measure_hazard_check_performance():
+def measure_path_cache_performance():
     setup = '''
+from LostLabEnhanced import Game
+game = Game()
+game.player.current_room = game.rooms["Rec Room"]
+'''
+    # Cold: cache cleared before every lookup so each run is a full Dijkstra search
+    cold_time = timeit.timeit('game.router.invalidate(); game.shortest_path("Cargo Hold")',
+                              setup=setup, number=1000)
+    print(f"Shortest path (cache cleared, 1000 runs): {cold_time:.6f} seconds")
+    # Warm: same hazard state every run so lookups are cache hits
+    warm_time = timeit.timeit('game.shortest_path("Cargo Hold")', setup=setup, number=1000)
+    print(f"Shortest path (cached, 1000 runs): {warm_time:.6f} seconds")
+    return cold_time, warm_time
+
+
+def measure_routing_table_performance(size=30):
+    # Grid world with one gated room in the middle
+    rooms = {(x, y): Room(f"{x},{y}") for x in range(size) for y in range(size)}
+    graph = VersionedGraph()
+    graph.add_nodes_from(rooms)
+    graph.add_edges_from(((x, y), (x + 1, y)) for x in range(size - 1) for y in range(size))
+    graph.add_edges_from(((x, y), (x, y + 1)) for x in range(size) for y in range(size - 1))
+    rooms[(size // 2, size // 2)].required_items = {"Key"}
+    rng = random.Random(1)
+    namespace = {
+        'cache': PathCache(graph, rooms),
+        'table': RoutingTable(graph, rooms),
+        'sources': [rng.choice(list(rooms)) for _ in range(200)],
+        'targets': [rng.choice(list(rooms)) for _ in range(10)],
+    }
+    # Each source/target pair is new to the cache, while the table reuses one column per target
+    cache_time = timeit.timeit('for s in sources:\n    for t in targets: cache.shortest_path(s, t, set())',
+                               globals=namespace, number=1)
+    table_time = timeit.timeit('for s in sources:\n    for t in targets: table.shortest_path(s, t, set())',
+                               globals=namespace, number=1)
+    print(f"{size}x{size} grid, 2000 lookups, path cache: {cache_time:.6f} seconds")
+    print(f"{size}x{size} grid, 2000 lookups, routing table: {table_time:.6f} seconds")
+    print(f"Routing table memory: {namespace['table'].memory_usage()} bytes")
+    return cache_time, table_time
+
+
+def measure_hazard_check_performance():
+    # Gate check on a move west into Med Bay, for both inventory backends
+    results = []
+    for backend in ("set", "bitset"):
+        setup = f'''
 from LostLabEnhanced import Player, Room
-room = Room("Med Bay", item="Medical Supplies", required_items={"MKIV Suit", "MKV Helmet"})
-player = Player(room, 1)
+from inventory import BitsetInventory, ItemRegistry
+room = Room("Rec Room")
+room.add_exit("west", Room("Med Bay", item="Medical Supplies", required_items={{"MKIV Suit", "MKV Helmet"}}))
+player = Player(room, 1, BitsetInventory(ItemRegistry()) if "{backend}" == "bitset" else None)
 '''
-    # Measure hazard check without required items (sorting occurs)
-    no_items_time = timeit.timeit('player.move("west")', setup=setup, number=1000)
-    print(f"Hazard check (no items, 1000 runs): {no_items_time:.6f} seconds")
-    # Measure hazard check with required items (no sorting needed)
-    with_items_setup = setup + '''
+        # Measure hazard check without required items (sorting occurs)
+        no_items_time = timeit.timeit('player.move("west")', setup=setup, number=1000)
+        print(f"Hazard check, {backend} inventory (no items, 1000 runs): {no_items_time:.6f} seconds")
+        # Measure hazard check with required items (no sorting needed), moving back each run
+        with_items_setup = setup + '''
 player.inventory = {"MKIV Suit", "MKV Helmet"}
 '''
-    with_items_time = timeit.timeit('player.move("west")', setup=with_items_setup, number=1000)
-    print(f"Hazard check (with items, 1000 runs): {with_items_time:.6f} seconds")
-    return no_items_time, with_items_time
+        with_items_time = timeit.timeit('player.move("west"); player.current_room = room', setup=with_items_setup,
+                                        number=1000)
+        print(f"Hazard check, {backend} inventory (with items, 1000 runs): {with_items_time:.6f} seconds")
+        results.extend((no_items_time, with_items_time))
+    return tuple(results)
+
+
+def measure_world_load_performance(width=300, height=300):
+    # Generate a maze to disk, then stream it back into a game (no database)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "world.jsonl.gz")
+        start = time.perf_counter()
+        write_world(path, generate_world(width, height, items=12, gated=6))
+        generate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        game = Game(db_path=None, world=path)
+        load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    game.find_path(game.final_room)
+    path_time = time.perf_counter() - start
+    print(f"Generate and write {width * height} rooms: {generate_time:.6f} seconds")
+    print(f"Stream-load {len(game.rooms)} rooms: {load_time:.6f} seconds")
+    print(f"First path to the final room (builds the graph): {path_time:.6f} seconds")
+    return generate_time, load_time, path_time
+
+
+def measure_world_memory(width=300, height=300):
+    # Memory held by the rooms of a generated world, Room objects vs the compact store
+    records = list(generate_world(width, height))
+    results = []
+    for compact in (False, True):
+        tracemalloc.start()
+        start = time.perf_counter()
+        game = Game(db_path=None, world=records, compact=compact)
+        load_time = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        label = "compact store" if compact else "Room objects"
+        print(f"{label}: {used / len(game.rooms):.1f} bytes per room, loaded in {load_time:.6f} seconds")
+        results.append(used)
+        del game
+    return tuple(results)
+
+
+def measure_sharded_write_performance(shard_counts=(1, 2, 4), writers=8, saves=100):
+    # Concurrent writer threads, one player each, saving room and inventory changes.
+    # With one file every commit waits for the same SQLite write lock.
+    results = {}
+    rooms = Game(db_path=None).rooms
+    room_names = list(rooms)
+    for shards in shard_counts:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = ShardedStorage(os.path.join(tmpdir, "lostlab.db"), shards, pool_size=writers)
+            storage.init_schema()
+            world_id = storage.get_or_create_world("Lost Lab", rooms)
+            players = [storage.get_or_create_player(f"Writer {i}", "Rec Room", world_id) for i in range(writers)]
+            used = len({storage.route(player_id)[0] for player_id in players})
+
+            def write(player_id):
+                for i in range(saves):
+                    room = room_names[i % len(room_names)]
+                    storage.save_state(player_id, room, added=[f"Item {i}"], room_items=[(room, None)],
+                                       world_id=world_id)
+
+            threads = [threading.Thread(target=write, args=(player_id,)) for player_id in players]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            storage.close()
+        results[shards] = writers * saves / elapsed
+        print(f"{shards} shard(s), {used} in use: {results[shards]:.0f} saves per second "
+              f"({writers} writers x {saves} saves in {elapsed:.3f} seconds)")
+    return results
+
+
+def measure_save_file_performance(width=1000, height=1000):
+    # Binary save of a compact world of width x height rooms, written and loaded into a second game
+    with tempfile.TemporaryDirectory() as tmpdir:
+        world = os.path.join(tmpdir, "world.jsonl.gz")
+        write_world(world, generate_world(width, height, items=12, gated=6))
+        game = Game(db_path=None, world=world, compact=True)
+        restored = Game(db_path=None, world=world, compact=True)
+        # Pick up every item, as a long session would
+        for room_id, item_id in enumerate(game.rooms.room_items):
+            if item_id >= 0:
+                room = game.rooms.view(room_id)
+                game.player.inventory.add(room.item)
+                room.item = None
+        path = os.path.join(tmpdir, "hero.sav")
+        start = time.perf_counter()
+        game.save_to_file(path)
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        restored.load_from_file(path)
+        load_time = time.perf_counter() - start
+    print(f"Write {len(game.rooms)} rooms ({size / 1e6:.1f} MB): {write_time:.6f} seconds")
+    print(f"Load into a fresh game: {load_time:.6f} seconds")
+    return write_time, load_time
 
 
 if __name__ == '__main__':
@@ -58,5 +235,17 @@ if __name__ == '__main__':
     measure_inventory_performance()
     print("\nGraph Pathfinding Performance:")
     measure_shortest_path_performance()
+    print("\nPath Cache Performance:")
+    measure_path_cache_performance()
+    print("\nRouting Table Performance:")
+    measure_routing_table_performance()
     print("\nHazard Check Performance:")
     measure_hazard_check_performance()
+    print("\nWorld Load Performance:")
+    measure_world_load_performance()
+    print("\nWorld Memory:")
+    measure_world_memory()
+    print("\nSharded Write Performance:")
+    measure_sharded_write_performance()
+    print("\nBinary Save File Performance:")
+    measure_save_file_performance()
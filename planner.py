@@ -0,0 +1,196 @@
+import time
+from collections import deque, namedtuple
+
+INFINITY = float('inf')
+TIMED_OUT = object()  # Returned by the exact search when it runs past its time limit
+
+# A planned walk. commands are ready for Game.handle_command ('north', 'get Ammo', ...),
+# rooms is every room visited from start to the final room, items is the pickup order,
+# moves counts room-to-room steps, and optimal is False when the heuristic fallback was used.
+Plan = namedtuple('Plan', ['commands', 'rooms', 'items', 'moves', 'optimal'])
+
+
+class RoutePlanner:
+    """ Plan the shortest walk that collects the items needed to win and then enters the final room.
+
+        Exact planning is dynamic programming over subsets of collected items: best[mask][i] is the
+        fewest moves that collect the items in mask and end at item i. Gated rooms can only be
+        entered once their required items are in the collected subset, so walking distances are
+        computed per access state (the set of gated rooms the subset opens) by breadth-first search
+        over room exits, and cached. The final room is never walked through on the way.
+
+        Exact planning is O(2^k * k^2) for k items. If k is above max_items, the DP table would
+        exceed max_states entries, or the DP runs past time_limit seconds, the planner falls back
+        to nearest-item-first, which uses the same access-aware distances. """
+
+    def __init__(self, rooms, final_room, max_items=16, max_states=1 << 20, time_limit=0.5):
+        self.rooms = rooms
+        self.final_room = final_room
+        self.max_items = max_items
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self._searches = {}  # (access state, source room) -> (distances, parents)
+        self._gated = [room for room in rooms.values() if room.required_items]
+        self._gated_names = frozenset(room.name for room in self._gated)
+        # Compact worlds list exits by name straight from their exit arrays
+        self._exit_names = getattr(rooms, 'exit_names', self._room_exit_names)
+
+    def _room_exit_names(self, name):
+        return [(direction, room.name) for direction, room in self.rooms[name].exits.items()]
+
+    def access_state(self, inventory):
+        # Gated rooms this inventory can enter
+        return frozenset(room.name for room in self._gated if room.required_items <= inventory)
+
+    def _search(self, source, access):
+        # Breadth-first search from source through rooms the access state allows
+        key = (access, source)
+        found = self._searches.get(key)
+        if found is not None:
+            return found
+        distances = {source: 0}
+        parents = {source: None}
+        blocked = self._gated_names - access
+        exit_names = self._exit_names
+        frontier = deque([source])
+        while frontier:
+            name = frontier.popleft()
+            if name == self.final_room and name != source:
+                continue  # Entering the final room ends the game
+            for direction, next_name in exit_names(name):
+                if next_name in distances or next_name in blocked:
+                    continue
+                distances[next_name] = distances[name] + 1
+                parents[next_name] = (name, direction)
+                frontier.append(next_name)
+        self._searches[key] = (distances, parents)
+        return distances, parents
+
+    def distance(self, source, target, access):
+        return self._search(source, access)[0].get(target, INFINITY)
+
+    def _walk(self, source, target, access):
+        # Directions and rooms from source to target
+        parents = self._search(source, access)[1]
+        directions, rooms = [], []
+        name = target
+        while name != source:
+            rooms.append(name)
+            name, direction = parents[name]
+            directions.append(direction)
+        return directions[::-1], rooms[::-1]
+
+    def plan(self, start, inventory, target_items):
+        """ Plan from room name start with the given inventory until the inventory holds
+            target_items items, ending in the final room. Returns a Plan or None if impossible. """
+        inventory = frozenset(inventory)
+        need = target_items - len(inventory)
+        items = [(name, room.item) for name, room in self.rooms.items()
+                 if room.item is not None and name != self.final_room and room.item not in inventory]
+        if need < 0 or need > len(items):
+            return None
+        k = len(items)
+        if k <= self.max_items and (1 << k) * max(k, 1) <= self.max_states:
+            order = self._exact_order(start, inventory, items, need)
+            if order is not TIMED_OUT:
+                return None if order is None else self._build(start, inventory, items, order, optimal=True)
+        order = self._greedy_order(start, inventory, items, need)
+        if order is None:
+            return None
+        return self._build(start, inventory, items, order, optimal=False)
+
+    def _exact_order(self, start, inventory, items, need):
+        # Subset DP; returns the best pickup order, None if no order works, or TIMED_OUT
+        k = len(items)
+        deadline = time.perf_counter() + self.time_limit
+        names = [name for name, _ in items]
+        access_of = {}
+
+        def access(mask):
+            state = access_of.get(mask)
+            if state is None:
+                state = access_of[mask] = self.access_state(
+                    inventory | {items[i][1] for i in range(k) if mask >> i & 1})
+            return state
+
+        best = [[INFINITY] * k for _ in range(1 << k)]
+        previous = [[-1] * k for _ in range(1 << k)]
+        start_access = access(0)
+        for i in range(k):
+            best[1 << i][i] = self.distance(start, names[i], start_access)
+        finish, finish_cost = None, INFINITY
+        if need == 0:
+            finish_cost = self.distance(start, self.final_room, start_access)
+            finish = (0, -1) if finish_cost < INFINITY else None
+        for mask in range(1, 1 << k):
+            if mask & 0x3F == 0 and time.perf_counter() > deadline:
+                return TIMED_OUT
+            row = best[mask]
+            count = bin(mask).count("1")
+            if count > need:
+                continue
+            state = access(mask)
+            for i in range(k):
+                cost = row[i]
+                if cost == INFINITY:
+                    continue
+                if count == need:
+                    total = cost + self.distance(names[i], self.final_room, state)
+                    if total < finish_cost:
+                        finish_cost, finish = total, (mask, i)
+                    continue
+                for j in range(k):
+                    if mask >> j & 1:
+                        continue
+                    step = self.distance(names[i], names[j], state)
+                    if cost + step < best[mask | 1 << j][j]:
+                        best[mask | 1 << j][j] = cost + step
+                        previous[mask | 1 << j][j] = i
+        if finish is None:
+            return None
+        order = []
+        mask, i = finish
+        while i != -1:
+            order.append(i)
+            mask, i = mask & ~(1 << i), previous[mask][i]
+        return order[::-1]
+
+    def _greedy_order(self, start, inventory, items, need):
+        # Nearest reachable item first; None if the items or the final room cannot be reached
+        remaining = set(range(len(items)))
+        collected = set(inventory)
+        position = start
+        order = []
+        while len(order) < need:
+            access = self.access_state(collected)
+            nearest = min(remaining, key=lambda i: self.distance(position, items[i][0], access), default=None)
+            if nearest is None or self.distance(position, items[nearest][0], access) == INFINITY:
+                return None
+            order.append(nearest)
+            remaining.discard(nearest)
+            collected.add(items[nearest][1])
+            position = items[nearest][0]
+        if self.distance(position, self.final_room, self.access_state(collected)) == INFINITY:
+            return None
+        return order
+
+    def _build(self, start, inventory, items, order, optimal):
+        # Expand a pickup order into commands and visited rooms
+        commands, rooms = [], [start]
+        collected = set(inventory)
+        position = start
+        for i in order:
+            name, item = items[i]
+            directions, walked = self._walk(position, name, self.access_state(collected))
+            commands.extend(directions)
+            rooms.extend(walked)
+            commands.append(f"get {item}")
+            collected.add(item)
+            position = name
+        access = self.access_state(collected)
+        if self.distance(position, self.final_room, access) == INFINITY:
+            return None
+        directions, walked = self._walk(position, self.final_room, access)
+        commands.extend(directions)
+        rooms.extend(walked)
+        return Plan(commands, rooms, [items[i][1] for i in order], len(rooms) - 1, optimal)
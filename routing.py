@@ -0,0 +1,313 @@
+import heapq
+import sys
+from collections import namedtuple
+
+# networkx is imported inside the methods that need it; by then the game graph
+# (worldgraph.VersionedGraph) has loaded it, and importing routing stays cheap.
+
+HAZARD_WEIGHT = 100  # Edge weight into a room the player lacks the required items for
+INFINITY = float('inf')
+
+
+# Result of one routing query, shared by the status text and the map highlight.
+# rooms is None when there is no route; hazards lists rooms on the route the player cannot enter yet.
+PathResult = namedtuple('PathResult', ['source', 'target', 'rooms', 'cost', 'hazards'])
+
+
+class HazardRouter:
+    # Shared hazard handling for the path services below.
+    # A room is blocked when the player is missing any of its required items, and edges
+    # touching a blocked room cost hazard_weight, so the blocked set is all a route depends on.
+    # Editing a room's required_items only changes which blocked set an inventory maps to,
+    # so it just refreshes the list of gated rooms.
+    def __init__(self, graph, rooms, hazard_weight=HAZARD_WEIGHT):
+        self.graph = graph
+        self.rooms = rooms
+        self.hazard_weight = hazard_weight
+        self.hits = 0
+        self.misses = 0
+        self._gated = None  # [(room name, required items)] for rooms with requirements
+        self._blocked_by_mask = {}  # Bitset inventory mask -> blocked rooms
+
+    def requirements_changed(self):
+        # A room's required_items changed; rebuild the gated room list on next lookup
+        self._gated = None
+        self._blocked_by_mask.clear()
+
+    def blocked_rooms(self, inventory):
+        # Rooms the inventory cannot enter. A bitset inventory's mask is its whole state, so
+        # its blocked set is looked up by mask instead of checking every gated room again.
+        mask = getattr(inventory, 'mask', None)
+        if mask is not None:
+            blocked = self._blocked_by_mask.get(mask)
+            if blocked is None:
+                blocked = self._blocked_by_mask[mask] = self._blocked(inventory)
+            return blocked
+        return self._blocked(inventory)
+
+    def _blocked(self, inventory):
+        if self._gated is None:
+            self._gated = [(name, room.required_items)
+                           for name, room in self.rooms.items() if room.required_items]
+        return frozenset(name for name, required in self._gated if not required <= inventory)
+
+    def route(self, source, target, inventory):
+        # Run one shortest_path query and return it as a PathResult with cost and hazard flags
+        rooms = self.shortest_path(source, target, inventory)
+        if rooms is None:
+            return PathResult(source, target, None, None, ())
+        blocked = self.blocked_rooms(inventory)
+        weight = self.edge_weight(blocked)
+        adj = self.graph.adj
+        cost = sum(weight(u, v, adj[u][v]) for u, v in zip(rooms[:-1], rooms[1:]))
+        return PathResult(source, target, rooms, cost, tuple(room for room in rooms if room in blocked))
+
+    def edge_weight(self, blocked):
+        # Weight function for networkx: hazard edges cost more, everything else keeps its weight
+        hazard_weight = self.hazard_weight
+
+        def weight(u, v, data):
+            if u in blocked or v in blocked:
+                return hazard_weight
+            return data.get('weight', 1)
+        return weight
+
+
+class PathCache(HazardRouter):
+    # Memoized shortest paths keyed on (source room, target room, blocked rooms).
+    # Cached paths are dropped when the graph version changes.
+    def __init__(self, graph, rooms, hazard_weight=HAZARD_WEIGHT, maxsize=4096):
+        super().__init__(graph, rooms, hazard_weight)
+        self.maxsize = maxsize
+        self._paths = {}
+        self._graph_version = graph.version
+
+    def invalidate(self):
+        # Forget every cached path
+        self._paths.clear()
+        self._graph_version = self.graph.version
+
+    def shortest_path(self, source, target, inventory):
+        # Return a tuple of rooms from source to target, or None if unreachable.
+        # Raises nx.NodeNotFound if either room is not in the graph.
+        import networkx as nx
+        if self.graph.version != self._graph_version:
+            self.invalidate()
+        key = (source, target, self.blocked_rooms(inventory))
+        if key in self._paths:
+            self.hits += 1
+            return self._paths[key]
+        self.misses += 1
+        try:
+            path = tuple(nx.shortest_path(self.graph, source, target, weight=self.edge_weight(key[2])))
+        except nx.NetworkXNoPath:
+            path = None
+        if len(self._paths) >= self.maxsize:
+            del self._paths[next(iter(self._paths))]  # Evict the oldest entry
+        self._paths[key] = path
+        return path
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._paths)}
+
+
+class RoutingTable(HazardRouter):
+    """ Precomputed next-hop routing, one table per blocked-room state.
+        Each table holds a column per target room: the next hop toward the target and the
+        distance to it from every reachable room, built with one Dijkstra search from the target.
+        A query walks next hops instead of searching, so after the first query for a target
+        every path to it costs O(path length).
+
+        Columns are built lazily, or all at once with precompute(). When the graph changes, only
+        columns whose routes could be affected are dropped: a changed edge invalidates a column
+        if it is on the column's shortest-path tree or now offers a shorter route. When the rooms
+        affected are all leaves of the column's tree, just their entries are patched. A new
+        blocked state is derived from the nearest existing table the same way, treating the edges
+        of the rooms whose blocked status differs as changed.
+
+        Ties between equal-cost routes may break differently from nx.shortest_path. """
+
+    def __init__(self, graph, rooms, hazard_weight=HAZARD_WEIGHT):
+        super().__init__(graph, rooms, hazard_weight)
+        self._tables = {}  # blocked rooms -> {target: (next_hop, dist)}
+        self._graph_version = graph.version
+        self.columns_built = 0
+        self.columns_invalidated = 0
+        self.columns_repaired = 0
+
+    def invalidate(self):
+        # Drop every table
+        self._tables.clear()
+        self._graph_version = self.graph.version
+
+    def _sync(self):
+        # Apply graph edits made since the tables were built
+        if self.graph.version == self._graph_version:
+            return
+        changed = self.graph.changes_since(self._graph_version)
+        if changed is None:
+            self.invalidate()
+            return
+        for blocked, table in self._tables.items():
+            self._drop_affected(table, changed, self.edge_weight(blocked))
+        self._graph_version = self.graph.version
+
+    def _drop_affected(self, table, edges, weight):
+        # Drop or repair columns whose routes may change when edges change to their current weight
+        adj = self.graph.adj
+        for target in list(table):
+            next_hop, dist = table[target]
+            stale = set()  # Rooms whose own entry is wrong after the change
+            for u, v in edges:
+                # A shortest-path tree edge changed; the room routed through it is stale
+                if next_hop.get(u) == v:
+                    stale.add(u)
+                if next_hop.get(v) == u:
+                    stale.add(v)
+                if u in adj and v in adj[u]:
+                    w = weight(u, v, adj[u][v])
+                    du, dv = dist.get(u, INFINITY), dist.get(v, INFINITY)
+                    # The edge now offers a shorter route into one end
+                    if du + w < dv:
+                        stale.add(v)
+                    if dv + w < du:
+                        stale.add(u)
+            if not stale:
+                continue
+            column = self._repair_leaves(target, next_hop, dist, stale, weight)
+            if column is None:
+                del table[target]
+                self.columns_invalidated += 1
+            else:
+                table[target] = column
+
+    def _repair_leaves(self, target, next_hop, dist, stale, weight):
+        # If every stale room is a leaf of the tree, no other route passes through them, so only
+        # their own entries need recomputing. Stale rooms next to each other could route through
+        # one another, so those columns are rebuilt instead. Returns the patched column or None.
+        if target in stale or not stale.isdisjoint(next_hop.values()):
+            return None
+        adj = self.graph.adj
+        patched = {}
+        for room in stale:
+            if not stale.isdisjoint(adj[room]):
+                return None
+            best, best_hop = INFINITY, None
+            for neighbor, data in adj[room].items():
+                d = dist.get(neighbor, INFINITY) + weight(neighbor, room, data)
+                if d < best:
+                    best, best_hop = d, neighbor
+            # The new entry must not become a shortcut for its neighbors
+            for neighbor, data in adj[room].items():
+                if best + weight(room, neighbor, data) < dist.get(neighbor, INFINITY):
+                    return None
+            patched[room] = (best, best_hop)
+        next_hop, dist = dict(next_hop), dict(dist)
+        for room, (best, best_hop) in patched.items():
+            if best_hop is None:
+                next_hop.pop(room, None)
+                dist.pop(room, None)
+            else:
+                next_hop[room] = best_hop
+                dist[room] = best
+        self.columns_repaired += 1
+        return next_hop, dist
+
+    def _table(self, blocked):
+        # Table for a blocked state, seeded from the closest existing state when there is one
+        table = self._tables.get(blocked)
+        if table is not None:
+            return table
+        nearest = min(self._tables, key=lambda other: len(other ^ blocked), default=None)
+        table = {}
+        if nearest is not None:
+            table = dict(self._tables[nearest])  # Columns are never mutated, so they can be shared
+            adj = self.graph.adj
+            edges = [(room, neighbor) for room in nearest ^ blocked if room in adj for neighbor in adj[room]]
+            self._drop_affected(table, edges, self.edge_weight(blocked))
+        self._tables[blocked] = table
+        return table
+
+    def _build_column(self, target, blocked):
+        # Dijkstra from target; the graph is undirected so distances from target equal distances to it
+        weight = self.edge_weight(blocked)
+        adj = self.graph.adj
+        dist = {target: 0}
+        next_hop = {}
+        done = set()
+        heap = [(0, 0, target)]
+        counter = 1
+        while heap:
+            d, _, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            for v, data in adj[u].items():
+                nd = d + weight(u, v, data)
+                if nd < dist.get(v, INFINITY):
+                    dist[v] = nd
+                    next_hop[v] = u
+                    heapq.heappush(heap, (nd, counter, v))
+                    counter += 1
+        self.columns_built += 1
+        return next_hop, dist
+
+    def _column(self, target, blocked):
+        table = self._table(blocked)
+        column = table.get(target)
+        if column is None:
+            self.misses += 1
+            column = table[target] = self._build_column(target, blocked)
+        else:
+            self.hits += 1
+        return column
+
+    def precompute(self, inventory=()):
+        # Build every column for the blocked state of inventory up front
+        self._sync()
+        blocked = self.blocked_rooms(set(inventory))
+        table = self._table(blocked)
+        for target in self.graph.nodes:
+            if target not in table:
+                table[target] = self._build_column(target, blocked)
+        return table
+
+    def shortest_path(self, source, target, inventory):
+        # Return a tuple of rooms from source to target, or None if unreachable.
+        # Raises nx.NodeNotFound if either room is not in the graph.
+        for node in (source, target):
+            if node not in self.graph:
+                import networkx as nx
+                raise nx.NodeNotFound(f"Node {node} not in graph")
+        self._sync()
+        next_hop, _ = self._column(target, self.blocked_rooms(inventory))
+        path = [source]
+        node = source
+        while node != target:
+            node = next_hop.get(node)
+            if node is None:
+                return None
+            path.append(node)
+        return tuple(path)
+
+    def memory_usage(self):
+        # Approximate bytes held by the tables; shared columns are counted once
+        seen = set()
+        total = 0
+        for table in self._tables.values():
+            total += sys.getsizeof(table)
+            for column in table.values():
+                if id(column) in seen:
+                    continue
+                seen.add(id(column))
+                next_hop, dist = column
+                total += sys.getsizeof(column) + sys.getsizeof(next_hop) + sys.getsizeof(dist)
+                total += sum(sys.getsizeof(d) for d in dist.values())
+        return total
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'tables': len(self._tables),
+                'columns': sum(len(table) for table in self._tables.values()),
+                'columns_built': self.columns_built, 'columns_invalidated': self.columns_invalidated,
+                'columns_repaired': self.columns_repaired,
+                'memory_bytes': self.memory_usage()}
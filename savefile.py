@@ -0,0 +1,246 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from compactworld import NO_ITEM, CompactWorld
+from inventory import ItemRegistry
+
+# Binary save files: the player's room and inventory and the item of every room, for offline
+# saves and fast resume. Layout (header little-endian, arrays in the writer's byte order,
+# which flags records):
+#   header     magic, version, flags, room count, item count, inventory count,
+#              current room index, world name length, room names digest (version 2)
+#   sections   byte offsets of the six arrays below
+#   world name UTF-8
+#   names      room name end offsets ('Q', room count + 1 entries) and UTF-8 name bytes
+#   items      item name end offsets ('Q', item count + 1 entries) and UTF-8 name bytes
+#   room items item id of each room in room order ('i', NO_ITEM for none)
+#   inventory  item ids ('i')
+# Arrays start on 8-byte boundaries so they can be read straight out of the mapped file.
+# The digest lets a load check that the file's rooms are the game's without decoding every
+# name; version 1 files have none and are checked name by name.
+MAGIC = b"LOSTLAB\x00"
+SAVE_VERSION = 2
+BIG_ENDIAN = 1  # flags bit
+HEADER = struct.Struct("<8sHHIIIII16s")
+HEADERS = {1: struct.Struct("<8sHHIIIII"), 2: HEADER}  # Header of each readable version
+SECTIONS = struct.Struct("<6Q")
+COMPARE_BLOCK = 4096  # Rooms compared per step when looking for changed room items
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _string_table(strings):
+    # (end offsets, bytes) of a list of strings
+    encoded = [text.encode("utf-8") for text in strings]
+    return array('Q', accumulate(map(len, encoded), initial=0)), b"".join(encoded)
+
+
+def names_digest(names):
+    # 16-byte digest of room names in order, stored in the header
+    return hashlib.blake2b("\0".join(names).encode("utf-8"), digest_size=16).digest()
+
+
+def write_save(path, game):
+    """ Write the game's player and room item state to path. The file is written next to
+        path and renamed over it, so a crash never leaves a half-written save. """
+    rooms = game.rooms
+    player = game.player
+    if isinstance(rooms, CompactWorld):
+        # Item ids are the world's own, so the room items array is written as it is
+        registry = ItemRegistry(rooms.registry.names)
+        room_items = rooms.room_items
+        names = rooms.names
+        current = rooms.ids[player.current_room.name]
+    else:
+        registry = ItemRegistry(game.items.names)
+        names = list(rooms)
+        room_items = array('i', (NO_ITEM if room.item is None else registry.item_id(room.item)
+                                 for room in rooms.values()))
+        current = names.index(player.current_room.name)
+    inventory = array('i', sorted(registry.item_id(item) for item in player.inventory))
+    name_offsets, name_bytes = _string_table(names)
+    item_offsets, item_bytes = _string_table(registry.names)
+    world_name = game.world_name.encode("utf-8")
+    parts = [world_name, name_offsets, name_bytes, item_offsets, item_bytes, room_items, inventory]
+    offsets = []
+    position = HEADER.size + SECTIONS.size
+    for part in parts:
+        position = _align(position) if offsets else position
+        offsets.append(position)
+        position += len(part) * getattr(part, 'itemsize', 1)
+    flags = BIG_ENDIAN if sys.byteorder == "big" else 0
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, SAVE_VERSION, flags, len(names), len(registry.names), len(inventory),
+                            current, len(world_name), names_digest(names)))
+        f.write(SECTIONS.pack(*offsets[1:]))
+        for offset, part in zip(offsets, parts):
+            f.write(bytes(offset - f.tell()))
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class SaveFile:
+    """ A save file mapped into memory. Opening reads only the header; names, items and
+        the inventory are decoded when asked for, and room_items is a view of the mapped
+        file, so nothing is copied for rooms that are never looked at. Use as a context
+        manager or call close(). """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < 10:
+            raise ValueError("Not a Lost Lab save file (too short).")
+        magic, version = struct.unpack_from("<8sH", self._map)
+        if magic != MAGIC:
+            raise ValueError("Not a Lost Lab save file (bad magic).")
+        header = HEADERS.get(version)
+        if header is None:
+            raise ValueError(f"Unsupported save file version {version}.")
+        if len(self._map) < header.size + SECTIONS.size:
+            raise ValueError("Not a Lost Lab save file (too short).")
+        (magic, version, flags, self.room_count, self.item_count, inventory_count, self.current_index,
+         world_length, *digest) = header.unpack_from(self._map)
+        self.names_digest = digest[0] if digest else None
+        self.swapped = bool(flags & BIG_ENDIAN) != (sys.byteorder == "big")
+        name_offsets, name_bytes, item_offsets, item_bytes, room_items, inventory = SECTIONS.unpack_from(
+            self._map, header.size)
+        start = header.size + SECTIONS.size
+        self.world_name = bytes(self._map[start:start + world_length]).decode("utf-8")
+        self._name_offsets = self._array(name_offsets, 'Q', self.room_count + 1)
+        self._name_bytes = name_bytes
+        self._item_offsets = self._array(item_offsets, 'Q', self.item_count + 1)
+        self._item_bytes = item_bytes
+        self.room_items = self._array(room_items, 'i', self.room_count)
+        self._inventory = self._array(inventory, 'i', inventory_count)
+
+    def _array(self, offset, typecode, count):
+        # Typed view of count items at offset, copied and byte-swapped only if the writer's order differs
+        size = array(typecode).itemsize * count
+        if offset + size > len(self._map):
+            raise ValueError("Save file is truncated.")
+        view = memoryview(self._map)[offset:offset + size]
+        self._views.append(view)
+        if self.swapped:
+            values = array(typecode, view)
+            values.byteswap()
+            return values
+        values = view.cast(typecode)
+        self._views.append(values)
+        return values
+
+    def _string(self, offsets, base, index):
+        return self._map[base + offsets[index]:base + offsets[index + 1]].decode("utf-8")
+
+    def room_name(self, index):
+        return self._string(self._name_offsets, self._name_bytes, index)
+
+    def room_names(self):
+        return [self.room_name(index) for index in range(self.room_count)]
+
+    def has_room_names(self, names):
+        # Whether the file's rooms are names, in order: by digest, or for version 1 files by
+        # comparing the encoded name tables as bytes
+        if len(names) != self.room_count:
+            return False
+        if self.names_digest is not None:
+            return names_digest(names) == self.names_digest
+        offsets, encoded = _string_table(names)
+        return (self._name_offsets.tobytes() == offsets.tobytes()
+                and self._map[self._name_bytes:self._name_bytes + len(encoded)] == encoded)
+
+    def item_names(self):
+        return [self._string(self._item_offsets, self._item_bytes, index) for index in range(self.item_count)]
+
+    @property
+    def current_room(self):
+        return self.room_name(self.current_index)
+
+    def inventory(self, item_names=None):
+        names = item_names or self.item_names()
+        return [names[item_id] for item_id in self._inventory]
+
+    def close(self):
+        # Views must be released before the map can close
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def changed_rooms(current, saved):
+    # Ids of rooms whose item id differs between two arrays. Blocks are compared as bytes (a
+    # memcmp; comparing memoryviews directly goes element by element), and only differing
+    # blocks are scanned room by room.
+    current_bytes = memoryview(current).cast('B')
+    saved_bytes = memoryview(saved).cast('B')
+    step = COMPARE_BLOCK * current.itemsize
+    try:
+        for start in range(0, len(current_bytes), step):
+            if current_bytes[start:start + step].tobytes() != saved_bytes[start:start + step].tobytes():
+                first = start // current.itemsize
+                yield from (room_id for room_id in range(first, min(first + COMPARE_BLOCK, len(current)))
+                            if current[room_id] != saved[room_id])
+    finally:
+        current_bytes.release()
+        saved_bytes.release()
+
+
+def read_save(path, game):
+    """ Load a save file written by write_save into a game on the same world. Only rooms
+        whose item differs from the game's are touched; they are marked dirty so the next
+        save_to_db writes them. Returns {room name: item} of the rooms that changed.
+        Raises ValueError for other worlds or bad files, before anything is changed. """
+    rooms = game.rooms
+    with SaveFile(path) as save:
+        if save.world_name != game.world_name or save.room_count != len(rooms):
+            raise ValueError(f"Save file is of world '{save.world_name}', not '{game.world_name}'.")
+        names = rooms.names if isinstance(rooms, CompactWorld) else list(rooms)
+        if not save.has_room_names(names) or save.current_index >= save.room_count:
+            raise ValueError("Save file rooms do not match this world.")
+        items = save.item_names()
+        saved = save.room_items
+        changed = {}
+        if (isinstance(rooms, CompactWorld) and not save.swapped
+                and rooms.registry.names[:len(items)] == items):
+            # Same item ids as the world, so compare the arrays directly
+            for room_id in list(changed_rooms(rooms.room_items, saved)):
+                item_id = saved[room_id]
+                changed[names[room_id]] = None if item_id == NO_ITEM else items[item_id]
+        else:
+            for index, room in enumerate(rooms.values()):
+                item_id = saved[index]
+                item = None if item_id == NO_ITEM else items[item_id]
+                if room.item != item:
+                    changed[names[index]] = item
+        current = names[save.current_index]
+        inventory = save.inventory(items)
+    for name, item in changed.items():
+        rooms[name].item = item
+    game.player.current_room = rooms[current]
+    game.player.inventory.clear()
+    game.player.inventory.update(inventory)
+    return changed
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import Game
+from instrumentation import metrics, profile_command
+from storage import DEFAULT_DB_PATH, NullStorage, open_storage
+
+# Line protocol: the client sends one command per line (UTF-8), starting with "login <name>",
+# then anything Game.handle_command accepts, or "quit". The server answers every line with one
+# JSON object on one line:
+#   {"ok": true, "message": "You moved to Mess Hall.", "events": [], "room": "Mess Hall", "route": null}
+# events are {"kind", "title", "message"} objects (hazard, victory, defeat) and route is the
+# list of rooms for path commands. Errors are {"ok": false, "message": "..."}.
+# A line may hold a batch such as "north;north;get Ammo"; the reply then joins the messages
+# with newlines, lists the events of every command and carries the last route. A batch stops
+# at its first invalid command and replies with an error after the commands before it ran.
+# Once the game is won or lost, every further command is answered with an error.
+# "stats" may be sent at any time and answers with a "stats" field holding the server's counters,
+# per-verb command latencies and, on an instrumented server, hot-path timings (see stats()).
+# An instrumented server also accepts "profile <command>", which runs the command under cProfile
+# and adds the profile text as a "profile" field.
+DEFAULT_PORT = 8023
+MAX_LINE = 1024
+PLAYER_NAME = re.compile(r'^[A-Za-z0-9 _-]{1,32}$')
+
+
+class GameServer:
+    """ Asyncio TCP server hosting one Game per connection, bound to a player row by name.
+
+        All sessions share one Storage (connection pool and batched log writer), or with
+        shards > 1 one ShardedStorage. Game state lives in memory; creating and closing games
+        and commands the registry marks as storage or blocking commands (save, load, hint) run
+        in a thread pool, while moves, pickups and path queries run on the event loop. A player name can only be
+        logged in once at a time. instrument=True times the game's hot paths while the server
+        runs (see instrumentation.py). """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, pool_size=4, max_workers=4, shards=1, instrument=False,
+                 **game_options):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.shards = shards
+        self.instrument = instrument
+        self.game_options = game_options
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="lostlab-storage")
+        self.storage = None
+        self.sessions = {}  # Player name -> Game
+        self.server = None
+        self.clients = set()  # Tasks of connected clients
+        self.commands_handled = 0
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        # Open storage and start listening; port=0 picks a free port (see self.port)
+        loop = asyncio.get_running_loop()
+        if self.db_path:
+            self.storage = await loop.run_in_executor(self.executor, open_storage, self.db_path, self.pool_size,
+                                                      self.shards)
+        else:
+            self.storage = NullStorage()
+        if self.instrument:
+            metrics.enable()
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        # Stop accepting clients, disconnect the connected ones (closing their games), then
+        # close the shared storage
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.clients:
+            task.cancel()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+        if self.storage is not None:
+            await self._run(self.storage.close)
+        self.executor.shutdown(wait=True)
+        if self.instrument:
+            metrics.disable()
+
+    def stats(self):
+        # Counters for the "stats" command: sessions, commands and latencies in microseconds
+        stats = {"sessions": len(self.sessions), "commands_handled": self.commands_handled,
+                 "commands": {verb: {"count": stats.count, "mean_us": stats.mean * 1e6, "max_us": stats.max * 1e6}
+                              for verb, stats in Game.commands.stats().items()}}
+        if self.instrument:
+            stats["timings"] = metrics.summary()
+        return stats
+
+    def _run(self, function, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def handle_client(self, reader, writer):
+        # One connection: log in, then run commands until quit or disconnect
+        name = None
+        task = asyncio.current_task()
+        self.clients.add(task)
+        try:
+            await self.send(writer, True, "Welcome to the Lost Lab. Log in with: login <name>")
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self.send(writer, False, f"Line too long (limit {MAX_LINE} bytes).")
+                    break
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="replace").strip()
+                if not command:
+                    continue
+                if command == "quit":
+                    await self.send(writer, True, "Goodbye.")
+                    break
+                if command == "stats":
+                    await self.send(writer, True, "Server statistics.", stats=self.stats())
+                    continue
+                if name is None:
+                    name = await self.login(writer, command)
+                    continue
+                if command.startswith("profile ") and self.instrument:
+                    await self.profile_command(writer, self.sessions[name], command[8:].strip())
+                    continue
+                await self.run_command(writer, self.sessions[name], command)
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(task)
+            if name is not None:
+                await self._run(self.sessions.pop(name).close)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def login(self, writer, command):
+        # Bind the connection to a player; returns the player name or None if refused
+        if not command.startswith("login "):
+            await self.send(writer, False, "Please log in first: login <name>")
+            return None
+        name = command[6:].strip()
+        if not PLAYER_NAME.match(name):
+            await self.send(writer, False, "Player names are 1-32 letters, digits, spaces, '_' or '-'.")
+            return None
+        if name in self.sessions:
+            await self.send(writer, False, f"{name} is already playing.")
+            return None
+        self.sessions[name] = None  # Reserve the name while the game is created
+        try:
+            game = await self._run(lambda: Game(storage=self.storage, player_name=name, **self.game_options))
+        except Exception as e:
+            # Refuse this login but keep the connection, so the client can retry
+            del self.sessions[name]
+            await self.send(writer, False, f"Could not start a game for {name}: {e}")
+            return None
+        self.sessions[name] = game
+        await self.send(writer, True, f"Welcome, {name}.\n{game.show_instructions()}",
+                        room=game.player.current_room.name)
+        return name
+
+    async def run_command(self, writer, game, command):
+        # Run a command or batch through the game's command registry and send the reply
+        try:
+            if game.commands.blocks(command):
+                results = await self._run(game.handle_commands, command)
+            else:
+                results = game.handle_commands(command)
+        except ValueError as e:
+            self.commands_handled += len(getattr(e, 'results', ()))
+            await self.send(writer, False, str(e))
+            return
+        self.commands_handled += len(results)
+        routes = [result.route for result in results if result.route is not None]
+        await self.send(writer, True, "\n".join(result.message for result in results),
+                        events=[event._asdict() for result in results for event in result.events],
+                        room=game.player.current_room.name,
+                        route=routes[-1].rooms if routes else None)
+
+    async def profile_command(self, writer, game, command):
+        # Run one command under cProfile on the storage thread pool, so a slow profile never holds up the loop
+        try:
+            result, profile = await self._run(profile_command, game, command)
+        except ValueError as e:
+            await self.send(writer, False, str(e))
+            return
+        self.commands_handled += 1
+        await self.send(writer, True, result.message, events=[event._asdict() for event in result.events],
+                        room=game.player.current_room.name, route=result.route.rooms if result.route else None,
+                        profile=profile)
+
+    async def send(self, writer, ok, message, **fields):
+        writer.write(json.dumps(dict(ok=ok, message=message, **fields)).encode("utf-8") + b"\n")
+        await writer.drain()
+
+
+async def main(host, port, db_path, shards=1, instrument=False):
+    server = GameServer(db_path, shards=shards, instrument=instrument)
+    await server.start(host, port)
+    print(f"Lost Lab server listening on {host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        if instrument:
+            print(metrics.report())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Host Lost Lab sessions over a line protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--shards", type=int, default=1, help="spread players over this many database files")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time the game's hot paths; enables the profile command and prints a report on exit")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.db, args.shards, args.instrument))
+    except KeyboardInterrupt:
+        pass
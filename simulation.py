@@ -0,0 +1,203 @@
+import argparse
+import multiprocessing
+import random
+import time
+from collections import deque, namedtuple
+
+from engine import Game
+from instrumentation import Instrumentation
+from storage import open_storage
+
+DEFAULT_MAX_STEPS = 200
+
+# Totals for a batch of simulated sessions. timeouts are sessions that hit max_steps. metrics
+# is the merged Instrumentation of all workers when run with instrument=True, else None.
+SimulationReport = namedtuple('SimulationReport', [
+    'policy', 'sessions', 'wins', 'losses', 'timeouts', 'mean_steps', 'elapsed', 'sessions_per_second',
+    'metrics'], defaults=[None])
+
+
+def can_enter(room, inventory):
+    # Player.move refuses rooms whose required items are missing
+    return room.required_items <= inventory
+
+
+def first_step(start, goals, inventory, final_room):
+    # Breadth-first search over exits; returns the direction of the first move toward the
+    # nearest goal room. Never walks through the final room unless it is the goal.
+    frontier = deque([start])
+    first = {start: None}
+    while frontier:
+        room = frontier.popleft()
+        if room in goals and room is not start:
+            return first[room]
+        if room.name == final_room and room is not start:
+            continue
+        for direction, next_room in room.exits.items():
+            if next_room not in first and can_enter(next_room, inventory):
+                first[next_room] = first[room] or direction
+                frontier.append(next_room)
+    return None
+
+
+class Policy:
+    # Base agent: picks up any collectible item it stands on, otherwise asks choose_move
+    def __init__(self, game, rng):
+        self.game = game
+        self.rng = rng
+        self.player = game.player
+
+    def collectible(self, room):
+        # Room has an item worth taking; the final room's "item" is the Alien
+        return room.item is not None and room.name != self.game.final_room
+
+    def act(self):
+        room = self.player.current_room
+        if self.collectible(room):
+            self.player.take_item(room.item)
+        else:
+            self.player.move(self.choose_move())
+
+    def choose_move(self):
+        raise NotImplementedError
+
+
+class RandomWalkPolicy(Policy):
+    # Wander through random exits, including gated ones the player cannot enter yet
+    def choose_move(self):
+        return self.rng.choice(sorted(self.player.current_room.exits))
+
+
+class GreedyItemPolicy(Policy):
+    # Head for the nearest reachable item; go to the final room once nothing else is reachable
+    def choose_move(self):
+        rooms = self.game.rooms.values()
+        goals = {room for room in rooms if self.collectible(room)}
+        inventory = self.player.inventory
+        direction = first_step(self.player.current_room, goals, inventory, self.game.final_room)
+        if direction is None:
+            direction = first_step(self.player.current_room, {self.game.rooms[self.game.final_room]},
+                                   inventory, self.game.final_room)
+        return direction or self.rng.choice(sorted(self.player.current_room.exits))
+
+
+class OptimalPolicy(Policy):
+    # Follow the shortest plan from the route planner, made once per session. Plan commands run
+    # through the game's command registry like any scripted client.
+    def __init__(self, game, rng):
+        super().__init__(game, rng)
+        plan = game.plan_route()
+        self.plan = deque(plan.commands if plan else ())
+
+    def act(self):
+        if not self.plan:
+            self.player.move(self.rng.choice(sorted(self.player.current_room.exits)))
+            return
+        self.game.commands.execute(self.game, self.plan.popleft())
+
+
+POLICIES = {'random': RandomWalkPolicy, 'greedy': GreedyItemPolicy, 'optimal': OptimalPolicy}
+
+
+def play_session(policy, seed, max_steps=DEFAULT_MAX_STEPS, db_path=None, storage=None):
+    # Play one session; returns (outcome, steps) with outcome 'win', 'lose', or 'timeout'.
+    # db_path=None and no storage disables storage. Given a Storage, the session logs its win/lose
+    # through that storage's batched log writer as player "<policy> <seed>", and leaves it open.
+    if storage is not None:
+        game = Game(storage=storage, player_name=f"{policy} {seed}")
+    else:
+        game = Game(db_path=db_path)
+    try:
+        agent = POLICIES[policy](game, random.Random(seed))
+        for step in range(1, max_steps + 1):
+            agent.act()
+            if game.check_victory():
+                return 'win', step
+            if game.check_defeat():
+                return 'lose', step
+        return 'timeout', max_steps
+    finally:
+        game.close()
+
+
+def _play_chunk(args):
+    # Worker entry point: play sessions for a range of seeds and return outcome totals, with a
+    # snapshot of the chunk's hot-path timings when instrumented. The chunk's sessions share one
+    # storage, so their outcome logs are batched together.
+    policy, seeds, max_steps, db_path, instrument = args
+    totals = {'win': 0, 'lose': 0, 'timeout': 0, 'steps': 0}
+    metrics = Instrumentation() if instrument else None
+    if metrics is not None:
+        metrics.enable()
+    storage = open_storage(db_path) if db_path else None
+    try:
+        for seed in seeds:
+            outcome, steps = play_session(policy, seed, max_steps, storage=storage)
+            totals[outcome] += 1
+            totals['steps'] += steps
+    finally:
+        if storage is not None:
+            storage.close()
+        if metrics is not None:
+            metrics.disable()
+            totals['metrics'] = metrics.snapshot()
+    return totals
+
+
+def run_simulation(sessions, policy='random', processes=None, seed=0, max_steps=DEFAULT_MAX_STEPS,
+                   db_path=None, chunk_size=100, instrument=False):
+    """ Play sessions games with the given policy across a multiprocessing pool.
+        processes=1 runs in this process; None uses one worker per CPU.
+        Session i uses seed + i, so results are reproducible for a given seed.
+        instrument=True times the hot paths in every worker and reports them merged. """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy}'.")
+    seeds = range(seed, seed + sessions)
+    chunks = [(policy, seeds[i:i + chunk_size], max_steps, db_path, instrument) for i in range(0, sessions, chunk_size)]
+    start = time.perf_counter()
+    if processes == 1:
+        totals = _sum_totals(map(_play_chunk, chunks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            totals = _sum_totals(pool.imap_unordered(_play_chunk, chunks))
+    elapsed = time.perf_counter() - start
+    return SimulationReport(policy, sessions, totals['win'], totals['lose'], totals['timeout'],
+                            totals['steps'] / sessions if sessions else 0.0, elapsed,
+                            sessions / elapsed if elapsed else 0.0, totals['metrics'] if instrument else None)
+
+
+def _sum_totals(results):
+    totals = {'win': 0, 'lose': 0, 'timeout': 0, 'steps': 0, 'metrics': Instrumentation()}
+    for result in results:
+        for key, value in result.items():
+            if key == 'metrics':
+                totals[key].merge(value)
+            else:
+                totals[key] += value
+    return totals
+
+
+def print_report(report):
+    sessions = report.sessions or 1
+    print(f"Policy: {report.policy}")
+    print(f"Sessions: {report.sessions}")
+    print(f"Win rate: {report.wins / sessions:.2%}  Lose rate: {report.losses / sessions:.2%}  "
+          f"Timeouts: {report.timeouts / sessions:.2%}")
+    print(f"Mean steps: {report.mean_steps:.1f}")
+    print(f"Throughput: {report.sessions_per_second:.1f} sessions/second ({report.elapsed:.3f} seconds)")
+    if report.metrics is not None:
+        print(report.metrics.report())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulate Lost Lab sessions with automated agents.")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--db", default=None, help="log outcomes to this database (default: no storage)")
+    parser.add_argument("--instrument", action="store_true", help="time the game's hot paths and report them")
+    args = parser.parse_args()
+    print_report(run_simulation(args.sessions, args.policy, args.processes, args.seed, args.max_steps, args.db,
+                                instrument=args.instrument))
@@ -0,0 +1,50 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("tkinter", "matplotlib", "networkx")
+
+
+def time_python(code, runs=10):
+    # Median wall time of a fresh interpreter running code, so every run is a cold import
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def loaded_heavy_modules(code):
+    # Heavy modules present in sys.modules after running code in a fresh interpreter
+    check = code + f"\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", check], cwd=HERE, check=True,
+                            capture_output=True, text=True).stdout.strip()
+    return [module for module in output.split(",") if module]
+
+
+def measure_import_performance(runs=10):
+    baseline = time_python("pass", runs)
+    import_time = time_python("import LostLabEnhanced", runs) - baseline
+    print(f"Cold import LostLabEnhanced (median of {runs}, interpreter start excluded): {import_time:.6f} seconds")
+    print(f"Heavy modules loaded by import: {loaded_heavy_modules('import LostLabEnhanced') or 'none'}")
+    return import_time
+
+
+def measure_game_construction_performance(runs=10):
+    code = "import LostLabEnhanced\nLostLabEnhanced.Game(db_path=':memory:').close()"
+    baseline = time_python("pass", runs)
+    construction_time = time_python(code, runs) - baseline
+    print(f"Cold import + Game() (median of {runs}, interpreter start excluded): {construction_time:.6f} seconds")
+    print(f"Heavy modules loaded by Game(): {loaded_heavy_modules(code) or 'none'}")
+    return construction_time
+
+
+if __name__ == '__main__':
+    print("Import Performance:")
+    measure_import_performance()
+    print("\nGame Construction Performance:")
+    measure_game_construction_performance()
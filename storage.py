@@ -0,0 +1,797 @@
+import argparse
+import atexit
+import os
+import queue
+import sqlite3  # Used for databases Reference: https://docs.python.org/3/library/sqlite3.html
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = "lostlab.db"
+DEFAULT_WORLD = "Lost Lab"  # The built-in world, and the only one databases from before per-world state knew
+OUTCOMES = ("win", "lose")  # Log actions counted in outcome_stats
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"  # UTC, as CURRENT_TIMESTAMP writes it
+
+# Applied to every new connection. WAL keeps readers running while a save commits,
+# NORMAL sync is durable under WAL, negative cache_size is measured in KiB.
+# Reference: https://www.sqlite.org/pragma.html
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# SQL is kept in constants so every call sends identical text and sqlite3's
+# per-connection statement cache hands back the already prepared statement.
+SCHEMA = (
+    # Players with ID, name, the room they were created in, and creation timestamp
+    """
+    CREATE TABLE IF NOT EXISTS player (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        current_room TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Inventory linked to players, one per world they play
+    """
+    CREATE TABLE IF NOT EXISTS inventory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER NOT NULL,
+        item TEXT NOT NULL,
+        acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        world_id INTEGER REFERENCES worlds(id) ON DELETE CASCADE,
+        FOREIGN KEY (player_id) REFERENCES player(id) ON DELETE CASCADE
+    )
+    """,
+    # World instances, by the name in their world header
+    """
+    CREATE TABLE IF NOT EXISTS worlds (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Items each room of a world starts with; rooms without an item have no row
+    """
+    CREATE TABLE IF NOT EXISTS world_rooms (
+        world_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        item TEXT,
+        PRIMARY KEY (world_id, name),
+        FOREIGN KEY (world_id) REFERENCES worlds(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """,
+    # Current room of each player in each world they play
+    """
+    CREATE TABLE IF NOT EXISTS player_worlds (
+        player_id INTEGER NOT NULL,
+        world_id INTEGER NOT NULL,
+        current_room TEXT NOT NULL,
+        PRIMARY KEY (player_id, world_id),
+        FOREIGN KEY (player_id) REFERENCES player(id) ON DELETE CASCADE,
+        FOREIGN KEY (world_id) REFERENCES worlds(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """,
+    # Room items as one player left them in one world, for the rooms that player changed.
+    # The primary key is the index a load reads, so loading never touches other players' rows.
+    """
+    CREATE TABLE IF NOT EXISTS player_rooms (
+        player_id INTEGER NOT NULL,
+        world_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        item TEXT,
+        PRIMARY KEY (player_id, world_id, name),
+        FOREIGN KEY (player_id) REFERENCES player(id) ON DELETE CASCADE,
+        FOREIGN KEY (world_id) REFERENCES worlds(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """,
+    # Log of player actions
+    """
+    CREATE TABLE IF NOT EXISTS logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER,
+        action TEXT NOT NULL,
+        details TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (player_id) REFERENCES player(id)
+    )
+    """,
+    # Session journal (see journal.py): structured state changes per player, and state
+    # snapshots to replay them from. Both are keyed by player and sequence number.
+    """
+    CREATE TABLE IF NOT EXISTS journal (
+        player_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (player_id, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        player_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (player_id, seq)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS inventory_player_world ON inventory (player_id, world_id)",
+    "CREATE INDEX IF NOT EXISTS logs_action ON logs (action)",
+    "CREATE INDEX IF NOT EXISTS logs_player_created ON logs (player_id, created_at)",
+)
+# Win/lose counts per outcome, player and UTC day, kept current by every write of a win or
+# lose log in the same transaction, so statistics read a few rows instead of grouping logs.
+# player_id 0 stands for log rows without a player (a NULL would defeat the primary key).
+OUTCOME_STATS_TABLE = """
+    CREATE TABLE IF NOT EXISTS outcome_stats (
+        outcome TEXT NOT NULL,
+        player_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (outcome, player_id, day)
+    ) WITHOUT ROWID
+    """
+SELECT_WORLD_ID = "SELECT id FROM worlds WHERE name = ?"
+INSERT_WORLD = "INSERT INTO worlds (name) VALUES (?)"
+INSERT_WORLD_ROOM = "INSERT INTO world_rooms (world_id, name, item) VALUES (?, ?, ?)"
+SELECT_WORLD_ROOM_ITEM = "SELECT item FROM world_rooms WHERE world_id = ? AND name = ?"
+HAS_WORLD_ROOMS = "SELECT 1 FROM world_rooms WHERE world_id = ? LIMIT 1"
+INSERT_WORLD_ONCE = "INSERT OR IGNORE INTO worlds (name) VALUES (?)"
+SELECT_PLAYER_ID = "SELECT id FROM player WHERE name = ?"
+INSERT_PLAYER = "INSERT INTO player (name, current_room) VALUES (?, ?)"
+INSERT_PLAYER_WORLD = "INSERT OR IGNORE INTO player_worlds (player_id, world_id, current_room) VALUES (?, ?, ?)"
+UPSERT_PLAYER_WORLD = ("INSERT INTO player_worlds (player_id, world_id, current_room) VALUES (?, ?, ?) "
+                       "ON CONFLICT(player_id, world_id) DO UPDATE SET current_room = excluded.current_room")
+SELECT_PLAYER_WORLD = ("SELECT player_worlds.current_room FROM player_worlds JOIN player ON player.id = player_id "
+                       "WHERE player_id = ? AND world_id = ?")
+DELETE_INVENTORY = "DELETE FROM inventory WHERE player_id = ? AND world_id = ?"
+INSERT_INVENTORY = "INSERT INTO inventory (player_id, world_id, item) VALUES (?, ?, ?)"
+DELETE_INVENTORY_ITEM = "DELETE FROM inventory WHERE player_id = ? AND world_id = ? AND item = ?"
+SELECT_INVENTORY = "SELECT item FROM inventory WHERE player_id = ? AND world_id = ?"
+# Upgrading a database from before per-world state: its inventory has no world_id, and its
+# position (player.current_room) and room items (the global rooms table) were all of the Lost Lab
+INVENTORY_COLUMNS = "SELECT name FROM pragma_table_info('inventory')"
+ADD_INVENTORY_WORLD = "ALTER TABLE inventory ADD COLUMN world_id INTEGER REFERENCES worlds(id) ON DELETE CASCADE"
+ASSIGN_INVENTORY_WORLD = "UPDATE inventory SET world_id = ? WHERE world_id IS NULL"
+COPY_PLAYER_POSITIONS = ("INSERT OR IGNORE INTO player_worlds (player_id, world_id, current_room) "
+                         "SELECT id, ?, current_room FROM player")
+HAS_LEGACY_ROOMS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rooms'"
+COPY_LEGACY_ROOMS = ("INSERT OR IGNORE INTO player_rooms (player_id, world_id, name, item) "
+                     "SELECT player.id, ?, rooms.name, rooms.item FROM player, rooms")
+RETIRE_LEGACY_ROOMS = "ALTER TABLE rooms RENAME TO legacy_rooms"
+UPSERT_PLAYER_ROOM = ("INSERT INTO player_rooms (player_id, world_id, name, item) VALUES (?, ?, ?, ?) "
+                      "ON CONFLICT(player_id, world_id, name) DO UPDATE SET item = excluded.item")
+SELECT_PLAYER_ROOMS = "SELECT name, item FROM player_rooms WHERE player_id = ? AND world_id = ?"
+DELETE_PLAYER_ROOMS = "DELETE FROM player_rooms WHERE player_id = ? AND world_id = ?"
+SELECT_WORLD_ROOMS = "SELECT name, item FROM world_rooms WHERE world_id = ?"
+INSERT_LOG_AT = "INSERT INTO logs (player_id, action, details, created_at) VALUES (?, ?, ?, ?)"
+HAS_OUTCOME_STATS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'outcome_stats'"
+ADD_OUTCOMES = ("INSERT INTO outcome_stats (outcome, player_id, day, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(outcome, player_id, day) DO UPDATE SET count = count + excluded.count")
+DELETE_OUTCOMES = "DELETE FROM outcome_stats"
+BACKFILL_OUTCOMES = ("INSERT INTO outcome_stats (outcome, player_id, day, count) "
+                     "SELECT action, COALESCE(player_id, 0), date(created_at), COUNT(*) FROM logs "
+                     "WHERE action IN ('win', 'lose') GROUP BY action, COALESCE(player_id, 0), date(created_at)")
+COUNT_OUTCOMES = "SELECT outcome, SUM(count) FROM outcome_stats GROUP BY outcome ORDER BY outcome"
+COUNT_PLAYER_OUTCOMES = ("SELECT outcome, SUM(count) FROM outcome_stats WHERE player_id = ? "
+                         "GROUP BY outcome ORDER BY outcome")
+SELECT_DAILY_OUTCOMES = ("SELECT day, outcome, SUM(count) FROM outcome_stats WHERE day >= ? "
+                         "GROUP BY day, outcome ORDER BY day, outcome")
+INSERT_JOURNAL = "INSERT INTO journal (player_id, seq, kind, data) VALUES (?, ?, ?, ?)"
+SELECT_LAST_JOURNAL_SEQ = ("SELECT MAX(seq) FROM (SELECT MAX(seq) AS seq FROM journal WHERE player_id = ? "
+                           "UNION ALL SELECT MAX(seq) FROM snapshots WHERE player_id = ?)")
+SELECT_JOURNAL_AFTER = "SELECT seq, kind, data FROM journal WHERE player_id = ? AND seq > ? AND seq <= ? ORDER BY seq"
+UPSERT_SNAPSHOT = ("INSERT INTO snapshots (player_id, seq, state) VALUES (?, ?, ?) "
+                   "ON CONFLICT(player_id, seq) DO UPDATE SET state = excluded.state")
+SELECT_LATEST_SNAPSHOT = ("SELECT seq, state FROM snapshots WHERE player_id = ? AND seq <= ? "
+                          "ORDER BY seq DESC LIMIT 1")
+LAST_SEQ = 2 ** 63 - 1  # Upper bound for "no limit" in seq ranges
+
+
+FLUSH = ('flush', None)  # Queued by ActionLogWriter.flush to write the open batch straight away
+
+
+def log_record(player_id, action, details):
+    # Row for INSERT_LOG_AT, stamped now
+    return player_id, action, details, time.strftime(TIMESTAMP_FORMAT, time.gmtime())
+
+
+def write_logs(cur, records):
+    # Insert log records and fold their wins and losses into outcome_stats; callers supply
+    # the transaction so the two can never disagree
+    cur.executemany(INSERT_LOG_AT, records)
+    outcomes = Counter((action, player_id or 0, created_at[:10])
+                       for player_id, action, _, created_at in records if action in OUTCOMES)
+    if outcomes:
+        cur.executemany(ADD_OUTCOMES, (key + (count,) for key, count in outcomes.items()))
+
+
+class ConnectionPool:
+    # Hand out long-lived SQLite connections instead of reconnecting per call.
+    # A size of 1 is a single shared connection; threaded hosts can ask for more.
+    # Note: every connection to ":memory:" is a separate database, so keep size=1 there.
+    def __init__(self, path=DEFAULT_DB_PATH, size=1, cached_statements=128):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.path = path
+        self.size = size
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        # check_same_thread is off because the pool, not the thread, owns the connection
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=self.cached_statements)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        # Reuse an idle connection, open a new one while under size, otherwise wait for one
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+
+    def release(self, conn):
+        # Return connection to the pool, rolling back anything left open
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        # Close every connection the pool has opened
+        with self._lock:
+            self._closed = True
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+
+class ActionLogWriter:
+    # Queue log records in memory and write them in batched transactions on a background thread.
+    # A batch is written once batch_size records are waiting or flush_interval seconds have passed
+    # since its first record, so the game pays one commit per batch instead of one per action.
+    # The queue holds at most max_queue records. When it is full the overflow policy decides:
+    #   "block" - the caller waits until the writer makes room (default, never loses events)
+    #   "drop"  - the new record is discarded and counted in self.dropped
+    # created_at is stamped when the record is queued so batching does not skew timestamps.
+    # Session journal events and snapshots (journal.py) share the queue, so moves never wait on
+    # a disk write either; they are never dropped, whatever the policy.
+    OVERFLOW_POLICIES = ("block", "drop")
+
+    def __init__(self, pool, batch_size=100, flush_interval=0.5, max_queue=10000, overflow="block"):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'.")
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+        self.batches_written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start(self):
+        # Writer thread is started on first use so idle games do not own a thread
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="lostlab-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def write(self, player_id, action, details):
+        # Queue one log record; returns False if it was dropped
+        return self._put(('log', log_record(player_id, action, details)), self.overflow == "drop")
+
+    def write_journal(self, player_id, events):
+        # Queue (seq, kind, data) journal events
+        for seq, kind, data in events:
+            self._put(('journal', (player_id, seq, kind, data)))
+
+    def write_snapshot(self, player_id, seq, state):
+        self._put(('snapshot', (player_id, seq, state)))
+
+    def _put(self, record, may_drop=False):
+        if self._closed:
+            raise RuntimeError("Log writer is closed.")
+        if self._thread is None:
+            self._start()
+        if may_drop:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self._queue.put(record)
+        return True
+
+    def _run(self):
+        # Collect records into batches and write each batch in one transaction
+        while True:
+            record = self._queue.get()
+            if record is None:
+                self._queue.task_done()
+                return
+            if record is FLUSH:
+                self._queue.task_done()
+                continue
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            stop = flushed = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                if record is FLUSH:
+                    # Someone is waiting in flush(); write now instead of at the deadline
+                    flushed = True
+                    break
+                batch.append(record)
+            self._write_batch(batch)
+            for _ in range(len(batch) + stop + flushed):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        # One transaction for the batch, whatever mix of logs, journal events and snapshots it holds
+        rows = {'log': [], 'journal': [], 'snapshot': []}
+        for table, row in batch:
+            rows[table].append(row)
+        try:
+            with self.pool.connection() as conn:
+                with conn:
+                    cur = conn.cursor()
+                    if rows['log']:
+                        write_logs(cur, rows['log'])
+                    cur.executemany(INSERT_JOURNAL, rows['journal'])
+                    cur.executemany(UPSERT_SNAPSHOT, rows['snapshot'])
+            self.batches_written += 1
+        except sqlite3.Error as e:
+            print(f"Error logging action: {e}")
+
+    def flush(self):
+        # Block until every queued record has been written; the marker ends the open batch early
+        if self._thread is not None and not self._closed:
+            self._queue.put(FLUSH)
+            self._queue.join()
+
+    def close(self):
+        # Flush remaining records and stop the writer thread
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+            atexit.unregister(self.close)
+
+
+class Storage:
+    # Data access layer owned by Game; all SQL for the game lives here
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=1, async_logs=True):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        # Logs go through a batched background writer unless async_logs is off
+        self.log_writer = ActionLogWriter(self.pool) if async_logs else None
+
+    @contextmanager
+    def transaction(self):
+        # Yield a cursor inside one transaction; commit on success, roll back on error
+        with self.pool.connection() as conn:
+            with conn:
+                yield conn.cursor()
+
+    def init_schema(self):
+        # Create missing tables. A database from before outcome_stats existed is backfilled
+        # from its logs once, and one from before per-world state is migrated (see migrate_legacy).
+        with self.transaction() as cur:
+            columns = {name for (name,) in cur.execute(INVENTORY_COLUMNS)}
+            legacy = bool(columns) and 'world_id' not in columns
+            if legacy:
+                cur.execute(ADD_INVENTORY_WORLD)
+            for statement in SCHEMA:
+                cur.execute(statement)
+            if cur.execute(HAS_OUTCOME_STATS).fetchone() is None:
+                cur.execute(OUTCOME_STATS_TABLE)
+                cur.execute(BACKFILL_OUTCOMES)
+            if legacy:
+                self.migrate_legacy(cur)
+
+    def migrate_legacy(self, cur):
+        # Older databases kept one position, inventory and set of room items per player, all of
+        # them in the Lost Lab. Move them to that world's rows. The global rooms table was shared
+        # by every player, so each gets a copy; it is then kept as legacy_rooms, no longer read.
+        cur.execute(INSERT_WORLD_ONCE, (DEFAULT_WORLD,))
+        world_id = cur.execute(SELECT_WORLD_ID, (DEFAULT_WORLD,)).fetchone()[0]
+        cur.execute(ASSIGN_INVENTORY_WORLD, (world_id,))
+        cur.execute(COPY_PLAYER_POSITIONS, (world_id,))
+        if cur.execute(HAS_LEGACY_ROOMS).fetchone() is not None:
+            cur.execute(COPY_LEGACY_ROOMS, (world_id,))
+            cur.execute(RETIRE_LEGACY_ROOMS)
+
+    def get_or_create_world(self, name, rooms):
+        # Return the id of world instance name, recording the starting items of rooms if new.
+        # A world created by migrate_legacy gets its starting items on first use.
+        with self.transaction() as cur:
+            cur.execute(SELECT_WORLD_ID, (name,))
+            row = cur.fetchone()
+            if row:
+                world_id = row[0]
+                if cur.execute(HAS_WORLD_ROOMS, (world_id,)).fetchone() is not None:
+                    return world_id
+            else:
+                cur.execute(INSERT_WORLD, (name,))
+                world_id = cur.lastrowid
+            cur.executemany(INSERT_WORLD_ROOM, ((world_id, room_name, room.item)
+                                                for room_name, room in rooms.items() if room.item is not None))
+            return world_id
+
+    def get_or_create_player(self, name, start_room, world_id=None):
+        # Return the id of player name, inserting them if new. Players start in start_room of
+        # world world_id the first time they play it.
+        with self.transaction() as cur:
+            cur.execute(SELECT_PLAYER_ID, (name,))
+            row = cur.fetchone()
+            if row:
+                player_id = row[0]
+            else:
+                cur.execute(INSERT_PLAYER, (name, start_room))
+                player_id = cur.lastrowid
+            if world_id is not None:
+                cur.execute(INSERT_PLAYER_WORLD, (player_id, world_id, start_room))
+            return player_id
+
+    def save_state(self, player_id, room_name=None, inventory=None, added=(), removed=(), room_items=(),
+                   world_id=None, replace_rooms=False):
+        # Write only what changed, in a single transaction. Everything is kept per player and
+        # world world_id (see get_or_create_world).
+        # room_name: new current room or None if unchanged
+        # inventory: full inventory to replace the stored one, or None to apply added/removed
+        # room_items: (name, item) pairs for rooms changed
+        # replace_rooms: room_items holds every room; the player's saved rooms are replaced by
+        # those whose item differs from the world's starting item
+        with self.transaction() as cur:
+            if replace_rooms:
+                cur.execute(DELETE_PLAYER_ROOMS, (player_id, world_id))
+                start = dict(cur.execute(SELECT_WORLD_ROOMS, (world_id,)).fetchall())
+                room_items = [(name, item) for name, item in room_items if item != start.get(name)]
+            if room_name is not None:
+                cur.execute(UPSERT_PLAYER_WORLD, (player_id, world_id, room_name))
+            if inventory is not None:
+                cur.execute(DELETE_INVENTORY, (player_id, world_id))
+                cur.executemany(INSERT_INVENTORY, ((player_id, world_id, item) for item in inventory))
+            else:
+                cur.executemany(DELETE_INVENTORY_ITEM, ((player_id, world_id, item) for item in removed))
+                cur.executemany(INSERT_INVENTORY, ((player_id, world_id, item) for item in added))
+            cur.executemany(UPSERT_PLAYER_ROOM, ((player_id, world_id, name, item) for name, item in room_items))
+
+    def load_state(self, player_id, world_id=None, reset_rooms=()):
+        # Return (current_room, inventory items, {room: item}) of the player in world world_id,
+        # or None if the player is missing or has never played it.
+        # {room: item} holds the player's saved rooms, plus the starting item of any room in
+        # reset_rooms the player never saved (rooms changed since the last save).
+        with self.transaction() as cur:
+            cur.execute(SELECT_PLAYER_WORLD, (player_id, world_id))
+            row = cur.fetchone()
+            if not row:
+                return None
+            cur.execute(SELECT_INVENTORY, (player_id, world_id))
+            inventory = [item for (item,) in cur.fetchall()]
+            cur.execute(SELECT_PLAYER_ROOMS, (player_id, world_id))
+            room_items = dict(cur.fetchall())
+            for name in reset_rooms:
+                if name not in room_items:
+                    start = cur.execute(SELECT_WORLD_ROOM_ITEM, (world_id, name)).fetchone()
+                    room_items[name] = start[0] if start else None
+            return row[0], inventory, room_items
+
+    def log(self, player_id, action, details):
+        # Queue one row for the logs table, or insert it now if logging is synchronous
+        if self.log_writer:
+            self.log_writer.write(player_id, action, details)
+            return
+        with self.transaction() as cur:
+            write_logs(cur, [log_record(player_id, action, details)])
+
+    def flush_logs(self):
+        if self.log_writer:
+            self.log_writer.flush()
+
+    def last_journal_seq(self, player_id):
+        # Highest journal or snapshot sequence number of the player, 0 if none
+        self.flush_logs()
+        with self.transaction() as cur:
+            cur.execute(SELECT_LAST_JOURNAL_SEQ, (player_id, player_id))
+            return cur.fetchone()[0] or 0
+
+    def append_journal(self, player_id, events):
+        # Queue (seq, kind, data) journal events on the log writer, or write them in one transaction
+        if self.log_writer:
+            self.log_writer.write_journal(player_id, events)
+            return
+        with self.transaction() as cur:
+            cur.executemany(INSERT_JOURNAL, ((player_id, seq, kind, data) for seq, kind, data in events))
+
+    def save_snapshot(self, player_id, seq, state):
+        if self.log_writer:
+            self.log_writer.write_snapshot(player_id, seq, state)
+            return
+        with self.transaction() as cur:
+            cur.execute(UPSERT_SNAPSHOT, (player_id, seq, state))
+
+    def latest_snapshot(self, player_id, upto=None):
+        # Return (seq, state) of the newest snapshot at or before upto, or None
+        self.flush_logs()
+        with self.transaction() as cur:
+            cur.execute(SELECT_LATEST_SNAPSHOT, (player_id, LAST_SEQ if upto is None else upto))
+            return cur.fetchone()
+
+    def journal_after(self, player_id, seq, upto=None):
+        # Return [(seq, kind, data)] of the player's events after seq, up to upto
+        self.flush_logs()
+        with self.transaction() as cur:
+            cur.execute(SELECT_JOURNAL_AFTER, (player_id, seq, LAST_SEQ if upto is None else upto))
+            return cur.fetchall()
+
+    def outcome_counts(self, player_id=None):
+        # Return [(outcome, count)] for win and lose, of every player or of one
+        self.flush_logs()
+        with self.transaction() as cur:
+            if player_id is None:
+                cur.execute(COUNT_OUTCOMES)
+            else:
+                cur.execute(COUNT_PLAYER_OUTCOMES, (player_id,))
+            return cur.fetchall()
+
+    def daily_outcomes(self, since="0000-00-00"):
+        # Return [(day, outcome, count)] from the UTC day since (YYYY-MM-DD) on
+        self.flush_logs()
+        with self.transaction() as cur:
+            cur.execute(SELECT_DAILY_OUTCOMES, (since,))
+            return cur.fetchall()
+
+    def backfill_outcomes(self):
+        # Rebuild outcome_stats from the logs table; returns the number of outcomes counted
+        self.flush_logs()
+        with self.transaction() as cur:
+            cur.execute(OUTCOME_STATS_TABLE)
+            cur.execute(DELETE_OUTCOMES)
+            cur.execute(BACKFILL_OUTCOMES)
+            cur.execute(COUNT_OUTCOMES)
+            return sum(count for _, count in cur.fetchall())
+
+    def close(self):
+        # Write pending logs before the connections go away
+        if self.log_writer:
+            self.log_writer.close()
+        self.pool.close()
+
+
+def shard_player_id(local_id, index, count):
+    # Player id the game sees for local_id in shard index of count (see ShardedStorage)
+    return local_id * count + index
+
+
+def shard_paths(path, count):
+    # Database file of each shard: lostlab.db -> lostlab-0.db, lostlab-1.db, ...
+    root, ext = os.path.splitext(path)
+    return [f"{root}-{index}{ext or '.db'}" for index in range(count)]
+
+
+class ShardedStorage:
+    """ Storage spread over several SQLite files, each a full Storage with its own pool,
+        log writer and write lock, so writers of different shards never wait on each other.
+
+        A player lives in the shard their name hashes to. Player ids handed to the game
+        encode the shard (id = local id * shards + shard), and every per-player call is
+        routed by that id alone. Worlds are recorded in every shard, so world_id is a
+        tuple of per-shard ids. Statistics add up the counts of all shards.
+        The shard count is part of the ids, so a set of shards must always be opened with
+        the same count. """
+
+    def __init__(self, path=DEFAULT_DB_PATH, shards=4, pool_size=1, async_logs=True):
+        if shards < 1:
+            raise ValueError("Shard count must be at least 1.")
+        self.path = path
+        self.shards = [Storage(shard_path, pool_size, async_logs) for shard_path in shard_paths(path, shards)]
+
+    def shard_of_name(self, name):
+        # Stable across processes, unlike hash()
+        return zlib.crc32(name.encode("utf-8")) % len(self.shards)
+
+    def route(self, player_id):
+        # (shard index, id within the shard) of a player id; players without an id log to shard 0
+        if player_id is None:
+            return 0, None
+        return player_id % len(self.shards), player_id // len(self.shards)
+
+    def init_schema(self):
+        for shard in self.shards:
+            shard.init_schema()
+
+    def get_or_create_world(self, name, rooms):
+        return tuple(shard.get_or_create_world(name, rooms) for shard in self.shards)
+
+    def get_or_create_player(self, name, start_room, world_id=None):
+        index = self.shard_of_name(name)
+        local_id = self.shards[index].get_or_create_player(name, start_room, world_id[index] if world_id else None)
+        return shard_player_id(local_id, index, len(self.shards))
+
+    def save_state(self, player_id, room_name=None, inventory=None, added=(), removed=(), room_items=(),
+                   world_id=None, replace_rooms=False):
+        index, local_id = self.route(player_id)
+        self.shards[index].save_state(local_id, room_name, inventory, added, removed, room_items,
+                                      world_id[index] if world_id else None, replace_rooms)
+
+    def load_state(self, player_id, world_id=None, reset_rooms=()):
+        index, local_id = self.route(player_id)
+        return self.shards[index].load_state(local_id, world_id[index] if world_id else None, reset_rooms)
+
+    def log(self, player_id, action, details):
+        index, local_id = self.route(player_id)
+        self.shards[index].log(local_id, action, details)
+
+    def flush_logs(self):
+        for shard in self.shards:
+            shard.flush_logs()
+
+    def last_journal_seq(self, player_id):
+        index, local_id = self.route(player_id)
+        return self.shards[index].last_journal_seq(local_id)
+
+    def append_journal(self, player_id, events):
+        index, local_id = self.route(player_id)
+        self.shards[index].append_journal(local_id, events)
+
+    def save_snapshot(self, player_id, seq, state):
+        index, local_id = self.route(player_id)
+        self.shards[index].save_snapshot(local_id, seq, state)
+
+    def latest_snapshot(self, player_id, upto=None):
+        index, local_id = self.route(player_id)
+        return self.shards[index].latest_snapshot(local_id, upto)
+
+    def journal_after(self, player_id, seq, upto=None):
+        index, local_id = self.route(player_id)
+        return self.shards[index].journal_after(local_id, seq, upto)
+
+    def outcome_counts(self, player_id=None):
+        # Per-outcome totals across shards, or of one player from their shard
+        if player_id is not None:
+            index, local_id = self.route(player_id)
+            return self.shards[index].outcome_counts(local_id)
+        totals = Counter()
+        for shard in self.shards:
+            totals.update(dict(shard.outcome_counts()))
+        return sorted(totals.items())
+
+    def daily_outcomes(self, since="0000-00-00"):
+        totals = Counter()
+        for shard in self.shards:
+            totals.update({(day, outcome): count for day, outcome, count in shard.daily_outcomes(since)})
+        return [(day, outcome, count) for (day, outcome), count in sorted(totals.items())]
+
+    def backfill_outcomes(self):
+        return sum(shard.backfill_outcomes() for shard in self.shards)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+def open_storage(path=DEFAULT_DB_PATH, pool_size=1, shards=1):
+    # One database file, or ShardedStorage over shards files
+    if shards > 1:
+        return ShardedStorage(path, shards, pool_size)
+    return Storage(path, pool_size)
+
+
+class NullStorage:
+    # Stand-in for Storage when a game runs without a database (simulations, load tests).
+    # Writes are discarded and there is never saved data to load.
+    path = None
+
+    def init_schema(self):
+        pass
+
+    def get_or_create_world(self, name, rooms):
+        return None
+
+    def get_or_create_player(self, name, start_room, world_id=None):
+        return None
+
+    def save_state(self, player_id, room_name=None, inventory=None, added=(), removed=(), room_items=(),
+                   world_id=None, replace_rooms=False):
+        pass
+
+    def load_state(self, player_id, world_id=None, reset_rooms=()):
+        return None
+
+    def log(self, player_id, action, details):
+        pass
+
+    def flush_logs(self):
+        pass
+
+    def last_journal_seq(self, player_id):
+        return 0
+
+    def append_journal(self, player_id, events):
+        pass
+
+    def save_snapshot(self, player_id, seq, state):
+        pass
+
+    def latest_snapshot(self, player_id, upto=None):
+        return None
+
+    def journal_after(self, player_id, seq, upto=None):
+        return []
+
+    def outcome_counts(self, player_id=None):
+        return []
+
+    def daily_outcomes(self, since="0000-00-00"):
+        return []
+
+    def backfill_outcomes(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintenance for Lost Lab databases.")
+    parser.add_argument("command", choices=["backfill"],
+                        help="backfill: rebuild the win/lose statistics from the logs table")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)")
+    args = parser.parse_args()
+    storage = Storage(args.db, async_logs=False)
+    try:
+        storage.init_schema()
+        print(f"Counted {storage.backfill_outcomes()} win/lose outcomes in {args.db}.")
+    finally:
+        storage.close()
@@ -1,6 +1,7 @@
 import unittest
 import sqlite3
 from LostLabEnhanced import Room, Player, Game
+from startup_performance import loaded_heavy_modules
 
 
 class TestLostLab(unittest.TestCase):
@@ -14,13 +15,16 @@ class TestLostLab(unittest.TestCase):
             cur = conn.cursor()
             cur.execute("DELETE FROM player")
             cur.execute("DELETE FROM inventory")
-            cur.execute("DELETE FROM rooms")
+            cur.execute("DELETE FROM player_rooms")
             cur.execute("DELETE FROM logs")
             conn.commit()
-        # Reinitialize rooms table and player
+        # Reinitialize tables and player
         self.game.db_init()
         self.player.id = self.game.get_or_create_player("Hero")
 
+    def tearDown(self):
+        self.game.close()
+
     def test_room_initialization(self):
         # Test Room class initialization
         room = Room("Test Room", item="Test Item")
@@ -137,18 +141,81 @@ class TestLostLab(unittest.TestCase):
         self.assertEqual(result, "No path to Terrarium.")
         self.game.graph.add_edge("Decontamination", "Terrarium", weight=1)
 
+    def test_shortest_path_cache_hits(self):
+        # Test repeated lookups in the same hazard state are served from the cache
+        self.player.current_room = self.rooms["Rec Room"]
+        self.game.shortest_path("Cargo Hold")
+        self.game.shortest_path("Cargo Hold")
+        self.assertEqual(self.game.router.stats()["misses"], 1)
+        self.assertEqual(self.game.router.stats()["hits"], 1)
+        # Picking up unrelated items keeps the same hazard state
+        self.player.inventory.add("Ammo")
+        self.game.shortest_path("Cargo Hold")
+        self.assertEqual(self.game.router.stats()["hits"], 2)
+        # Meeting Med Bay requirements is a new hazard state
+        self.player.inventory.update({"MKIV Suit", "MKV Helmet"})
+        result = self.game.shortest_path("Cargo Hold")
+        self.assertEqual(result, "Shortest path to Cargo Hold: Rec Room -> Med Bay -> Cargo Hold")
+        self.assertEqual(self.game.router.stats()["misses"], 2)
+
+    def test_shortest_path_cache_invalidation(self):
+        # Test cached paths follow map and required item changes
+        self.player.current_room = self.rooms["Rec Room"]
+        self.assertEqual(self.game.shortest_path("Terrarium"),
+                         "Shortest path to Terrarium: Rec Room -> Decontamination -> Terrarium")
+        self.game.graph.remove_edge("Decontamination", "Terrarium")
+        self.assertEqual(self.game.shortest_path("Terrarium"), "No path to Terrarium.")
+        self.game.graph.add_edge("Decontamination", "Terrarium", weight=1)
+        # Gate Decontamination so the route detours through Water Treatment
+        self.game.graph.add_edge("Water Treatment", "Terrarium", weight=1)
+        self.rooms["Decontamination"].required_items = {"Ammo"}
+        self.assertEqual(self.game.shortest_path("Terrarium"),
+                         "Shortest path to Terrarium: Rec Room -> Mess Hall -> Water Treatment -> Terrarium")
+
+    def test_find_path_result(self):
+        # Test structured path result carries rooms, cost, and hazards
+        self.player.current_room = self.rooms["Cargo Hold"]
+        route = self.game.find_path("Med Bay")
+        self.assertEqual(route.rooms, ("Cargo Hold", "Med Bay"))
+        self.assertEqual(route.cost, 100)
+        self.assertEqual(route.hazards, ("Med Bay",))
+        self.player.inventory = {"MKIV Suit", "MKV Helmet"}
+        route = self.game.find_path("Lab")
+        self.assertEqual(route.rooms, ("Cargo Hold", "Med Bay", "Lab"))
+        self.assertEqual(route.cost, 2)
+        self.assertEqual(route.hazards, ())
+        self.assertIsNone(self.game.find_path("Nonexistent Room"))
+
+    def test_highlight_uses_path_result(self):
+        # Test highlight draws exactly the route from find_path without searching again
+        class FakeCanvas:
+            def __init__(self):
+                self.lines = []
+
+            def delete(self, tag):
+                pass
+
+            def create_line(self, x1, y1, x2, y2, **kwargs):
+                self.lines.append(((x1, y1), (x2, y2)))
+
+            def after(self, duration, callback):
+                pass
+
+        self.player.current_room = self.rooms["Rec Room"]
+        route = self.game.find_path("Terrarium")
+        lookups = self.game.router.misses + self.game.router.hits
+        canvas = FakeCanvas()
+        self.game.highlight_path(route, canvas)
+        self.assertEqual(self.game.router.misses + self.game.router.hits, lookups)
+        self.assertEqual(canvas.lines, [(self.game.room_positions["Rec Room"],
+                                         self.game.room_positions["Decontamination"]),
+                                        (self.game.room_positions["Decontamination"],
+                                         self.game.room_positions["Terrarium"])])
+
     def test_db_save_load(self):
         # Set up game state
         self.player.current_room = self.rooms["Med Bay"]
 
-        # Ensure rooms table in DB matches current rooms
-        with sqlite3.connect("lostlab.db") as conn:
-            cur = conn.cursor()
-            cur.execute("DELETE FROM rooms")
-            for room_name, room in self.rooms.items():
-                cur.execute("INSERT INTO rooms (name, item) VALUES (?, ?)", (room_name, room.item))
-            conn.commit()
-
         # Player picks up item (updates in-memory room)
         self.player.take_item("Medical Supplies")
         self.rooms["Lab"].item = "Recording"  # Make a change to another room
@@ -171,10 +238,53 @@ class TestLostLab(unittest.TestCase):
         self.assertEqual(new_game.player.inventory, {"Medical Supplies"})
         self.assertIsNone(new_game.rooms["Med Bay"].item)  # Med Bay item removed when picked up
         self.assertEqual(new_game.rooms["Lab"].item, "Recording")  # Lab item unchanged
+        new_game.close()
+
+    def test_db_save_only_dirty_rows(self):
+        # Test saves write only rooms and inventory rows that changed
+        self.game.save_to_db()
+        self.assertEqual(self.game.dirty_rooms, {})
+        self.player.current_room = self.rooms["Mess Hall"]
+        self.player.take_item("Ammo")
+        self.assertEqual(set(self.game.dirty_rooms), {"Mess Hall"})
+        self.assertEqual(self.rooms["Mess Hall"].dirty, {"item"})
+
+        statements = []
+        with self.game.storage.pool.connection() as conn:
+            conn.set_trace_callback(statements.append)
+        self.game.save_to_db()
+        with self.game.storage.pool.connection() as conn:
+            conn.set_trace_callback(None)
+        writes = [sql for sql in statements if sql.startswith("INSERT INTO player_rooms")]
+        self.assertEqual(len(writes), 1)
+        self.assertFalse(any(sql.startswith("DELETE FROM inventory") for sql in statements))
+        self.assertEqual(self.game.dirty_rooms, {})
+        self.assertEqual(self.player.dirty, set())
+
+        with sqlite3.connect("lostlab.db") as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT item FROM player_rooms WHERE player_id = ? AND name = 'Mess Hall'", (self.player.id,))
+            self.assertIsNone(cur.fetchone()[0])
+            cur.execute("SELECT item FROM inventory WHERE player_id = ?", (self.player.id,))
+            self.assertEqual(cur.fetchall(), [("Ammo",)])
+            cur.execute("SELECT current_room FROM player_worlds WHERE player_id = ?", (self.player.id,))
+            self.assertEqual(cur.fetchone()[0], "Mess Hall")
+
+    def test_db_save_removed_inventory(self):
+        # Test items dropped from inventory are deleted on the next save
+        self.player.inventory = {"Ammo", "Artifact"}
+        self.game.save_to_db()
+        self.player.inventory.discard("Ammo")
+        self.game.save_to_db()
+        with sqlite3.connect("lostlab.db") as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT item FROM inventory WHERE player_id = ?", (self.player.id,))
+            self.assertEqual(cur.fetchall(), [("Artifact",)])
 
     def test_db_log_action(self):
         # Test logging actions to database
         self.game.log_action("test", "Test action")
+        self.game.flush_logs()
         with sqlite3.connect("lostlab.db") as conn:
             cur = conn.cursor()
             cur.execute("SELECT action, details FROM logs WHERE player_id = ?", (self.player.id,))
@@ -217,6 +327,16 @@ class TestLostLab(unittest.TestCase):
         result = self.game.shortest_path("Lab")
         self.assertEqual(result, "Shortest path to Lab: Cargo Hold -> Med Bay -> Lab")
 
+    def test_lazy_heavy_imports(self):
+        # Test importing the module and constructing a Game load no GUI, plotting, or graph library
+        self.assertEqual(loaded_heavy_modules("import LostLabEnhanced"), [])
+        self.assertEqual(loaded_heavy_modules("import LostLabEnhanced\n"
+                                              "LostLabEnhanced.Game(db_path=':memory:').close()"), [])
+        # networkx is loaded once a path is needed
+        self.assertEqual(loaded_heavy_modules("import LostLabEnhanced\n"
+                                              "game = LostLabEnhanced.Game(db_path=':memory:')\n"
+                                              "game.shortest_path('Lab')\ngame.close()"), ["networkx"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from LostLabEnhanced import Game
+from charts import render_outcome_chart
+
+
+class TestCharts(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.game = Game(db_path=os.path.join(self.tmpdir.name, "test.db"))
+
+    def tearDown(self):
+        self.game.close()
+        self.tmpdir.cleanup()
+
+    def test_formats(self):
+        self.assertTrue(render_outcome_chart([("lose", 1), ("win", 2)], 'png').startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", render_outcome_chart([("win", 2)], 'svg'))
+        with self.assertRaises(ValueError):
+            render_outcome_chart([("win", 2)], 'gif')
+
+    def test_cached_until_counts_change(self):
+        charts = self.game.charts
+        self.assertIsNone(charts.chart().data)
+        self.game.log_action("win", "Player defeated the Alien with all items!")
+        first = charts.submit('png').result()
+        self.assertEqual(first.counts, (("win", 1),))
+        self.assertIs(charts.chart(), first)
+        self.game.log_action("lose", "Player was defeated by the Alien!")
+        second = charts.chart()
+        self.assertEqual(second.counts, (("lose", 1), ("win", 1)))
+        self.assertEqual((charts.renders, charts.hits), (3, 1))
+
+    def test_winlose_command_saves_file(self):
+        path = os.path.join(self.tmpdir.name, "chart.svg")
+        self.assertEqual(self.game.plot_win_lose(path), "No win/lose data to visualize.")
+        self.game.log_action("win", "Player defeated the Alien with all items!")
+        self.assertEqual(self.game.plot_win_lose(path), f"Win/lose chart saved to {path}.")
+        with open(path, "rb") as f:
+            self.assertIn(b"<svg", f.read())
+        with self.assertRaises(ValueError):
+            self.game.charts.save(os.path.join(self.tmpdir.name, "chart.txt"))
+
+    def test_winlose_command_paths(self):
+        # Test winlose writes next to the database by default, or to a .png/.svg path it is given
+        self.game.log_action("win", "Player defeated the Alien with all items!")
+        default = os.path.join(self.tmpdir.name, "win_lose.png")
+        self.assertEqual(self.game.handle_command("winlose").message, f"Win/lose chart saved to {default}.")
+        self.assertTrue(os.path.exists(default))
+        path = os.path.join(self.tmpdir.name, "chart.SVG")
+        self.assertEqual(self.game.handle_command(f"winlose {path}").message, f"Win/lose chart saved to {path}.")
+        with self.assertRaises(ValueError) as context:
+            self.game.handle_command("winlose chart.gif")
+        self.assertEqual(str(context.exception), "Charts are saved as .png or .svg files.")
+        missing = os.path.join(self.tmpdir.name, "missing", "chart.png")
+        self.assertTrue(self.game.handle_command(f"winlose {missing}").message.startswith(
+            "Error visualizing win/lose data:"))
+
+    def test_no_interactive_backend(self):
+        # Test rendering never imports pyplot, which would select an interactive backend
+        code = ("import sys, charts; charts.render_outcome_chart([('win', 1)]); "
+                "print('matplotlib.pyplot' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
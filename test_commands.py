@@ -0,0 +1,79 @@
+import threading
+import unittest
+import LostLabEnhanced
+from commands import BatchError, CommandRegistry, game_commands
+from engine import Game
+
+
+class TestCommandRegistry(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None)
+        self.game.commands = game_commands()  # Fresh counters for this test
+        self.commands = self.game.commands
+
+    def test_validation(self):
+        for text, message in (("dance", "Invalid action."), ("north now", "Invalid action."),
+                              ("get", "Please specify an item to get."), ("get  ", "Please specify an item to get."),
+                              ("get Ammo2", "Item name must contain only letters and spaces."),
+                              ("path", "Please specify a room.")):
+            with self.assertRaises(ValueError) as raised:
+                self.game.handle_command(text)
+            self.assertEqual(str(raised.exception), message)
+        self.assertEqual(self.commands.counts, {})
+
+    def test_batch(self):
+        results = self.game.handle_commands("north; east ;get MKV Helmet;;")
+        self.assertEqual([result.message for result in results],
+                         ["You moved to Sleeping Quarters.", "You moved to Bathroom.", "You picked up MKV Helmet."])
+        self.assertEqual(self.commands.stats()["get"].count, 1)
+        self.assertEqual(self.commands.stats()["east"].count, 1)
+        self.assertGreaterEqual(self.commands.stats()["north"].max, self.commands.stats()["north"].mean)
+
+    def test_batch_stops_at_invalid_command(self):
+        with self.assertRaises(BatchError) as raised:
+            self.game.handle_commands(["south", "fly", "south"])
+        self.assertEqual(str(raised.exception), "Command 2 (fly): Invalid action.")
+        self.assertEqual(len(raised.exception.results), 1)
+        self.assertEqual(self.game.player.current_room.name, "Decontamination")
+
+    def test_batch_events(self):
+        # Test events are collected after each command of a batch
+        results = self.game.handle_commands("west;south;south")
+        self.assertEqual([event.kind for event in results[0].events], ["hazard"])
+        self.assertEqual([event.kind for event in results[2].events], ["defeat"])
+
+    def test_extended_registry(self):
+        # Test the GUI adds its own verb without changing the engine's table
+        gui_commands = LostLabEnhanced.Game.commands
+        self.assertIn('winlose', gui_commands.specs)
+        self.assertNotIn('winlose', Game.commands.specs)
+        self.assertTrue(gui_commands.uses_storage("north;winlose"))
+        self.assertFalse(gui_commands.uses_storage("north;get Ammo"))
+        self.assertTrue(gui_commands.blocks("north;hint"))
+        self.assertFalse(gui_commands.uses_storage("north;hint"))
+        self.assertFalse(gui_commands.blocks("north;get Ammo"))
+        registry = CommandRegistry()
+        registry.register('shout', lambda game, verb, text: (text.upper(), None), "something", r'^[a-z ]+$', "Quietly.")
+        self.assertEqual(registry.dispatch(self.game, "shout hello").message, "HELLO")
+        with self.assertRaises(ValueError):
+            registry.dispatch(self.game, "shout HELLO")
+
+    def test_counters_across_threads(self):
+        # Test one registry used from several threads counts every dispatch
+        games = [Game(db_path=None) for _ in range(4)]
+
+        def play(game):
+            for _ in range(500):
+                self.commands.dispatch(game, "north")
+                self.commands.dispatch(game, "south")
+        threads = [threading.Thread(target=play, args=(game,)) for game in games]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.commands.stats()
+        self.assertEqual((stats["north"].count, stats["south"].count), (2000, 2000))
+
+
+if __name__ == '__main__':
+    unittest.main()
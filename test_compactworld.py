@@ -0,0 +1,93 @@
+import gc
+import os
+import tempfile
+import tracemalloc
+import unittest
+from compactworld import CompactWorld
+from engine import Game
+from worlds import generate_world, world_header, world_records
+
+
+class TestCompactWorld(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None, compact=True)
+        self.rooms = self.game.rooms
+
+    def test_builtin_world(self):
+        # Test the built-in world plays the same from the compact store
+        self.assertIsInstance(self.rooms, CompactWorld)
+        reference = Game(db_path=None)
+        by_name = lambda record: record.get("name", "")
+        self.assertEqual(sorted(world_records(self.game), key=by_name),
+                         sorted(world_records(reference), key=by_name))
+        self.assertIs(self.rooms["Rec Room"].get_exit("NORTH"), self.rooms["Sleeping Quarters"])
+        self.assertIsNone(self.rooms["Terrarium"].get_exit("south"))
+        self.assertIsNone(self.rooms["Terrarium"].get_exit("up"))
+        self.assertEqual(self.rooms["Med Bay"].required_items, {"MKIV Suit", "MKV Helmet"})
+        plan = self.game.plan_route()
+        self.assertEqual(plan.moves, 10)
+        for command in plan.commands:
+            self.game.handle_command(command)
+        self.assertTrue(self.game.check_victory())
+
+    def test_dirty_tracking(self):
+        # Test item pickups and requirement changes reach the game like Room objects do
+        self.game.handle_command("north")
+        self.game.handle_command("get artifact")
+        self.assertIsNone(self.rooms["Sleeping Quarters"].item)
+        self.assertEqual(list(self.game.dirty_rooms), ["Sleeping Quarters"])
+        self.assertEqual(self.rooms["Sleeping Quarters"].dirty, {"item"})
+        self.game.clear_dirty_rooms()
+        self.assertEqual(self.rooms["Sleeping Quarters"].dirty, set())
+        self.game.shortest_path("Med Bay")
+        self.rooms["Med Bay"].required_items = set()
+        self.assertEqual(self.rooms["Med Bay"].required_items, set())
+        self.assertFalse(self.game.find_path("Med Bay").hazards)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "compact.db")
+            game = Game(db_path=db_path, compact=True)
+            game.handle_command("east")
+            game.handle_command("get Ammo")
+            game.save_to_db()
+            game.close()
+            loaded = Game(db_path=db_path, compact=True)
+            loaded.load_from_db()
+            self.assertEqual(loaded.player.current_room.name, "Mess Hall")
+            self.assertEqual(loaded.player.inventory, {"Ammo"})
+            self.assertIsNone(loaded.rooms["Mess Hall"].item)
+            self.assertEqual(loaded.dirty_rooms, {})
+            loaded.close()
+
+    def test_positions(self):
+        positions = self.game.room_positions
+        self.assertEqual(positions["Rec Room"], (400, 140))
+        self.assertEqual(len(positions), 10)
+        positions["Rec Room"] = (1, 2)
+        self.assertEqual(dict(positions)["Rec Room"], (1, 2))
+
+    def test_invalid_exits(self):
+        header = world_header("A", "A", 0)
+        for records in ([header, {"name": "A", "exits": {"up": "A"}}],
+                        [header, {"name": "A", "exits": {"north": "B"}}],
+                        [header, {"name": "A"}, {"name": "A"}]):
+            with self.assertRaises(ValueError):
+                Game(db_path=None, world=records, compact=True)
+
+    def test_memory_per_room(self):
+        # Test the compact store needs an order of magnitude less memory than Room objects
+        records = list(generate_world(60, 60, seed=2))
+        used = []
+        for compact in (False, True):
+            gc.collect()
+            tracemalloc.start()
+            game = Game(db_path=None, world=records, compact=compact)
+            used.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del game
+        self.assertLess(used[1] * 5, used[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from engine import Game
+
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        # Headless game on a throwaway database
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.game = Game(db_path=os.path.join(self.tmpdir.name, "test.db"))
+        self.rooms = self.game.rooms
+
+    def tearDown(self):
+        self.game.close()
+        self.tmpdir.cleanup()
+
+    def test_engine_has_no_gui_imports(self):
+        # Test importing the engine does not pull in tkinter or matplotlib
+        code = "import sys, engine; print('tkinter' in sys.modules, 'matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        self.assertEqual(output.strip(), "False False")
+
+    def test_hazard_event(self):
+        # Test blocked move returns a hazard event instead of a popup
+        result = self.game.handle_command("west")
+        self.assertEqual(result.message, "Cannot enter Med Bay: missing MKIV Suit, MKV Helmet.")
+        self.assertEqual([event.kind for event in result.events], ["hazard"])
+        self.assertIn("Missing required items: MKIV Suit, MKV Helmet.", result.events[0].message)
+        # Events are only returned once
+        self.assertEqual(self.game.handle_command("north").events, [])
+
+    def test_outcome_events(self):
+        # Test reaching the Terrarium returns victory or defeat
+        self.game.handle_command("south")
+        result = self.game.handle_command("south")
+        self.assertEqual([event.kind for event in result.events], ["defeat"])
+
+        won = Game(db_path=None)
+        won.player.current_room = won.rooms["Decontamination"]
+        won.player.inventory = {"Empty Laser Weapon", "Recording", "Medical Supplies", "MKIV Suit",
+                                "Artifact", "MKV Helmet", "Ammo", "Shield Charge"}
+        result = won.handle_command("south")
+        self.assertEqual([event.kind for event in result.events], ["victory"])
+        self.assertEqual(won.outcome, 'win')
+
+    def test_outcome_counted_once(self):
+        # Test the game ends at the first outcome: it is logged once and later commands are refused
+        self.game.handle_commands("south;south")
+        self.assertEqual(self.game.outcome, 'lose')
+        for command in ("where ammo", "hint", "path rec room"):
+            with self.assertRaisesRegex(ValueError, "The game is over."):
+                self.game.handle_command(command)
+        self.assertTrue(self.game.check_defeat())
+        self.assertEqual(self.game.collect_events(), [])
+        self.assertEqual(self.game.storage.outcome_counts(), [('lose', 1)])
+
+    def test_path_command_route(self):
+        # Test path command returns the route used for its status text
+        result = self.game.handle_command("path terrarium")
+        self.assertEqual(result.message, "Shortest path to Terrarium: Rec Room -> Decontamination -> Terrarium")
+        self.assertEqual(result.route.rooms, ("Rec Room", "Decontamination", "Terrarium"))
+
+    def test_invalid_commands(self):
+        for action in ("up", "get ", "get Ammo!", "path "):
+            with self.assertRaises(ValueError):
+                self.game.handle_command(action)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from engine import Game
+from export import CHECKPOINT_FILE, export, read_checkpoint
+from storage import ShardedStorage
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.out = os.path.join(self.tmpdir.name, "export")
+        self.game = Game(db_path=self.db_path)
+        self.log(7)
+
+    def tearDown(self):
+        self.game.close()
+        self.tmpdir.cleanup()
+
+    def log(self, count, action="move"):
+        for i in range(count):
+            self.game.log_action(action, f"Step {i}")
+        self.game.flush_logs()
+
+    def read_csv(self, table):
+        with open(os.path.join(self.out, f"{table}.csv"), newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_csv_resumes_from_checkpoint(self):
+        # Test a second export appends only the log rows added since the first
+        report = export(self.db_path, self.out, 'csv', chunk_size=3)
+        self.assertEqual(report.rows, {'logs': 7, 'player': 1, 'worlds': 1, 'player_worlds': 1, 'inventory': 0,
+                                       'player_rooms': 0})
+        self.assertEqual(report.last_log_id, 7)
+        self.log(4, "win")
+        report = export(self.db_path, self.out, 'csv', chunk_size=3)
+        self.assertEqual(report.rows['logs'], 4)
+        rows = self.read_csv('logs')
+        self.assertEqual(rows[0], ['id', 'player_id', 'action', 'details', 'created_at'])
+        self.assertEqual([row[0] for row in rows[1:]], [str(i) for i in range(1, 12)])
+        self.assertEqual(rows[-1][2], "win")
+        self.assertEqual(len(self.read_csv('player')), 2)
+        self.assertEqual(export(self.db_path, self.out, 'csv').rows['logs'], 0)
+
+    def test_interrupted_export_is_truncated(self):
+        # Test rows written after the last checkpoint are dropped rather than duplicated
+        export(self.db_path, self.out, 'jsonl')
+        with open(os.path.join(self.out, "logs.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"id": 8, "action": "partial"')
+        self.log(2)
+        export(self.db_path, self.out, 'jsonl')
+        with open(os.path.join(self.out, "logs.jsonl"), encoding="utf-8") as f:
+            ids = [json.loads(line)["id"] for line in f]
+        self.assertEqual(ids, list(range(1, 10)))
+
+    def test_columnar(self):
+        self.game.handle_command("east")
+        self.game.handle_command("get ammo")
+        self.game.save_to_db()
+        export(self.db_path, self.out, 'columnar', chunk_size=2)
+        folder = os.path.join(self.out, "inventory.columns")
+        with open(os.path.join(folder, "item.jsonl"), encoding="utf-8") as f:
+            self.assertEqual([json.loads(line) for line in f], ["Ammo"])
+        with open(os.path.join(self.out, "logs.columns", "action.jsonl"), encoding="utf-8") as f:
+            actions = [json.loads(line) for line in f]
+        self.assertEqual(len(actions), read_checkpoint(self.out)["logs_id"])
+
+    def test_player_state_per_world(self):
+        # Test the exported position, inventory and rooms are the ones the game saved, per world
+        self.game.handle_commands("east;get ammo;north;save")
+        export(self.db_path, self.out, 'jsonl')
+
+        def read(table):
+            with open(os.path.join(self.out, f"{table}.jsonl"), encoding="utf-8") as f:
+                return [json.loads(line) for line in f]
+        player_id, world_id = self.game.player.id, self.game.world_id
+        self.assertEqual(read('worlds')[0]["name"], "Lost Lab")
+        self.assertEqual(read('player_worlds'), [{"player_id": player_id, "world_id": world_id,
+                                                  "current_room": self.game.player.current_room.name}])
+        self.assertEqual([(row["world_id"], row["item"]) for row in read('inventory')], [(world_id, "Ammo")])
+        self.assertEqual(read('player_rooms'), [{"player_id": player_id, "world_id": world_id, "name": "Mess Hall",
+                                                 "item": None}])
+        self.assertNotIn("current_room", read('player')[0])
+
+    def test_format_is_fixed_per_directory(self):
+        export(self.db_path, self.out, 'csv')
+        with self.assertRaises(ValueError):
+            export(self.db_path, self.out, 'jsonl')
+        with self.assertRaises(ValueError):
+            export(self.db_path, os.path.join(self.tmpdir.name, "other"), 'parquet')
+        self.assertTrue(os.path.exists(os.path.join(self.out, CHECKPOINT_FILE)))
+
+
+class TestShardedExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.out = os.path.join(self.tmpdir.name, "export")
+        self.storage = ShardedStorage(self.db_path, shards=3)
+        self.storage.init_schema()
+        with self.storage.shards[1].transaction() as cur:
+            # Shard 1 numbers its worlds differently
+            cur.execute("INSERT INTO worlds (name) VALUES ('Elsewhere')")
+            cur.execute("DELETE FROM worlds WHERE name = 'Elsewhere'")
+        self.games = [Game(storage=self.storage, player_name=f"Player {i}") for i in range(6)]
+
+    def tearDown(self):
+        for game in self.games:
+            game.close()
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def read(self, table):
+        with open(os.path.join(self.out, f"{table}.jsonl"), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_all_shards_with_game_ids(self):
+        # Test every shard is exported and ids are the ones the game uses
+        for game in self.games:
+            game.handle_commands("east;get ammo;save")
+        self.storage.flush_logs()
+        report = export(self.db_path, self.out, 'jsonl', shards=3)
+        self.assertEqual(report.rows['player'], 6)
+        self.assertEqual(len(report.last_log_id), 3)
+        players = {row["name"]: row["id"] for row in self.read('player')}
+        self.assertEqual(players, {f"Player {i}": game.player.id for i, game in enumerate(self.games)})
+        world_id = self.read('worlds')[0]["id"]
+        self.assertEqual(sorted((row["player_id"], row["world_id"], row["current_room"])
+                                for row in self.read('player_worlds')),
+                         sorted((game.player.id, world_id, "Mess Hall") for game in self.games))
+        self.assertEqual({row["player_id"] for row in self.read('logs')}, set(players.values()))
+        self.assertEqual(len({row["id"] for row in self.read('inventory')}), 6)
+        self.assertEqual(export(self.db_path, self.out, 'jsonl', shards=3).rows['logs'], 0)
+
+    def test_sharded_database_needs_shard_count(self):
+        with self.assertRaisesRegex(ValueError, "is sharded"):
+            export(self.db_path, self.out, 'jsonl')
+        export(self.db_path, self.out, 'jsonl', shards=3)
+        with self.assertRaisesRegex(ValueError, "3 shard"):
+            export(self.db_path, self.out, 'jsonl', shards=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
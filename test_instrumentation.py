@@ -0,0 +1,114 @@
+import unittest
+from engine import Game, Player
+from instrumentation import (Histogram, Instrumentation, SamplingProfiler, VerbProfile, bucket_bounds, bucket_of,
+                             profile_command)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_cover_latencies(self):
+        # Test every latency falls inside the bounds of its bucket and buckets are in order
+        previous = -1
+        for ns in list(range(200)) + [10 ** 6, 10 ** 6 + 1, 2 ** 40]:
+            index = bucket_of(ns)
+            low, high = bucket_bounds(index)
+            self.assertTrue(low <= ns < high, ns)
+            self.assertGreaterEqual(index, previous)
+            previous = index
+
+    def test_percentiles_and_merge(self):
+        # Test percentiles land within a bucket of the true value and merging adds counts
+        histogram = Histogram()
+        for ns in range(1000, 101000, 1000):
+            histogram.record(ns)
+        self.assertAlmostEqual(histogram.percentile(50), 50000, delta=50000 * 0.25)
+        self.assertAlmostEqual(histogram.percentile(99), 99000, delta=99000 * 0.25)
+        self.assertEqual(histogram.percentile(100), 100000)
+        merged = Histogram()
+        merged.merge(histogram.snapshot())
+        merged.merge(histogram.snapshot())
+        self.assertEqual(merged.count, 200)
+        self.assertEqual(merged.percentile(50), histogram.percentile(50))
+        self.assertEqual(Histogram().percentile(50), 0)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Instrumentation()
+        self.game = Game(db_path=None)
+
+    def tearDown(self):
+        self.metrics.disable()
+        self.game.close()
+
+    def test_enable_and_disable(self):
+        # Test hot paths are timed only while enabled and the original methods come back
+        move = Player.move
+        self.metrics.enable()
+        self.metrics.enable()  # A second enable does not wrap twice
+        self.assertTrue(self.metrics.enabled)
+        self.game.handle_command("north")
+        self.game.handle_command("path med bay")
+        self.metrics.disable()
+        self.assertIs(Player.move, move)
+        self.game.handle_command("south")
+        summary = self.metrics.summary()
+        self.assertEqual(summary["Player.move"]["count"], 1)
+        self.assertEqual(summary["Game.find_path"]["count"], 1)
+        self.assertNotIn("Game.save_to_db", summary)
+        self.assertLessEqual(summary["Player.move"]["p50_us"], summary["Player.move"]["max_us"])
+        self.assertIn("Player.move", self.metrics.report())
+        self.metrics.reset()
+        self.assertEqual(self.metrics.report(), "No instrumented calls recorded.")
+
+    def test_merge_snapshot(self):
+        # Test snapshots from other processes add up
+        self.metrics.enable([('engine', 'Player', 'move')])
+        self.game.handle_command("north")
+        total = Instrumentation()
+        total.merge(self.metrics.snapshot())
+        total.merge(self.metrics.snapshot())
+        self.assertEqual(total.histograms["Player.move"].count, 2)
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None)
+
+    def tearDown(self):
+        self.game.close()
+
+    def test_profile_command(self):
+        # Test a command runs normally under either profiler
+        result, report = profile_command(self.game, "path med bay")
+        self.assertEqual(result.route.rooms[-1], "Med Bay")
+        self.assertIn("find_path", report)
+        result, report = profile_command(self.game, "north", mode='sample')
+        self.assertEqual(result.message, "You moved to Sleeping Quarters.")
+        self.assertIn("samples", report)
+        with self.assertRaises(ValueError):
+            profile_command(self.game, "north", mode='trace')
+
+    def test_verb_profile(self):
+        # Test a verb is profiled on every dispatch until removed
+        registry = self.game.commands
+        handler = registry.specs["path"].handler
+        profile = VerbProfile(registry, "path")
+        try:
+            self.game.handle_command("path med bay")
+            self.game.handle_command("path armory")
+        finally:
+            profile.remove()
+        self.assertIs(registry.specs["path"].handler, handler)
+        self.assertEqual(profile.runs, 2)
+        self.assertIn("path: 2 runs", profile.report())
+
+    def test_sampling_profiler(self):
+        # Test the sampler sees the busy function of the sampled thread
+        def busy():
+            return sum(i * i for i in range(300000))
+        with SamplingProfiler(interval=0.0005) as sampler:
+            for _ in range(5):
+                busy()
+        self.assertGreater(sampler.samples, 0)
+        self.assertIn("busy", {function for _, _, function in sampler.cumulative})
+        self.assertIn("samples every 0.5 ms", sampler.report())
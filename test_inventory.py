@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from engine import Game
+from inventory import BitsetInventory, ItemRegistry
+
+
+class TestBitsetInventory(unittest.TestCase):
+    def setUp(self):
+        self.registry = ItemRegistry(["Ammo", "Artifact", "Recording"])
+        self.inventory = BitsetInventory(self.registry, {"Ammo", "Recording"})
+
+    def test_set_behaviour(self):
+        self.assertEqual(self.inventory, {"Ammo", "Recording"})
+        self.assertEqual(len(self.inventory), 2)
+        self.assertIn("Ammo", self.inventory)
+        self.assertNotIn("Artifact", self.inventory)
+        self.assertNotIn("Unknown", self.inventory)
+        self.inventory.add("Shield Charge")  # Unregistered items get the next bit
+        self.inventory.discard("Ammo")
+        self.assertEqual(sorted(self.inventory), ["Recording", "Shield Charge"])
+        self.assertTrue({"Recording"} <= self.inventory)
+        self.inventory.clear()
+        self.inventory.update(["Artifact"])
+        self.assertEqual(self.inventory.mask, 1 << self.registry.ids["Artifact"])
+
+    def test_bitset_operations(self):
+        # Test operators between inventories of one registry return bitset inventories
+        other = BitsetInventory(self.registry, {"Ammo", "Artifact"})
+        self.assertEqual(self.inventory - other, {"Recording"})
+        self.assertEqual(self.inventory & other, {"Ammo"})
+        self.assertEqual(self.inventory | other, {"Ammo", "Artifact", "Recording"})
+        self.assertIsInstance(self.inventory - other, BitsetInventory)
+        self.assertEqual(self.inventory - {"Ammo"}, {"Recording"})
+        copy = self.inventory.copy()
+        copy.add("Artifact")
+        self.assertNotIn("Artifact", self.inventory)
+
+    def test_gate_checks(self):
+        # Test requirement checks against frozensets and other inventories use the masks
+        self.assertTrue(frozenset({"Ammo", "Recording"}) <= self.inventory)
+        self.assertFalse(frozenset({"Ammo", "Artifact"}) <= self.inventory)
+        self.assertTrue(frozenset() <= self.inventory)
+        self.assertFalse(frozenset({"Unknown"}) <= self.inventory)
+        self.assertTrue({"Recording"} <= self.inventory)
+        self.assertFalse(self.inventory >= {"Artifact"})
+        other = BitsetInventory(self.registry, {"Ammo"})
+        self.assertTrue(other <= self.inventory)
+        self.assertTrue(self.inventory >= other)
+        self.assertFalse(self.inventory <= other)
+
+
+class TestBitsetGame(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None, inventory='bitset')
+        self.player = self.game.player
+
+    def test_hazard_check(self):
+        # Test gate checks give the same results and messages as the set backend
+        self.player.current_room = self.game.rooms["Rec Room"]
+        self.assertEqual(self.player.move("west"), "Cannot enter Med Bay: missing MKIV Suit, MKV Helmet.")
+        self.player.inventory = {"MKIV Suit"}
+        self.assertIsInstance(self.player.inventory, BitsetInventory)
+        self.assertEqual(self.player.move("west"), "Cannot enter Med Bay: missing MKV Helmet.")
+        self.player.inventory.add("MKV Helmet")
+        self.assertEqual(self.player.move("west"), "You moved to Med Bay.")
+
+    def test_blocked_rooms_by_mask(self):
+        # Test the router looks blocked rooms up by inventory mask and forgets them on requirement changes
+        router = self.game.router
+        self.assertEqual(router.blocked_rooms(self.player.inventory), {"Med Bay"})
+        self.player.inventory.update({"MKIV Suit", "MKV Helmet"})
+        self.assertEqual(router.blocked_rooms(self.player.inventory), frozenset())
+        self.game.rooms["Lab"].required_items = {"Ammo"}
+        self.assertEqual(router.blocked_rooms(self.player.inventory), {"Lab"})
+
+    def test_plan_wins(self):
+        for compact in (False, True):
+            game = Game(db_path=None, inventory='bitset', compact=compact)
+            for command in game.plan_route().commands:
+                game.handle_command(command)
+            self.assertEqual(game.player.inventory.mask.bit_count(), 8)
+            self.assertTrue(game.check_victory())
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "bitset.db")
+            game = Game(db_path=db_path, inventory='bitset')
+            game.handle_command("north")
+            game.handle_command("get Artifact")
+            game.save_to_db()
+            game.handle_command("east")
+            game.handle_command("get MKV Helmet")
+            self.assertEqual(game.player.inventory_changes(), ({"MKV Helmet"}, set()))
+            game.save_to_db()
+            game.close()
+            loaded = Game(db_path=db_path, inventory='bitset')
+            loaded.load_from_db()
+            self.assertEqual(loaded.player.inventory, {"Artifact", "MKV Helmet"})
+            loaded.close()
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            Game(db_path=None, inventory='list')
+
+
+if __name__ == '__main__':
+    unittest.main()
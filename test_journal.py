@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from engine import Game
+from journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.game = Game(db_path=self.db_path, journal='new')
+
+    def tearDown(self):
+        self.game.close()
+        self.tmpdir.cleanup()
+
+    def play(self, script):
+        for command in script.split(";"):
+            self.game.handle_command(command)
+
+    def resume(self):
+        # A new game on the same database, as after a crash; nothing was saved
+        self.game.close()
+        self.game = Game(db_path=self.db_path, journal='resume')
+        return self.game
+
+    def test_events_are_structured(self):
+        self.play("east;get ammo;north;save;west;path lab")
+        kinds = [(event.kind, event.data) for event in self.game.journal.history()]
+        self.assertEqual(kinds, [("start", None), ("move", "Mess Hall"), ("take", "Ammo"), ("move", "Bathroom"),
+                                 ("save", None), ("move", "Sleeping Quarters")])
+
+    def test_resume_replays_after_snapshot(self):
+        # Test a crashed session is rebuilt from its last snapshot plus the events after it
+        self.game.journal.snapshot_interval = 5
+        self.play("east;get ammo;north;get mkv helmet;west;west;get mkiv suit;east")
+        game = self.resume()
+        self.assertEqual(game.player.current_room.name, "Sleeping Quarters")
+        self.assertEqual(game.player.inventory, {"Ammo", "MKV Helmet", "MKIV Suit"})
+        self.assertIsNone(game.rooms["Bathroom"].item)
+        self.assertIsNone(game.rooms["Cargo Hold"].item)
+        self.assertEqual(game.rooms["Sleeping Quarters"].item, "Artifact")
+        # Resuming carries on numbering, and the rebuilt state keeps playing
+        self.assertEqual(game.journal.seq, 9)
+        self.assertEqual(game.handle_command("south").message, "You moved to Rec Room.")
+        self.assertEqual(game.journal.history(after=9), [(10, "move", "Rec Room")])
+
+    def test_replay_is_bounded_by_snapshot_interval(self):
+        self.game.journal.snapshot_interval = 10
+        for _ in range(12):
+            self.play("north;south")
+        self.game.close()
+        self.game = Game(db_path=self.db_path)
+        journal = Journal(self.game)
+        replay = journal.restore()
+        self.assertEqual(replay.snapshot_seq, 21)
+        self.assertEqual(replay.events, 4)
+        self.assertEqual(self.game.player.current_room.name, "Rec Room")
+        # Audit: state as of an earlier event
+        self.assertEqual(journal.restore(upto=8).events, 7)
+        self.assertEqual(self.game.player.current_room.name, "Sleeping Quarters")
+
+    def test_load_and_new_session(self):
+        # Test load snapshots the loaded state, and a new session does not resume the old one
+        self.play("east;get ammo;save;north;get mkv helmet;load")
+        game = self.resume()
+        self.assertEqual(game.player.current_room.name, "Mess Hall")
+        self.assertEqual(game.player.inventory, {"Ammo"})
+        self.assertEqual(game.rooms["Bathroom"].item, "MKV Helmet")
+        self.assertIsNone(game.rooms["Mess Hall"].item)
+        game.close()
+        self.game = Game(db_path=self.db_path, journal='new')
+        self.assertEqual(self.game.player.current_room.name, "Rec Room")
+        self.game.close()
+        self.game = Game(db_path=self.db_path, journal='resume')
+        self.assertEqual(self.game.player.inventory, set())
+
+    def test_direct_player_calls_and_queued_writes(self):
+        # Test moves made on the player directly are journaled, through the log writer rather than
+        # a transaction on the calling thread
+        storage = self.game.storage
+        transaction = storage.transaction
+        storage.transaction = lambda: self.fail("Journal event written synchronously.")
+        try:
+            self.game.player.move("east")
+            self.game.player.take_item("Ammo")
+        finally:
+            storage.transaction = transaction
+        self.assertEqual(self.game.journal.history(after=1), [(2, "move", "Mess Hall"), (3, "take", "Ammo")])
+        game = self.resume()
+        self.assertEqual(game.player.inventory, {"Ammo"})
+
+    def test_record_before_start(self):
+        # Test a journal used before start() snapshots first instead of failing
+        game = Game(db_path=self.db_path)
+        try:
+            journal = Journal(game)
+            journal.record('move', "Rec Room")
+            self.assertEqual(journal.snapshot_seq, journal.seq)
+        finally:
+            game.close()
+
+    def test_journal_mode(self):
+        with self.assertRaises(ValueError):
+            Game(db_path=None, journal='replay')
+        self.assertIsNone(Game(db_path=None).journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from engine import Game
+from lookup import NameIndex
+from worlds import generate_world
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None)
+        self.index = NameIndex(self.game.rooms)
+
+    def test_lookup_ignores_case_and_spacing(self):
+        self.assertEqual(self.index.room_name("med   BAY"), "Med Bay")
+        self.assertEqual(self.index.item_name("mkiv suit"), "MKIV Suit")
+        self.assertEqual(self.index.rooms_with_item("MKIV SUIT"), ["Cargo Hold"])
+        self.assertIsNone(self.index.room_name("Bridge"))
+
+    def test_completion(self):
+        # Test prefix matches come from the sorted keys and typos fall back to fuzzy matches
+        self.assertEqual(self.index.complete_room("m"), ["Med Bay", "Mess Hall"])
+        self.assertEqual(self.index.complete_room("Terarium"), ["Terrarium"])
+        self.assertEqual(self.index.complete_item("mk"), ["MKIV Suit", "MKV Helmet"])
+        self.assertEqual(self.index.complete_room("zzz"), [])
+
+    def test_item_moves(self):
+        # Test the game keeps the item index current as items are picked up
+        index = self.game.lookup
+        self.game.handle_command("east")
+        self.game.handle_command("get ammo")
+        self.assertEqual(index.rooms_with_item("Ammo"), [])
+        self.assertEqual(self.game.handle_command("where AMMO").message, "You are carrying Ammo.")
+        self.game.rooms["Lab"].item = "Ammo"
+        self.assertEqual(index.rooms_with_item("ammo"), ["Lab"])
+
+
+class TestLookupCommands(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None)
+
+    def test_path_command(self):
+        expected = "Shortest path to Terrarium: Rec Room -> Decontamination -> Terrarium"
+        for text in ("terrarium", "TERRARIUM", "terr"):
+            self.assertEqual(self.game.handle_command(f"path {text}").message, expected)
+        # Ambiguous prefix and typo both suggest rooms
+        self.assertEqual(self.game.handle_command("path me").message,
+                         "Room 'me' does not exist. Did you mean Med Bay, Mess Hall?")
+        self.assertEqual(self.game.handle_command("path Terarium").message,
+                         "Room 'Terarium' does not exist. Did you mean Terrarium?")
+
+    def test_where_command(self):
+        self.assertEqual(self.game.handle_command("where mkv helmet").message, "MKV Helmet is in Bathroom.")
+        self.assertEqual(self.game.handle_command("where xyzzy").message, "There is no item called 'xyzzy'.")
+        self.assertEqual(self.game.handle_command("where Amo").message,
+                         "There is no item called 'Amo'. Did you mean Ammo?")
+        with self.assertRaises(ValueError):
+            self.game.handle_command("where ")
+
+    def test_generated_world(self):
+        # Test lookups on a generated world, names that title() would have mangled included
+        game = Game(db_path=None, world=generate_world(30, 30, items=5, seed=4))
+        self.assertEqual(game.lookup.room_name("room 29-29"), "Room 29-29")
+        rooms = game.lookup.rooms_with_item("item c")
+        self.assertEqual(len(rooms), 1)
+        self.assertEqual(game.rooms[rooms[0]].item, "Item C")
+        self.assertEqual(game.lookup.complete_room("room 29-2", limit=20),
+                         ["Room 29-2", "Room 29-20", "Room 29-21", "Room 29-22", "Room 29-23", "Room 29-24",
+                          "Room 29-25", "Room 29-26", "Room 29-27", "Room 29-28", "Room 29-29"])
+
+
+if __name__ == '__main__':
+    unittest.main()
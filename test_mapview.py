@@ -0,0 +1,170 @@
+import random
+import unittest
+from engine import Game
+from mapview import MAX_VISIBLE_ROOMS, MapView, SpatialIndex
+from worlds import generate_world
+
+
+class RecordingCanvas:
+    # Stand-in for tkinter.Canvas that keeps items in a dict and counts calls
+    def __init__(self):
+        self.items = {}  # id -> [kind, coords, options, tags]
+        self.next_id = 1
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _create(self, kind, coords, options):
+        self._count("create")
+        item_id = self.next_id
+        self.next_id += 1
+        tags = options.pop("tags", ())
+        self.items[item_id] = [kind, list(coords), options, (tags,) if isinstance(tags, str) else tags]
+        return item_id
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def coords(self, item_id, *coords):
+        self._count("coords")
+        self.items[item_id][1] = list(coords)
+
+    def itemconfig(self, item_id, **options):
+        self._count("itemconfig")
+        self.items[item_id][2].update(options)
+
+    def delete(self, tag_or_id):
+        self._count("delete")
+        for item_id in [item_id for item_id, item in self.items.items()
+                        if item_id == tag_or_id or tag_or_id in item[3]]:
+            del self.items[item_id]
+
+    def move(self, tag_or_id, dx, dy):
+        self._count("move")
+        for item in self.items.values():
+            if tag_or_id in item[3]:
+                item[1] = [value + (dx if i % 2 == 0 else dy) for i, value in enumerate(item[1])]
+
+    def tag_lower(self, tag):
+        pass
+
+    def kinds(self):
+        counts = {}
+        for kind, _, _, _ in self.items.values():
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_query_matches_scan(self):
+        rng = random.Random(5)
+        positions = {f"Room {i}": (rng.uniform(-500, 3000), rng.uniform(-500, 3000)) for i in range(2000)}
+        index = SpatialIndex(positions, cell_size=250)
+        for _ in range(20):
+            left, top = rng.uniform(-600, 2500), rng.uniform(-600, 2500)
+            right, bottom = left + rng.uniform(0, 900), top + rng.uniform(0, 900)
+            expected = {name for name, (x, y) in positions.items() if left <= x <= right and top <= y <= bottom}
+            self.assertEqual(set(index.query(left, top, right, bottom)), expected)
+
+
+class TestMapView(unittest.TestCase):
+    def test_builtin_map(self):
+        # Test the ten-room map draws as before: every room labelled, every exit once
+        game = Game(db_path=None)
+        canvas = RecordingCanvas()
+        view = MapView(game, canvas, 800, 600)
+        view.render()
+        self.assertEqual(canvas.kinds(), {"oval": 10, "text": 10, "line": 13})
+        oval = canvas.items[view.rooms["Rec Room"][0]]
+        self.assertEqual(oval[1], [360, 100, 440, 180])
+        self.assertEqual(oval[2]["fill"], "#2196F3")
+
+    def test_move_recolours_two_rooms(self):
+        game = Game(db_path=None)
+        canvas = RecordingCanvas()
+        view = MapView(game, canvas, 800, 600)
+        view.render()
+        calls = dict(canvas.calls)
+        game.handle_command("north")
+        view.move_player(game.player.current_room.name)
+        self.assertEqual(canvas.calls["itemconfig"], calls.get("itemconfig", 0) + 2)
+        self.assertEqual(canvas.calls["create"], calls["create"])
+        self.assertEqual(canvas.items[view.rooms["Sleeping Quarters"][0]][2]["fill"], "#2196F3")
+        self.assertEqual(canvas.items[view.rooms["Rec Room"][0]][2]["fill"], "#616161")
+
+    def test_large_world_culling(self):
+        # Test only the viewport of a 10,000 room world is drawn and scrolling reuses items
+        game = Game(db_path=None, world=generate_world(100, 100, seed=1))
+        canvas = RecordingCanvas()
+        view = MapView(game, canvas, 800, 600)
+        view.render()
+        drawn = len(view.rooms)
+        self.assertLess(drawn, 200)
+        kept = view.rooms["Room 3-3"]
+        created = view.items_created
+        view.scroll(80, 0)
+        self.assertIs(view.rooms["Room 3-3"], kept)
+        self.assertLess(view.items_created - created, 50)
+        self.assertEqual(len(canvas.items), len(view.exits) + sum(2 for _ in view.rooms))
+        # Walking off screen recentres on the player
+        view.move_player("Room 90-90")
+        self.assertTrue(view.is_visible("Room 90-90"))
+        self.assertNotIn("Room 3-3", view.rooms)
+
+    def test_drag_moves_canvas(self):
+        # Test dragging translates the drawn items in one call until the viewport reaches other cells
+        game = Game(db_path=None, world=generate_world(100, 100, seed=1))
+        canvas = RecordingCanvas()
+        view = MapView(game, canvas, 800, 600)
+        view.center_on("Room 50-50")
+        moves = renders = 0
+        for _ in range(40):
+            span, coords = view.span, canvas.calls.get("coords", 0)
+            view.scroll(15, 10)
+            if view.span == span:
+                moves += 1
+                self.assertEqual(canvas.calls.get("coords", 0), coords)
+            else:
+                renders += 1
+        self.assertEqual(canvas.calls["move"], moves)
+        self.assertGreater(moves, renders)
+        self.assertGreater(renders, 0)
+        fresh = MapView(game, RecordingCanvas(), 800, 600)
+        fresh.origin = view.origin
+        fresh.render()
+        self.assertEqual(set(view.rooms), set(fresh.rooms))
+        for name in view.rooms:
+            self.assertEqual(canvas.items[view.rooms[name][0]][1], fresh.canvas.items[fresh.rooms[name][0]][1])
+
+    def test_level_of_detail(self):
+        game = Game(db_path=None, world=generate_world(100, 100, seed=1))
+        canvas = RecordingCanvas()
+        view = MapView(game, canvas, 800, 600)
+        view.render()
+        view.zoom(0.4)
+        self.assertEqual(view.detail, "simple")
+        self.assertNotIn("text", canvas.kinds())
+        view.zoom(0.25)
+        self.assertEqual(view.detail, "dots")
+        self.assertEqual(set(canvas.kinds()), {"rectangle"})
+        view.zoom(0.01)
+        self.assertEqual(view.detail, "cells")
+        self.assertLessEqual(len(canvas.items), MAX_VISIBLE_ROOMS)
+        self.assertEqual(len(canvas.items), len(view.index.cells))
+        view.zoom(1 / view.scale)
+        self.assertEqual(view.detail, "full")
+        self.assertEqual(len(canvas.items), len(view.rooms) * 2 + len(view.exits))
+
+
+if __name__ == '__main__':
+    unittest.main()
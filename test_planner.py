@@ -0,0 +1,63 @@
+import unittest
+from engine import Game
+from planner import RoutePlanner
+
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(db_path=None)
+        self.rooms = self.game.rooms
+
+    def play(self, plan):
+        # Run plan commands through the engine and return the final events
+        events = []
+        for command in plan.commands:
+            events = self.game.handle_command(command).events
+            self.assertNotIn("hazard", [event.kind for event in events])
+        return [event.kind for event in events]
+
+    def test_optimal_plan_wins(self):
+        # Test the exact plan collects everything in the fewest moves and wins
+        plan = self.game.plan_route()
+        self.assertTrue(plan.optimal)
+        self.assertEqual(plan.moves, 10)
+        self.assertEqual(len(plan.items), 8)
+        self.assertEqual(plan.rooms[-1], "Terrarium")
+        # Med Bay is only entered after both suit pieces are collected
+        self.assertLess(plan.items.index("MKIV Suit"), plan.items.index("Medical Supplies"))
+        self.assertLess(plan.items.index("MKV Helmet"), plan.items.index("Medical Supplies"))
+        self.assertEqual(self.play(plan), ["victory"])
+
+    def test_plan_from_partial_inventory(self):
+        # Test planning mid-game only collects what is still missing
+        self.game.handle_command("north")
+        self.game.handle_command("get Artifact")
+        plan = self.game.plan_route()
+        self.assertNotIn("Artifact", plan.items)
+        self.assertEqual(len(plan.items), 7)
+        self.assertEqual(self.play(plan), ["victory"])
+
+    def test_heuristic_fallback(self):
+        # Test the greedy fallback is used over budget and still wins
+        for planner in (RoutePlanner(self.rooms, "Terrarium", max_items=4),
+                        RoutePlanner(self.rooms, "Terrarium", max_states=16),
+                        RoutePlanner(self.rooms, "Terrarium", time_limit=0)):
+            plan = planner.plan("Rec Room", set(), 8)
+            self.assertFalse(plan.optimal)
+            self.assertGreaterEqual(plan.moves, 10)
+        self.assertEqual(self.play(plan), ["victory"])
+
+    def test_impossible_plan(self):
+        # Test a world that cannot be won has no plan
+        self.rooms["Cargo Hold"].required_items = {"Medical Supplies"}
+        self.assertIsNone(self.game.plan_route())
+        self.assertEqual(self.game.handle_command("hint").message, "No route left that wins the game.")
+
+    def test_hint_command(self):
+        result = self.game.handle_command("hint")
+        self.assertTrue(result.message.startswith("Hint: "))
+        self.assertEqual(len(result.message[6:].split(", ")), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
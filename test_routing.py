@@ -0,0 +1,106 @@
+import random
+import unittest
+import networkx as nx
+from LostLabEnhanced import Game, Room
+from routing import HAZARD_WEIGHT, PathCache, RoutingTable
+from worldgraph import VersionedGraph
+
+
+def path_cost(graph, path, blocked):
+    # Total weight of a path under the hazard weighting
+    cost = 0
+    for u, v in zip(path[:-1], path[1:]):
+        cost += HAZARD_WEIGHT if u in blocked or v in blocked else graph[u][v].get('weight', 1)
+    return cost
+
+
+class TestRouting(unittest.TestCase):
+    def setUp(self):
+        # 8x8 grid world with a few gated rooms
+        rng = random.Random(7)
+        self.graph = VersionedGraph()
+        self.rooms = {}
+        for x in range(8):
+            for y in range(8):
+                self.rooms[(x, y)] = Room(f"{x},{y}")
+                self.graph.add_node((x, y))
+        for x in range(8):
+            for y in range(8):
+                if x < 7:
+                    self.graph.add_edge((x, y), (x + 1, y), weight=1)
+                if y < 7:
+                    self.graph.add_edge((x, y), (x, y + 1), weight=1)
+        for node in rng.sample(sorted(self.rooms), 6):
+            self.rooms[node].required_items = {"Key"}
+        self.table = RoutingTable(self.graph, self.rooms)
+        self.cache = PathCache(self.graph, self.rooms)
+        self.pairs = [(rng.choice(sorted(self.rooms)), rng.choice(sorted(self.rooms))) for _ in range(40)]
+
+    def assert_same_costs(self, inventory):
+        # Routing table paths must cost the same as the cached Dijkstra paths
+        blocked = self.table.blocked_rooms(inventory)
+        for source, target in self.pairs:
+            expected = self.cache.shortest_path(source, target, inventory)
+            actual = self.table.shortest_path(source, target, inventory)
+            self.assertEqual(actual[0], source)
+            self.assertEqual(actual[-1], target)
+            self.assertEqual(path_cost(self.graph, actual, blocked), path_cost(self.graph, expected, blocked))
+
+    def test_table_matches_dijkstra(self):
+        # Test table walks cost the same as full searches in both hazard states
+        self.assert_same_costs(set())
+        self.assert_same_costs({"Key"})
+        self.assertEqual(self.table.stats()["tables"], 2)
+
+    def test_table_reuses_columns(self):
+        # Test repeated targets are table walks, not new searches
+        self.table.shortest_path((0, 0), (7, 7), set())
+        self.table.shortest_path((3, 4), (7, 7), set())
+        self.assertEqual(self.table.columns_built, 1)
+        self.assertEqual(self.table.hits, 1)
+
+    def test_edge_change_rebuilds_affected_columns(self):
+        # Test removing an edge only drops columns that used it
+        self.table.precompute()
+        built = self.table.columns_built
+        self.graph.remove_edge((0, 0), (1, 0))
+        self.cache.invalidate()
+        self.assert_same_costs(set())
+        self.assertGreater(self.table.columns_invalidated, 0)
+        self.assertLess(self.table.columns_invalidated, built)
+        # Adding a shortcut must be picked up too
+        self.graph.add_edge((0, 0), (7, 7), weight=1)
+        self.assertEqual(self.table.shortest_path((0, 0), (7, 7), set()), ((0, 0), (7, 7)))
+        self.assert_same_costs(set())
+
+    def test_new_state_seeded_from_existing(self):
+        # Test a new hazard state reuses columns unaffected by the rooms that changed
+        self.table.precompute()
+        built = self.table.columns_built
+        self.table.precompute({"Key"})
+        self.assertLess(self.table.columns_built - built, built)
+        self.assert_same_costs({"Key"})
+
+    def test_no_path_and_missing_room(self):
+        self.graph.add_node("Island")
+        self.assertIsNone(self.table.shortest_path((0, 0), "Island", set()))
+        with self.assertRaises(nx.NodeNotFound):
+            self.table.shortest_path((0, 0), "Nowhere", set())
+
+    def test_memory_reported(self):
+        self.table.precompute()
+        self.assertGreater(self.table.stats()["memory_bytes"], 0)
+
+    def test_game_table_router(self):
+        # Test the table router gives the same Lost Lab routes
+        game = Game(router='table', precompute_routes=True)
+        game.player.current_room = game.rooms["Cargo Hold"]
+        self.assertEqual(game.shortest_path("Lab"), "Shortest path to Lab: Cargo Hold -> Sleeping Quarters -> "
+                                                    "Rec Room -> Decontamination -> Lab")
+        game.player.inventory = {"MKIV Suit", "MKV Helmet"}
+        self.assertEqual(game.shortest_path("Lab"), "Shortest path to Lab: Cargo Hold -> Med Bay -> Lab")
+        game.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
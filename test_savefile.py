@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+from engine import Game
+from savefile import HEADER, HEADERS, SECTIONS, SaveFile
+from storage import Storage
+from worlds import generate_world
+
+
+def room_state(game):
+    return (game.player.current_room.name, set(game.player.inventory),
+            {name: room.item for name, room in game.rooms.items()})
+
+
+class TestSaveFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "hero.sav")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_with_database(self):
+        # Test file and database saves of the same game restore the same state
+        storage = Storage(os.path.join(self.tmpdir.name, "test.db"))
+        try:
+            game = Game(storage=storage, player_name="Alice")
+            game.handle_commands("east;get ammo;north;get mkv helmet;save")
+            self.assertEqual(game.save_to_file(self.path), f"Game saved to {self.path}.")
+            expected = room_state(game)
+            from_file = Game(storage=storage, player_name="Bob")
+            self.assertEqual(from_file.load_from_file(self.path), f"Game loaded from {self.path}.")
+            self.assertEqual(room_state(from_file), expected)
+            self.assertEqual(set(from_file.dirty_rooms), {"Mess Hall", "Bathroom"})
+            from_file.save_to_db()
+            from_db = Game(storage=storage, player_name="Bob")
+            from_db.load_from_db()
+            self.assertEqual(room_state(from_db), expected)
+        finally:
+            storage.close()
+
+    def test_compact_world(self):
+        # Test a compact world only touches the rooms whose items changed
+        world = list(generate_world(40, 40, items=6, seed=3))
+        game = Game(db_path=None, world=world, compact=True)
+        for command in game.plan_route().commands[:-1]:
+            game.handle_command(command)
+        game.save_to_file(self.path)
+        restored = Game(db_path=None, world=world, compact=True)
+        restored.load_from_file(self.path)
+        self.assertEqual(room_state(restored), room_state(game))
+        self.assertEqual(len(restored.rooms.dirty), len(game.player.inventory))
+        with SaveFile(self.path) as save:
+            self.assertEqual(save.room_count, 1600)
+            self.assertEqual(save.current_room, game.player.current_room.name)
+            self.assertEqual(sorted(save.inventory()), sorted(game.player.inventory))
+
+    def test_resume_after_file_load(self):
+        # Test the journal follows a file load, so resuming rebuilds the loaded state
+        db_path = os.path.join(self.tmpdir.name, "test.db")
+        game = Game(db_path=db_path, journal='new')
+        game.handle_commands("east;get ammo;north;get mkv helmet")
+        game.save_to_file(self.path)
+        game.handle_commands("west;get artifact")
+        game.load_from_file(self.path)
+        expected = room_state(game)
+        self.assertEqual(expected[:2], ("Bathroom", {"Ammo", "MKV Helmet"}))
+        game.close()
+        resumed = Game(db_path=db_path, journal='resume')
+        try:
+            self.assertEqual(room_state(resumed), expected)
+        finally:
+            resumed.close()
+
+    def test_mismatched_rooms_change_nothing(self):
+        # Test a file of other rooms under the same world name is refused before any room changes
+        game = Game(db_path=None)
+        game.handle_commands("east;get ammo;north;get mkv helmet")
+        game.save_to_file(self.path)
+        other = Game(db_path=None)
+        names = list(other.rooms)
+        other.rooms = {name: other.rooms[name] for name in names[:6] + names[7:] + names[6:7]}
+        before = room_state(other)
+        self.assertEqual(other.load_from_file(self.path),
+                         "Error loading game: Save file rooms do not match this world.")
+        self.assertEqual(room_state(other), before)
+        self.assertEqual(other.dirty_rooms, {})
+        world = list(generate_world(6, 6, items=3, seed=2))
+        Game(db_path=None, world=world, compact=True).save_to_file(self.path)
+        reordered = Game(db_path=None, world=world[:1] + world[2:] + world[1:2], compact=True)
+        self.assertIn("do not match", reordered.load_from_file(self.path))
+
+    def test_reads_version_1(self):
+        # Test files without the room names digest still load, checked name by name
+        game = Game(db_path=None)
+        game.handle_commands("east;get ammo")
+        game.save_to_file(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        fields = HEADER.unpack_from(data)
+        world_length = fields[7]
+        start = HEADER.size + SECTIONS.size
+        # Same absolute section offsets, so only the header shrinks and the world name moves up
+        old = (HEADERS[1].pack(fields[0], 1, *fields[2:8]) + data[HEADER.size:start]
+               + data[start:start + world_length])
+        with open(self.path, "wb") as f:
+            f.write(old + data[len(old):])
+        restored = Game(db_path=None)
+        self.assertEqual(restored.load_from_file(self.path), f"Game loaded from {self.path}.")
+        self.assertEqual(room_state(restored), room_state(game))
+        names = list(restored.rooms)
+        restored.rooms = {name: restored.rooms[name] for name in names[1:] + names[:1]}
+        self.assertIn("do not match", restored.load_from_file(self.path))
+
+    def test_atomic_write_and_errors(self):
+        game = Game(db_path=None)
+        game.save_to_file(self.path)
+        game.handle_commands("east;get ammo")
+        game.save_to_file(self.path)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["hero.sav"])
+        other = Game(db_path=None, world=generate_world(5, 5, items=2, gated=1, seed=1))
+        self.assertIn("not 'Generated 5x5", other.load_from_file(self.path))
+        with open(self.path, "r+b") as f:
+            f.write(b"JUNK")
+        self.assertEqual(game.load_from_file(self.path), "Error loading game: Not a Lost Lab save file (bad magic).")
+        self.assertTrue(game.load_from_file(os.path.join(self.tmpdir.name, "missing.sav")).startswith("Error"))
+
+
+if __name__ == '__main__':
+    unittest.main()
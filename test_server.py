@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from server import GameServer
+
+
+class Client:
+    # Minimal line protocol client for tests
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port):
+        client = cls(*await asyncio.open_connection("127.0.0.1", port))
+        await client.receive()  # Greeting
+        return client
+
+    async def receive(self):
+        return json.loads(await self.reader.readline())
+
+    async def send(self, command):
+        self.writer.write(command.encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await self.receive()
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class TestGameServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "server.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_server(self, scenario, db_path=None, **options):
+        # Start a server on a free localhost port, run scenario(server), then shut down
+        async def main():
+            server = GameServer(db_path, **options)
+            await server.start(port=0)
+            try:
+                return await scenario(server)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_commands(self):
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            refused = await client.send("north")
+            self.assertFalse(refused["ok"])
+            login = await client.send("login Ripley")
+            self.assertTrue(login["ok"])
+            self.assertEqual(login["room"], "Rec Room")
+            moved = await client.send("north")
+            self.assertEqual(moved["message"], "You moved to Sleeping Quarters.")
+            taken = await client.send("get artifact")
+            self.assertEqual(taken["message"], "You picked up Artifact.")
+            hazard = await client.send("path med bay")
+            self.assertEqual(hazard["route"][-1], "Med Bay")
+            await client.send("south")
+            blocked = await client.send("west")
+            self.assertEqual([event["kind"] for event in blocked["events"]], ["hazard"])
+            invalid = await client.send("get 42")
+            self.assertEqual(invalid, {"ok": False, "message": "Item name must contain only letters and spaces."})
+            batch = await client.send("east;north;get MKV Helmet")
+            self.assertEqual(batch["message"].splitlines()[-1], "You picked up MKV Helmet.")
+            self.assertEqual(batch["room"], "Bathroom")
+            failed = await client.send("south;jump")
+            self.assertEqual(failed["message"], "Command 2 (jump): Invalid action.")
+            self.assertEqual((await client.send("quit"))["message"], "Goodbye.")
+            await client.close()
+        self.run_server(scenario)
+
+    def test_game_over(self):
+        # Test a session refuses commands once the game has ended, and the loss is counted once
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            await client.send("login Ripley")
+            defeat = await client.send("south;south")
+            self.assertEqual([event["kind"] for event in defeat["events"]], ["defeat"])
+            for command in ("where ammo", "hint", "north"):
+                self.assertEqual(await client.send(command), {"ok": False, "message": "The game is over."})
+            await client.close()
+            return server.storage.outcome_counts()
+        self.assertEqual(self.run_server(scenario, self.db_path), [('lose', 1)])
+
+    def test_hint_off_the_event_loop(self):
+        # Test the route planner behind hint runs on the thread pool, not the event loop
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            await client.send("login Ripley")
+            server.sessions["Ripley"].hint = lambda: threading.current_thread().name
+            hint = await client.send("hint")
+            await client.close()
+            return hint["message"]
+        self.assertTrue(self.run_server(scenario).startswith("lostlab-storage"))
+
+    def test_stats_and_profile(self):
+        # Test stats answers before login and an instrumented server times and profiles commands
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            stats = (await client.send("stats"))["stats"]
+            self.assertEqual(stats["sessions"], 0)
+            await client.send("login Ripley")
+            await client.send("north")
+            profiled = await client.send("profile path med bay")
+            self.assertEqual(profiled["route"][-1], "Med Bay")
+            self.assertIn("function calls", profiled["profile"])
+            stats = (await client.send("stats"))["stats"]
+            self.assertEqual(stats["sessions"], 1)
+            self.assertEqual(stats["commands_handled"], 2)
+            self.assertGreaterEqual(stats["timings"]["Player.move"]["count"], 1)
+            self.assertGreaterEqual(stats["timings"]["Game.find_path"]["count"], 1)
+            await client.close()
+        self.run_server(scenario, instrument=True)
+        from engine import Player
+        self.assertFalse(hasattr(Player.move, "__wrapped__"))
+
+    def test_failed_login_keeps_connection(self):
+        # Test a game that cannot be created is refused with a reply and the client can carry on
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            refused = await client.send("login Ripley")
+            self.assertFalse(refused["ok"])
+            self.assertEqual(refused["message"], "Could not start a game for Ripley: Unknown journal mode 'replay'.")
+            self.assertEqual((await client.send("stats"))["stats"]["sessions"], 0)
+            self.assertFalse((await client.send("login Ripley"))["ok"])
+            await client.close()
+        self.run_server(scenario, journal='replay')
+
+    def test_concurrent_sessions(self):
+        # Test many sessions play independently and a logged in name cannot log in twice
+        async def play(port, name):
+            client = await Client.connect(port)
+            await client.send(f"login {name}")
+            for command in ("east", "get Ammo", "north", "get MKV Helmet"):
+                await client.send(command)
+            room = (await client.send("hint"))["room"]
+            await client.close()
+            return room
+
+        async def scenario(server):
+            first = await Client.connect(server.port)
+            await first.send("login Player 0")
+            second = await Client.connect(server.port)
+            self.assertEqual((await second.send("login Player 0"))["message"], "Player 0 is already playing.")
+            rooms = await asyncio.gather(*(play(server.port, f"Player {i}") for i in range(1, 21)))
+            self.assertEqual(set(rooms), {"Bathroom"})
+            self.assertEqual(server.commands_handled, 20 * 5)
+            await first.close()
+            await second.close()
+        self.run_server(scenario, self.db_path)
+
+    def test_save_and_load(self):
+        # Test saves run through storage and a new connection for the same player can load them
+        async def scenario(server):
+            client = await Client.connect(server.port)
+            await client.send("login Dallas")
+            await client.send("east")
+            await client.send("get Ammo")
+            self.assertEqual((await client.send("save"))["message"], "Game saved to database.")
+            await client.close()
+            await asyncio.sleep(0.05)  # Let the server close the session
+            client = await Client.connect(server.port)
+            await client.send("login Dallas")
+            loaded = await client.send("load")
+            self.assertEqual(loaded["message"], "Game loaded from database.")
+            self.assertEqual(loaded["room"], "Mess Hall")
+            self.assertEqual((await client.send("where ammo"))["message"], "You are carrying Ammo.")
+            await client.close()
+        self.run_server(scenario, self.db_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from simulation import play_session, run_simulation
+
+
+class TestSimulation(unittest.TestCase):
+    def test_policies_finish(self):
+        # Test planned policies always win and the optimal plan is never longer than greedy
+        greedy_outcome, greedy_steps = play_session('greedy', 1)
+        optimal_outcome, optimal_steps = play_session('optimal', 1)
+        self.assertEqual(greedy_outcome, 'win')
+        self.assertEqual(optimal_outcome, 'win')
+        self.assertLessEqual(optimal_steps, greedy_steps)
+
+    def test_random_policy_reproducible(self):
+        # Test a seed always plays the same session
+        self.assertEqual(play_session('random', 42), play_session('random', 42))
+
+    def test_run_simulation_report(self):
+        # Test report totals add up in process and across a worker pool
+        report = run_simulation(20, 'random', processes=1, chunk_size=7)
+        self.assertEqual(report.wins + report.losses + report.timeouts, 20)
+        pooled = run_simulation(20, 'random', processes=2, chunk_size=7)
+        self.assertEqual(pooled[:6], report[:6])
+        self.assertGreater(pooled.sessions_per_second, 0)
+
+    def test_run_simulation_with_storage(self):
+        # Test outcomes are logged when a database is given, one player per session
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "sim.db")
+            report = run_simulation(5, 'greedy', processes=1, db_path=db_path)
+            with sqlite3.connect(db_path) as conn:
+                wins, players = conn.execute("SELECT COUNT(*), COUNT(DISTINCT player_id) FROM logs "
+                                             "WHERE action = 'win'").fetchone()
+                names = [name for name, in conn.execute("SELECT name FROM player ORDER BY id")]
+            conn.close()
+            self.assertEqual(wins, report.wins)
+            self.assertEqual(players, wins)  # Each session logs as its own player
+            self.assertEqual(names, [f"greedy {seed}" for seed in range(5)])
+
+    def test_run_simulation_instrumented(self):
+        # Test worker timings are merged into the report and only when asked for
+        report = run_simulation(6, 'greedy', processes=2, chunk_size=3, instrument=True)
+        self.assertIsNone(run_simulation(2, 'greedy', processes=1).metrics)
+        moves = report.metrics.histograms["Player.move"].count
+        self.assertEqual(moves + report.metrics.histograms["Player.take_item"].count, report.mean_steps * 6)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            run_simulation(1, 'teleport')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,306 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from LostLabEnhanced import Game
+from storage import ActionLogWriter, ConnectionPool, ShardedStorage, Storage, shard_paths
+from worlds import generate_world
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        # Use a throwaway database file for each test
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.game = Game(db_path=self.db_path)
+
+    def tearDown(self):
+        self.game.close()
+        self.tmpdir.cleanup()
+
+    def test_configurable_db_path(self):
+        # Test database is created at the configured path
+        self.assertTrue(os.path.exists(self.db_path))
+        self.assertIsNotNone(self.game.player.id)
+
+    def test_connection_pragmas(self):
+        # Test WAL journaling and synchronous pragma are set
+        with self.game.storage.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_connection_reused(self):
+        # Test saves and logs reuse the same long-lived connection
+        with self.game.storage.pool.connection() as first:
+            pass
+        self.game.save_to_db()
+        self.game.log_action("test", "Test action")
+        with self.game.storage.pool.connection() as second:
+            self.assertIs(first, second)
+
+    def test_pool_threads(self):
+        # Test pool never opens more than its size across threads
+        pool = ConnectionPool(self.db_path, size=2)
+        seen = set()
+
+        def work():
+            for _ in range(20):
+                with pool.connection() as conn:
+                    seen.add(id(conn))
+                    conn.execute("SELECT 1").fetchone()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(seen), 2)
+        pool.close()
+
+    def count_logs(self):
+        with self.game.storage.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+    def test_log_writer_batches(self):
+        # Test queued log rows are written in one batch on flush
+        for i in range(50):
+            self.game.log_action("test", f"Action {i}")
+        self.game.flush_logs()
+        self.assertEqual(self.count_logs(), 50)
+        self.assertLessEqual(self.game.storage.log_writer.batches_written, 2)
+
+    def test_log_writer_close_flushes(self):
+        # Test closing the game writes every pending log row
+        self.game.log_action("win", "Player defeated the Alien with all items!")
+        self.game.close()
+        game = Game(db_path=self.db_path)
+        with game.storage.pool.connection() as conn:
+            rows = conn.execute("SELECT action, created_at FROM logs").fetchall()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][0], "win")
+        self.assertIsNotNone(rows[0][1])
+        self.game = game
+
+    def test_outcome_stats(self):
+        # Test win/lose logs update the aggregate table in the same write, through both log paths
+        for action in ("win", "lose", "win", "save"):
+            self.game.log_action(action, "details")
+        storage = Storage(self.db_path, async_logs=False)
+        storage.log(self.game.player.id, "win", "details")
+        self.assertEqual(self.game.storage.outcome_counts(), [("lose", 1), ("win", 3)])
+        self.assertEqual(storage.outcome_counts(player_id=-1), [])
+        days = self.game.storage.daily_outcomes()
+        self.assertEqual([(outcome, count) for _, outcome, count in days], [("lose", 1), ("win", 3)])
+        with self.game.storage.pool.connection() as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM outcome_stats").fetchone()[0]
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT COUNT(*) FROM logs WHERE action = 'win'").fetchall()
+        self.assertEqual(rows, 2)
+        self.assertIn("logs_action", str(plan))
+        storage.close()
+
+    def test_outcome_backfill(self):
+        # Test a database written before outcome_stats existed is backfilled on open and on demand
+        self.game.close()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DROP TABLE outcome_stats")
+            conn.executemany("INSERT INTO logs (player_id, action, details, created_at) VALUES (?, ?, '', ?)",
+                             [(1, "win", "2024-01-01 10:00:00"), (1, "win", "2024-01-02 10:00:00"),
+                              (None, "lose", "2024-01-02 11:00:00"), (1, "load", "2024-01-02 12:00:00")])
+        conn.close()
+        self.game = Game(db_path=self.db_path)
+        storage = self.game.storage
+        self.assertEqual(storage.outcome_counts(), [("lose", 1), ("win", 2)])
+        self.assertEqual(storage.daily_outcomes(since="2024-01-02"),
+                         [("2024-01-02", "lose", 1), ("2024-01-02", "win", 1)])
+        self.assertEqual(storage.backfill_outcomes(), 3)
+        self.assertEqual(storage.outcome_counts(player_id=1), [("win", 2)])
+
+    def test_log_writer_drop_policy(self):
+        # Test drop policy discards records once the queue is full
+        writer = ActionLogWriter(self.game.storage.pool, max_queue=1, overflow="drop")
+        writer._thread = object()  # Pretend started so nothing drains the queue
+        self.assertTrue(writer.write(None, "test", "kept"))
+        self.assertFalse(writer.write(None, "test", "dropped"))
+        self.assertEqual(writer.dropped, 1)
+
+    def test_log_writer_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            ActionLogWriter(self.game.storage.pool, overflow="ignore")
+
+
+class TestPlayerRooms(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.storage = Storage(self.db_path, pool_size=2)
+        self.games = []
+
+    def tearDown(self):
+        for game in self.games:
+            game.close()
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def game(self, name, **options):
+        game = Game(storage=self.storage, player_name=name, **options)
+        self.games.append(game)
+        return game
+
+    def test_players_keep_their_own_rooms(self):
+        # Test one player's save neither changes nor is restored by another player's load
+        alice, bob = self.game("Alice"), self.game("Bob")
+        alice.handle_commands("east;get ammo;save")
+        bob.handle_commands("east;save;load")
+        self.assertEqual(bob.rooms["Mess Hall"].item, "Ammo")
+        self.assertEqual(bob.handle_command("get ammo").message, "You picked up Ammo.")
+        alice.handle_commands("north;get mkv helmet;load")
+        self.assertIsNone(alice.rooms["Mess Hall"].item)
+        self.assertEqual(alice.rooms["Bathroom"].item, "MKV Helmet")  # Unsaved pickup undone
+        self.assertEqual(alice.player.inventory, {"Ammo"})
+
+    def test_save_without_load_keeps_earlier_save(self):
+        # Test a session that saves without loading writes its whole state, not half of it
+        self.game("Alice").handle_commands("east;get ammo;save")
+        self.game("Alice").handle_commands("north;save")
+        resumed = self.game("Alice")
+        resumed.load_from_db()
+        self.assertEqual((resumed.player.current_room.name, resumed.player.inventory), ("Sleeping Quarters", set()))
+        self.assertEqual(resumed.rooms["Mess Hall"].item, "Ammo")
+        self.assertEqual(resumed.rooms["Sleeping Quarters"].item, "Artifact")
+        with self.storage.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT name FROM player_rooms").fetchall(), [])
+
+    def test_load_reads_one_player_through_index(self):
+        self.game("Alice").handle_commands("east;get ammo;save")
+        with self.storage.pool.connection() as conn:
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT name, item FROM player_rooms "
+                                "WHERE player_id = ? AND world_id = ?", (1, 1)).fetchall()
+            rows = conn.execute("SELECT player_id, name, item FROM player_rooms").fetchall()
+        self.assertIn("USING PRIMARY KEY (player_id=? AND world_id=?)", str(plan))
+        self.assertEqual(rows, [(1, "Mess Hall", None)])
+
+    def test_worlds_are_separate(self):
+        # Test the same player's state in another world is keyed by that world
+        lab = self.game("Alice")
+        grid = self.game("Carol", world=generate_world(6, 6, items=3, seed=2))
+        self.assertNotEqual(lab.world_id, grid.world_id)
+        self.assertEqual(self.game("Dave").world_id, lab.world_id)
+        self.assertTrue(grid.world_name.startswith("Generated 6x6"))
+
+    def test_player_state_per_world(self):
+        # Test position and inventory saved in one world stay out of the same player's other world
+        lab = self.game("Alice")
+        lab.handle_commands("east;get ammo;save")
+        grid = self.game("Alice", world=generate_world(6, 6, items=3, seed=2))
+        self.assertEqual(grid.load_from_db(), "Game loaded from database.")
+        self.assertEqual((grid.player.current_room.name, grid.player.inventory), (grid.start_room, set()))
+        grid.handle_commands(f"{sorted(grid.player.current_room.exits)[0]};save")
+        again = self.game("Alice")
+        again.load_from_db()
+        self.assertEqual((again.player.current_room.name, again.player.inventory), ("Mess Hall", {"Ammo"}))
+
+    def test_migrates_global_rooms(self):
+        # Test a database from before per-world state resumes where its player left the Lost Lab
+        path = os.path.join(self.tmpdir.name, "old.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE player (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, "
+                         "current_room TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+            conn.execute("CREATE TABLE inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, player_id INTEGER NOT NULL, "
+                         "item TEXT NOT NULL, acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+            conn.execute("CREATE TABLE rooms (name TEXT PRIMARY KEY, item TEXT)")
+            conn.execute("INSERT INTO player (name, current_room) VALUES ('Hero', 'Bathroom')")
+            conn.executemany("INSERT INTO inventory (player_id, item) VALUES (1, ?)", [("Ammo",), ("MKV Helmet",)])
+            items = {name: room.item for name, room in Game(db_path=None).rooms.items()}
+            items.update({"Mess Hall": None, "Bathroom": None})
+            conn.executemany("INSERT INTO rooms (name, item) VALUES (?, ?)", items.items())
+        conn.close()
+        game = Game(db_path=path)
+        try:
+            self.assertEqual(game.load_from_db(), "Game loaded from database.")
+            self.assertEqual((game.player.current_room.name, game.player.inventory),
+                             ("Bathroom", {"Ammo", "MKV Helmet"}))
+            self.assertIsNone(game.rooms["Mess Hall"].item)
+            self.assertEqual(game.rooms["Cargo Hold"].item, "MKIV Suit")
+            game.handle_commands("south;west;save;load")
+            self.assertEqual(game.player.current_room.name, "Rec Room")
+        finally:
+            game.close()
+        reopened = Game(db_path=path)
+        try:
+            reopened.load_from_db()
+            self.assertEqual(reopened.player.current_room.name, "Rec Room")
+            self.assertEqual(reopened.handle_command("east").message, "You moved to Mess Hall.")
+            self.assertIsNone(reopened.player.current_room.item)
+        finally:
+            reopened.close()
+
+
+class TestShardedStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.storage = ShardedStorage(self.db_path, shards=3)
+        self.games = []
+
+    def tearDown(self):
+        for game in self.games:
+            game.close()
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def game(self, name, **options):
+        game = Game(storage=self.storage, player_name=name, **options)
+        self.games.append(game)
+        return game
+
+    def test_players_routed_by_id(self):
+        # Test each player lives in the shard their id names, and saves round-trip through it
+        games = [self.game(f"Player {i}") for i in range(12)]
+        shards = {self.storage.route(game.player.id)[0] for game in games}
+        self.assertEqual(shards, {0, 1, 2})
+        self.assertEqual(len({game.player.id for game in games}), 12)
+        for game in games[:4]:
+            game.handle_commands("east;get ammo;save")
+        game = games[0]
+        index, local_id = self.storage.route(game.player.id)
+        self.assertEqual(self.storage.shard_of_name("Player 0"), index)
+        with self.storage.shards[index].pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT name FROM player WHERE id = ?", (local_id,)).fetchone(),
+                             ("Player 0",))
+        game.close()
+        self.games.remove(game)
+        again = self.game("Player 0")
+        self.assertEqual(again.player.id, game.player.id)
+        self.assertEqual(again.handle_command("load").message, "Game loaded from database.")
+        self.assertEqual((again.player.current_room.name, again.player.inventory), ("Mess Hall", {"Ammo"}))
+        self.assertEqual(self.game("Player 5").rooms["Mess Hall"].item, "Ammo")
+
+    def test_stats_across_shards(self):
+        games = [self.game(f"Player {i}") for i in range(6)]
+        for i, game in enumerate(games):
+            game.log_action("win" if i % 2 else "lose", "details")
+        self.assertEqual(self.storage.outcome_counts(), [("lose", 3), ("win", 3)])
+        self.assertEqual(self.storage.outcome_counts(games[1].player.id), [("win", 1)])
+        self.assertEqual([(outcome, count) for _, outcome, count in self.storage.daily_outcomes()],
+                         [("lose", 3), ("win", 3)])
+        self.assertEqual(games[0].charts.chart().counts, (("lose", 3), ("win", 3)))
+
+    def test_journal_on_shards(self):
+        game = self.game("Player 7", journal='new')
+        game.handle_commands("east;get ammo")
+        game.close()
+        self.games.remove(game)
+        game = self.game("Player 7", journal='resume')
+        self.assertEqual(game.player.inventory, {"Ammo"})
+
+    def test_game_opens_shards(self):
+        game = Game(db_path=os.path.join(self.tmpdir.name, "game.db"), shards=2)
+        self.games.append(game)
+        self.assertIsInstance(game.storage, ShardedStorage)
+        self.assertEqual(shard_paths("game.db", 2), ["game-0.db", "game-1.db"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, "game-1.db")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from collections import deque
+from engine import Game
+from worlds import generate_world, read_world, world_header, world_records, write_world
+
+OPPOSITE = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
+
+
+class TestWorlds(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_builtin_world_round_trip(self):
+        # Test the built-in world written to a file loads back identically
+        game = Game(db_path=None)
+        for name in ("lab.jsonl", "lab.jsonl.gz"):
+            write_world(self.path(name), world_records(game))
+            loaded = Game(db_path=None, world=self.path(name))
+            self.assertCountEqual(loaded.rooms, game.rooms)
+            self.assertEqual(loaded.room_positions, game.room_positions)
+            for room_name, room in game.rooms.items():
+                other = loaded.rooms[room_name]
+                self.assertEqual(other.item, room.item)
+                self.assertEqual(other.required_items, room.required_items)
+                self.assertEqual({d: r.name for d, r in other.exits.items()},
+                                 {d: r.name for d, r in room.exits.items()})
+            self.assertEqual(loaded.plan_route().moves, 10)
+            self.assertEqual(loaded.dirty_rooms, {})
+
+    def test_generated_world_is_winnable(self):
+        # Test generated mazes are connected and the planner can win them
+        for seed in range(5):
+            game = Game(db_path=None, world=generate_world(12, 10, items=6, gated=3, seed=seed))
+            self.assertEqual(len(game.rooms), 120)
+            self.assertEqual(game.player.current_room.name, "Room 0-0")
+            self.assertEqual(len([room for room in game.rooms.values() if room.required_items]), 3)
+            seen = {game.rooms["Room 0-0"]}
+            frontier = deque(seen)
+            while frontier:
+                room = frontier.popleft()
+                for direction, target in room.exits.items():
+                    # Every exit has a way back
+                    self.assertIs(target.get_exit(OPPOSITE[direction]), room)
+                    if target not in seen:
+                        seen.add(target)
+                        frontier.append(target)
+            self.assertEqual(len(seen), 120)
+            plan = game.plan_route()
+            self.assertIsNotNone(plan)
+            for command in plan.commands:
+                game.handle_command(command)
+            self.assertTrue(game.check_victory())
+
+    def test_generator_reproducible(self):
+        self.assertEqual(list(generate_world(6, 6, seed=3)), list(generate_world(6, 6, seed=3)))
+        full = list(generate_world(5, 5, loops=1.0))[1:]
+        self.assertEqual(sum(len(record["exits"]) for record in full), 2 * (4 * 5 + 4 * 5))
+
+    def test_streamed_file(self):
+        # Test a generated world streams to and from disk
+        write_world(self.path("maze.jsonl.gz"), generate_world(40, 25, items=10, gated=4, seed=7))
+        records = read_world(self.path("maze.jsonl.gz"))
+        self.assertEqual(next(records)["target_items"], 10)
+        game = Game(db_path=None, world=self.path("maze.jsonl.gz"))
+        self.assertEqual(len(game.rooms), 1000)
+        self.assertGreater(len(game.find_path(game.final_room).rooms), 1)
+
+    def test_invalid_worlds(self):
+        header = world_header("A", "B", 0)
+        for records in ([], [{"name": "A"}],
+                        [header, {"name": "A", "exits": {"north": "B"}}],
+                        [header, {"name": "A"}, {"name": "A"}, {"name": "B"}],
+                        [header, {"name": "A"}]):
+            with self.assertRaises(ValueError):
+                Game(db_path=None, world=records)
+        with open(self.path("bad.jsonl"), "w") as world_file:
+            world_file.write("{not json\n")
+        with self.assertRaises(ValueError):
+            Game(db_path=None, world=self.path("bad.jsonl"))
+        with self.assertRaises(ValueError):
+            list(generate_world(2, 2, items=8))
+
+
+if __name__ == '__main__':
+    unittest.main()
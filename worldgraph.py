@@ -0,0 +1,80 @@
+from collections import deque
+
+import networkx as nx  # Added for graph modeling Reference: https://networkx.org/documentation/stable/tutorial.html
+
+
+class VersionedGraph(nx.Graph):
+    # NetworkX graph that counts topology changes so cached routes know when they are stale.
+    # Recent edge changes are journaled so routing tables can rebuild only what an edit touches.
+    JOURNAL_SIZE = 1024
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.version = 0
+        self._journal = deque(maxlen=self.JOURNAL_SIZE)  # (version, changed edges or None for "everything")
+        super().__init__(incoming_graph_data, **attr)
+
+    def _record(self, edges):
+        self.version += 1
+        self._journal.append((self.version, edges))
+
+    def changes_since(self, version):
+        # Edges changed after version, or None if the change set is unknown and everything is stale
+        if version == self.version:
+            return []
+        if not self._journal or self._journal[0][0] > version + 1:
+            return None
+        changed = []
+        for entry_version, edges in self._journal:
+            if entry_version <= version:
+                continue
+            if edges is None:
+                return None
+            changed.extend(edges)
+        return changed
+
+    def add_node(self, node_for_adding, **attr):
+        super().add_node(node_for_adding, **attr)
+        self._record(())  # A node without edges does not change any route
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        super().add_nodes_from(nodes_for_adding, **attr)
+        self._record(())
+
+    def remove_node(self, n):
+        super().remove_node(n)
+        self._record(None)
+
+    def remove_nodes_from(self, nodes):
+        super().remove_nodes_from(nodes)
+        self._record(None)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._record(((u_of_edge, v_of_edge),))
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        ebunch_to_add = list(ebunch_to_add)
+        super().add_edges_from(ebunch_to_add, **attr)
+        self._record(tuple((e[0], e[1]) for e in ebunch_to_add))
+
+    def add_weighted_edges_from(self, ebunch_to_add, weight="weight", **attr):
+        ebunch_to_add = list(ebunch_to_add)
+        super().add_weighted_edges_from(ebunch_to_add, weight=weight, **attr)
+        self._record(tuple((e[0], e[1]) for e in ebunch_to_add))
+
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        self._record(((u, v),))
+
+    def remove_edges_from(self, ebunch):
+        ebunch = list(ebunch)
+        super().remove_edges_from(ebunch)
+        self._record(tuple((e[0], e[1]) for e in ebunch))
+
+    def clear(self):
+        super().clear()
+        self._record(None)
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._record(None)
@@ -0,0 +1,170 @@
+import gzip
+import json
+import random
+
+# World files are JSON Lines, optionally gzip compressed (*.gz). The first line is a header,
+# every following line is one room:
+#   {"format": "lostlab-world", "version": 1, "start": "Rec Room", "final_room": "Terrarium",
+#    "target_items": 8, "name": "Lost Lab"}
+#   {"name": "Med Bay", "item": "Medical Supplies", "requires": ["MKIV Suit", "MKV Helmet"],
+#    "pos": [250, 140], "exits": {"north": "Cargo Hold", "south": "Lab", "east": "Rec Room"}}
+# The optional name identifies the world in the database, where each player's room state is
+# kept per world. Exits may name rooms that appear later in the file. Files are read one line at a time,
+# so loading a huge map never holds its raw text and its rooms in memory together.
+WORLD_FORMAT = "lostlab-world"
+WORLD_VERSION = 1
+
+# Generated grid worlds
+CELL_SPACING = 80  # Canvas distance between neighbouring rooms
+CELL_MARGIN = 40
+# (direction, exit bit, opposite bit, dx, dy) for cells of a generated grid
+GRID_STEPS = (('north', 1, 2, 0, -1), ('south', 2, 1, 0, 1), ('east', 4, 8, 1, 0), ('west', 8, 4, -1, 0))
+
+
+def world_header(start, final_room, target_items, name=None):
+    header = {"format": WORLD_FORMAT, "version": WORLD_VERSION, "start": start,
+              "final_room": final_room, "target_items": target_items}
+    if name is not None:
+        header["name"] = name
+    return header
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_world(path):
+    """ Yield the header and then each room record of a world file, one line at a time. """
+    with _open(path, "r") as world_file:
+        for line_number, line in enumerate(world_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}, line {line_number}: {e}") from None
+
+
+def write_world(path, records):
+    # Write a header and room records (any iterable, e.g. a generator) as a world file
+    with _open(path, "w") as world_file:
+        for record in records:
+            world_file.write(json.dumps(record, separators=(",", ":")))
+            world_file.write("\n")
+
+
+def world_records(game):
+    # Header and room records for a game's current world, for write_world
+    yield world_header(game.start_room, game.final_room, game.target_items, game.world_name)
+    for name, room in game.rooms.items():
+        record = {"name": name, "item": room.item, "requires": sorted(room.required_items),
+                  "exits": {direction: target.name for direction, target in room.exits.items()}}
+        if name in game.room_positions:
+            record["pos"] = list(game.room_positions[name])
+        yield record
+
+
+def grid_room_name(x, y):
+    return f"Room {x}-{y}"
+
+
+def generated_item_name(number):
+    # Item A, Item B, ..., Item Z, Item AA, ...; letters only, so the get command accepts them
+    letters = ""
+    while number > 0:
+        number, letter = divmod(number - 1, 26)
+        letters = chr(ord("A") + letter) + letters
+    return f"Item {letters}"
+
+
+def generate_world(width, height, items=8, gated=2, loops=0.05, seed=0):
+    """ Yield a width x height grid world as header and room records.
+
+        Exits are a random maze (a spanning tree built by randomized depth-first search) with
+        a loops fraction of the remaining walls opened again; loops=1.0 gives a full grid.
+        The start room is the top-left corner. The final room and the gated rooms are leaves
+        of the spanning tree, so blocking them never cuts any other room off, and gated rooms
+        only require items placed in ungated rooms. Every generated world can be won.
+
+        Cells are kept in flat arrays (one exit bitmask byte per cell), so a million-room
+        world is generated without building any room objects. """
+    if width < 1 or height < 1:
+        raise ValueError("World must be at least 1 x 1.")
+    count = width * height
+    if items + gated + 2 > count:
+        raise ValueError(f"A {width} x {height} world is too small for {items} items and {gated} gated rooms.")
+    rng = random.Random(seed)
+    exits = bytearray(count)
+    tree_degree = bytearray(count)
+
+    # Randomized depth-first search, iterative so a million cells never hit the recursion limit
+    visited = bytearray(count)
+    visited[0] = 1
+    stack = [0]
+    while stack:
+        cell = stack[-1]
+        x, y = cell % width, cell // width
+        options = [(bit, back, (y + dy) * width + x + dx) for _, bit, back, dx, dy in GRID_STEPS
+                   if 0 <= x + dx < width and 0 <= y + dy < height and not visited[(y + dy) * width + x + dx]]
+        if not options:
+            stack.pop()
+            continue
+        bit, back, neighbour = rng.choice(options)
+        exits[cell] |= bit
+        exits[neighbour] |= back
+        tree_degree[cell] += 1
+        tree_degree[neighbour] += 1
+        visited[neighbour] = 1
+        stack.append(neighbour)
+    del visited, stack
+
+    # Open some of the remaining walls (south and east only, so each wall is considered once)
+    if loops > 0:
+        for cell in range(count):
+            x, y = cell % width, cell // width
+            if y + 1 < height and not exits[cell] & 2 and rng.random() < loops:
+                exits[cell] |= 2
+                exits[cell + width] |= 1
+            if x + 1 < width and not exits[cell] & 4 and rng.random() < loops:
+                exits[cell] |= 4
+                exits[cell + 1] |= 8
+
+    # Final room and gated rooms are tree leaves other than the start
+    leaves = [cell for cell in range(1, count) if tree_degree[cell] <= 1]
+    del tree_degree
+    rng.shuffle(leaves)
+    if len(leaves) < gated + 1:
+        raise ValueError(f"Maze has only {len(leaves)} dead ends, too few for {gated} gated rooms.")
+    final = leaves[0]
+    gates = leaves[1:gated + 1]
+    # Items go anywhere except the start and final rooms; rejection sampling keeps memory
+    # proportional to the item count rather than the world size
+    taken = {0, final}
+    item_cells = []
+    gate_set = set(gates)
+    while len(item_cells) < items:
+        cell = rng.randrange(count)
+        if cell not in taken:
+            taken.add(cell)
+            item_cells.append(cell)
+    item_at = {cell: generated_item_name(number) for number, cell in enumerate(item_cells, 1)}
+    open_items = [item_at[cell] for cell in item_cells if cell not in gate_set]
+    if gates and not open_items:
+        raise ValueError("Gated rooms need at least one item outside gated rooms.")
+    requires = {cell: sorted(rng.sample(open_items, min(len(open_items), rng.randint(1, 2))))
+                for cell in gates}
+
+    yield world_header(grid_room_name(0, 0), grid_room_name(final % width, final // width), items,
+                       f"Generated {width}x{height} items={items} gated={gated} loops={loops} seed={seed}")
+    for cell in range(count):
+        x, y = cell % width, cell // width
+        if cell == final:
+            item = "The Alien!"
+        else:
+            item = item_at.get(cell)
+        yield {"name": grid_room_name(x, y), "item": item, "requires": requires.get(cell, []),
+               "pos": [CELL_MARGIN + x * CELL_SPACING, CELL_MARGIN + y * CELL_SPACING],
+               "exits": {direction: grid_room_name(x + dx, y + dy)
+                         for direction, bit, _, dx, dy in GRID_STEPS if exits[cell] & bit}}